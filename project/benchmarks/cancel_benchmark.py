@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder, price_to_ticks
+from common.orderbook import OrderBook
+
+LEVEL_SIZE = 10_000
+NUM_CANCELS = 1_000
+PRICE = 100.00
+
+
+def build_level(num_orders: int):
+    """Fill a single bid level with num_orders resting orders, stored as the
+    engine stores them"""
+    orderbook = OrderBook("BENCH")
+    active_orders = {}
+    orders = []
+    for i in range(num_orders):
+        order = CompactOrder(
+            order_id=i + 1,
+            symbol="BENCH",
+            side="BUY",
+            price=PRICE,
+            price_ticks=price_to_ticks(PRICE),
+            quantity=1,
+            remaining_quantity=1,
+            timestamp=i + 1,
+            client_id="bench",
+            engine_origin_addr="127.0.0.1:50051",
+        )
+        active_orders[order.order_id] = order
+        orderbook.add_order(order, active_orders)
+        orders.append(order)
+
+    return orderbook, active_orders, orders
+
+
+def main():
+    orderbook, active_orders, orders = build_level(LEVEL_SIZE)
+
+    # cancel outward from the middle of the queue
+    middle = LEVEL_SIZE // 2
+    targets = orders[middle - NUM_CANCELS // 2 : middle + NUM_CANCELS // 2]
+
+    start = time.perf_counter_ns()
+    for order in targets:
+        # what CancelFairy.cancel_local does to the book
+        assert orderbook.remove_order(order.order_id) is not None
+    elapsed = time.perf_counter_ns() - start
+
+    print(f"level size: {LEVEL_SIZE} orders, cancelled {len(targets)} from the middle")
+    print(f"total: {elapsed / 1e6:.3f} ms, per cancel: {elapsed / len(targets):.0f} ns")
+    print(f"orders left at {PRICE}: {len(orderbook.bids[price_to_ticks(PRICE)])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder
+from engine.journal import ORDER, Journal, read_journal
+
+NUM_EVENTS = 20_000
+NUM_PRODUCERS = 100
+
+
+def make_order(i: int) -> CompactOrder:
+    return CompactOrder(
+        order_id=i + 1,
+        symbol="BENCH",
+        side="BUY" if i % 2 else "SELL",
+        price=100.00,
+        price_ticks=10_000,
+        quantity=10,
+        remaining_quantity=10,
+        timestamp=time.time_ns(),
+        client_id=f"client-{i % 100}",
+        engine_origin_addr="127.0.0.1:50051",
+        client_order_id=f"{i:08d}-0000-4000-8000-000000000000",
+    )
+
+
+async def produce(journal: Journal, orders, latencies):
+    """Append and commit one order at a time, like a stream of submit_order calls"""
+    for order in orders:
+        start = time.perf_counter_ns()
+        journal.append_order(order)
+        await journal.commit()
+        latencies.append(time.perf_counter_ns() - start)
+
+
+async def run(name: str, directory: str, num_producers: int, num_events: int, **policy):
+    path = os.path.join(directory, f"{name.replace(' ', '_')}.journal")
+    journal = Journal(path, **policy)
+    orders = [make_order(i) for i in range(num_events)]
+    latencies = []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            produce(journal, orders[i::num_producers], latencies)
+            for i in range(num_producers)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    await journal.close()
+
+    assert sum(1 for record_type, _ in read_journal(path) if record_type == ORDER) == (
+        num_events
+    )
+    latencies.sort()
+    print(f"{name}:")
+    print(
+        f"\t{num_events / elapsed:,.0f} events/s, "
+        f"{num_events / journal.syncs:.1f} events per write, "
+        f"{journal.bytes_written / num_events:.0f} bytes/event"
+    )
+    print(
+        f"\tcommit latency p50 {latencies[len(latencies) // 2] / 1e3:.0f} us, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] / 1e3:.0f} us"
+    )
+
+
+async def main():
+    # journal next to where the engines keep theirs, so fsync hits the same disk
+    with tempfile.TemporaryDirectory(dir=os.getcwd()) as directory:
+        await run(
+            "fsync per event, 1 producer",
+            directory,
+            1,
+            NUM_EVENTS // 10,
+            sync_every=1,
+        )
+        # each grouping policy with and without fsync, so the two differ only
+        # in the fsync
+        for name, policy in [
+            ("group commit 2 ms", dict(sync_interval_ms=2.0)),
+            (
+                "group commit 2 ms or 64 events",
+                dict(sync_interval_ms=2.0, sync_every=64),
+            ),
+            ("group commit as soon as the writer is free", dict(sync_interval_ms=0)),
+        ]:
+            for fsync in (True, False):
+                await run(
+                    f"{name}, {'fsync' if fsync else 'no fsync'}, "
+                    f"{NUM_PRODUCERS} producers",
+                    directory,
+                    NUM_PRODUCERS,
+                    NUM_EVENTS,
+                    fsync=fsync,
+                    **policy,
+                )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder
+from engine.cancel_fairy import CancelFairy
+from engine.journal import Journal
+from engine.match_engine import MatchEngine
+from engine.replay import load_events, replay_events
+from engine.synchronizer import OrderBookSynchronizer
+
+NUM_ORDERS = 100_000
+CANCEL_EVERY = 4
+ADDRESS = "127.0.0.1:50051"
+
+
+def make_engine(journal=None) -> MatchEngine:
+    return MatchEngine(
+        "bench",
+        ADDRESS,
+        OrderBookSynchronizer("bench", ADDRESS),
+        CancelFairy("bench", ADDRESS),
+        engine_number=1,
+        journal=journal,
+    )
+
+
+async def record(path: str) -> None:
+    """Run random orders, and cancels of some of them, through an engine that
+    journals them, the way submit_order and the cancel fairy do"""
+    random.seed(11)
+    journal = Journal(path, fsync=False)
+    engine = make_engine(journal)
+    orders = []
+    for i in range(NUM_ORDERS):
+        side = random.choice(["BUY", "SELL"])
+        price_ticks = round(random.gauss(10_000, 50))
+        quantity = random.randint(1, 100)
+        order = CompactOrder(
+            order_id=engine.order_ids.next_id(),
+            symbol=random.choice(["AAA", "BBB"]),
+            side=side,
+            price=price_ticks / 100,
+            price_ticks=price_ticks,
+            quantity=quantity,
+            remaining_quantity=quantity,
+            timestamp=0,
+            client_id=f"client-{i % 10}",
+            engine_origin_addr=ADDRESS,
+        )
+        engine.accept_order(order)
+        orders.append(order)
+        if i % CANCEL_EVERY == 0:
+            # cancel a random earlier order if it is still resting
+            victim = random.choice(orders)
+            if victim.order_id in engine.orderbooks[victim.symbol].order_nodes:
+                engine.cancel_fairy.cancel_local(
+                    victim.order_id, engine.orderbooks[victim.symbol]
+                )
+    await journal.close()
+
+
+async def main():
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        path = os.path.join(directory, "bench.journal")
+
+        start = time.perf_counter()
+        await record(path)
+        print(
+            f"recorded {os.path.getsize(path):,} bytes of journal in "
+            f"{time.perf_counter() - start:.1f}s"
+        )
+
+        books = []
+        for run in range(2):
+            # replay mutates the decoded orders, so each run decodes afresh
+            start = time.perf_counter()
+            events = load_events(path)
+            decode_elapsed = time.perf_counter() - start
+
+            engine = make_engine()
+            print(f"replay {run + 1}, {decode_elapsed:.2f}s to decode:")
+            print(replay_events(engine, events).report())
+            books.append({s: b.get_depth() for s, b in engine.orderbooks.items()})
+        print(f"both replays end with the same books: {books[0] == books[1]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
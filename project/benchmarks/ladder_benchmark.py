@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import price_to_ticks
+from common.orderbook import OrderBook
+from common.ladder_orderbook import LadderOrderBook
+import proto.matching_service_pb2 as pb2
+
+NUM_ORDERS = 100_000
+NUM_SNAPSHOTS = 1_000
+MIN_PRICE, MAX_PRICE = 50.00, 150.00
+
+
+def generate_orders(num_orders: int):
+    """Random limit orders around 100 with a wide spread of resting levels"""
+    random.seed(42)
+    orders = []
+    for i in range(num_orders):
+        side = random.choice(["BUY", "SELL"])
+        center = 99.00 if side == "BUY" else 101.00
+        price = min(max(random.gauss(center, 5), MIN_PRICE), MAX_PRICE)
+        price_ticks = price_to_ticks(round(price, 2))
+        quantity = random.randint(1, 100)
+        orders.append(
+            pb2.OrderRequest(
+                order_id=i + 1,
+                symbol="BENCH",
+                side=side,
+                price=price_ticks / 100,
+                price_ticks=price_ticks,
+                quantity=quantity,
+                remaining_quantity=quantity,
+                client_id="bench",
+                engine_origin_addr="127.0.0.1:50051",
+            )
+        )
+    return orders
+
+
+def run(name: str, orderbook: OrderBook):
+    orders = generate_orders(NUM_ORDERS)
+    active_orders = {order.order_id: order for order in orders}
+
+    start = time.perf_counter_ns()
+    for order in orders:
+        orderbook.add_order(order, active_orders)
+    add_elapsed = time.perf_counter_ns() - start
+
+    start = time.perf_counter_ns()
+    for _ in range(NUM_SNAPSHOTS):
+        bids, asks = orderbook.get_depth()
+    depth_elapsed = time.perf_counter_ns() - start
+
+    start = time.perf_counter_ns()
+    for _ in range(NUM_SNAPSHOTS):
+        orderbook.get_bbo()
+    bbo_elapsed = time.perf_counter_ns() - start
+
+    print(f"{name}:")
+    print(f"\tresting levels: {len(bids)} bids, {len(asks)} asks")
+    print(f"\tadd_order: {add_elapsed / NUM_ORDERS:.0f} ns/order")
+    print(f"\tget_depth: {depth_elapsed / NUM_SNAPSHOTS / 1e3:.1f} us/snapshot")
+    print(f"\tget_bbo:   {bbo_elapsed / NUM_SNAPSHOTS:.0f} ns/call")
+
+
+def main():
+    run("OrderBook (dict of levels)", OrderBook("BENCH"))
+    run("LadderOrderBook", LadderOrderBook("BENCH", MIN_PRICE, MAX_PRICE))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder
+from common.orderbook import OrderBook
+
+NUM_EVENTS = 500_000
+REPORT_EVERY = 50_000
+CANCEL_PROBABILITY = 0.4
+START_PRICE_TICKS = 10_000
+
+
+def new_order(order_id: int, mid_ticks: int) -> CompactOrder:
+    side = random.choice(["BUY", "SELL"])
+    # mostly passive orders around the mid, with some that cross
+    offset = int(random.gauss(10, 15))
+    price_ticks = mid_ticks - offset if side == "BUY" else mid_ticks + offset
+    quantity = random.randint(1, 100)
+    return CompactOrder(
+        order_id=order_id,
+        symbol="BENCH",
+        side=side,
+        price=price_ticks / 100,
+        price_ticks=price_ticks,
+        quantity=quantity,
+        remaining_quantity=quantity,
+        timestamp=order_id,
+        client_id="bench",
+        engine_origin_addr="127.0.0.1:50051",
+    )
+
+
+async def main():
+    """Random-walk flow with cancels: the mid drifts across many prices over the
+    run, but only the levels still holding orders should stay in the book"""
+    random.seed(11)
+    logger = logging.getLogger("levels_benchmark")
+    logger.setLevel(logging.CRITICAL)
+
+    orderbook = OrderBook("BENCH")
+    active_orders = {}
+    resting = []
+    prices_seen = set()
+    mid_ticks = START_PRICE_TICKS
+    order_id = 0
+
+    print(
+        f"{'events':>8} {'prices seen':>12} {'levels':>7} {'orders':>7} "
+        f"{'ns/event':>9} {'get_depth us':>13}"
+    )
+    start = time.perf_counter_ns()
+    for event in range(1, NUM_EVENTS + 1):
+        mid_ticks += random.choice([-1, 0, 1])
+
+        if resting and random.random() < CANCEL_PROBABILITY:
+            # cancel a random earlier order; it may already have been filled
+            i = random.randrange(len(resting))
+            resting[i], resting[-1] = resting[-1], resting[i]
+            order = resting.pop()
+            await orderbook.cancel_order(order, active_orders, logger)
+            active_orders.pop(order.order_id, None)
+        else:
+            order_id += 1
+            order = new_order(order_id, mid_ticks)
+            prices_seen.add(order.price_ticks)
+            active_orders[order.order_id] = order
+            orderbook.add_order(order, active_orders)
+            if order.order_id in orderbook.order_nodes:
+                resting.append(order)
+
+        if event % REPORT_EVERY == 0:
+            elapsed = time.perf_counter_ns() - start
+            depth_start = time.perf_counter_ns()
+            orderbook.get_depth()
+            depth_elapsed = time.perf_counter_ns() - depth_start
+
+            num_levels = len(orderbook.bids) + len(orderbook.asks)
+            assert all(orderbook.bids.values()) and all(orderbook.asks.values())
+            print(
+                f"{event:>8} {len(prices_seen):>12} {num_levels:>7} "
+                f"{len(orderbook.order_nodes):>7} {elapsed / REPORT_EVERY:>9.0f} "
+                f"{depth_elapsed / 1e3:>13.1f}"
+            )
+            start = time.perf_counter_ns()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import resource
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder
+from common.orderbook import OrderBook
+from engine.cancel_fairy import ActiveOrder
+import proto.matching_service_pb2 as pb2
+
+NUM_ORDERS = 200_000
+NUM_LEVELS = 1_000
+ENGINE_ADDR = "127.0.0.1:50051"
+
+
+def order_request(i: int):
+    # bids only, so nothing crosses and every order rests
+    price_ticks = 9_000 + i % NUM_LEVELS
+    return pb2.OrderRequest(
+        order_id=i + 1,
+        client_order_id=f"{i:08d}-0000-4000-8000-000000000000",
+        symbol="AAPL",
+        side="BUY",
+        price=price_ticks / 100,
+        price_ticks=price_ticks,
+        quantity=10,
+        remaining_quantity=10,
+        client_id=f"client-{i % 50}",
+        engine_origin_addr=ENGINE_ADDR,
+        timestamp=1_700_000_000_000_000_000 + i,
+    )
+
+
+def build_with_requests(orderbook, orders, active_orders, i):
+    """Engine state as kept before: the OrderRequest itself plus a dict entry"""
+    order = order_request(i)
+    active_orders[order.order_id] = {
+        "remaining_quantity": order.remaining_quantity,
+        "address": ENGINE_ADDR,
+        "order_record": order,
+    }
+    orders[order.order_id] = order
+    orderbook.add_order(order, active_orders)
+
+
+def build_with_compact(orderbook, orders, active_orders, i):
+    """Engine state as kept now: one CompactOrder shared by all three tables"""
+    order = CompactOrder.from_request(order_request(i))
+    active_orders[order.order_id] = ActiveOrder(
+        order.remaining_quantity, ENGINE_ADDR, order
+    )
+    orders[order.order_id] = order
+    orderbook.add_order(order, active_orders)
+
+
+def max_rss_bytes() -> int:
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def measure(build, results):
+    orderbook = OrderBook("AAPL")
+    orders = {}
+    active_orders = {}
+
+    before = max_rss_bytes()
+    for i in range(NUM_ORDERS):
+        build(orderbook, orders, active_orders, i)
+    after = max_rss_bytes()
+
+    assert len(orderbook.order_nodes) == NUM_ORDERS
+    results.put((after - before) / NUM_ORDERS)
+
+
+def run(name: str, build):
+    # measure each layout in a fresh process so peak RSS starts clean
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure, args=(build, results))
+    process.start()
+    bytes_per_order = results.get()
+    process.join()
+    print(f"{name}: {bytes_per_order:.0f} bytes per resting order")
+    return bytes_per_order
+
+
+def main():
+    print(f"{NUM_ORDERS} resting orders over {NUM_LEVELS} levels")
+    before = run("OrderRequest + dict active_orders entry", build_with_requests)
+    after = run("CompactOrder + ActiveOrder", build_with_compact)
+    print(f"saved {before - after:.0f} bytes per order ({1 - after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client.client import Client
+from engine.cancel_fairy import CancelFairy
+from engine.match_engine import MatchEngine
+from engine.synchronizer import OrderBookSynchronizer
+from network.grpc_server import serve_ME
+
+NUM_CLIENTS = 4
+ORDERS_PER_CLIENT = 2_000
+ADDRESS = "127.0.0.1:50072"
+
+
+async def send_orders(client: Client, orders, in_flight: int):
+    """Submit orders keeping up to in_flight of them outstanding"""
+    window = asyncio.Semaphore(in_flight)
+
+    async def send(order):
+        async with window:
+            await client.submit_order(order)
+
+    await asyncio.gather(*(send(order) for order in orders))
+
+
+async def send_batches(client: Client, orders, batch_size: int):
+    """Submit orders batch_size at a time with SubmitOrders"""
+    for i in range(0, len(orders), batch_size):
+        await client.submit_orders(orders[i : i + batch_size])
+
+
+async def run(name: str, in_flight: int, session: bool, batch_size: int = 0):
+    engine = MatchEngine(
+        "bench",
+        ADDRESS,
+        OrderBookSynchronizer("bench", ADDRESS),
+        CancelFairy("bench", ADDRESS),
+    )
+    server = await serve_ME(engine, ADDRESS)
+
+    random.seed(3)
+    clients = []
+    for i in range(NUM_CLIENTS):
+        client = Client(f"client-{i}", "password", me_addr=ADDRESS, direct_connect=True)
+        await client.register()
+        if session:
+            await client.open_order_session()
+        clients.append(client)
+    orders = [
+        [client._generate_random_order(["BENCH"]) for _ in range(ORDERS_PER_CLIENT)]
+        for client in clients
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            (
+                send_batches(client, client_orders, batch_size)
+                if batch_size
+                else send_orders(client, client_orders, in_flight)
+            )
+            for client, client_orders in zip(clients, orders)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(
+        latency * 1e3 for client in clients for latency in client.latencies
+    )
+    print(
+        f"{name:>24} {NUM_CLIENTS * ORDERS_PER_CLIENT / elapsed:>9,.0f} "
+        f"{statistics.median(latencies):>8.2f} "
+        f"{latencies[int(len(latencies) * 0.99)]:>8.2f}"
+    )
+
+    for client in clients:
+        await client.close_order_session()
+        client.fill_stream_task.cancel()
+    await server.stop(None)
+
+
+async def main():
+    logging.disable(logging.CRITICAL)
+    print(f"{NUM_CLIENTS} clients x {ORDERS_PER_CLIENT:,} orders, over loopback gRPC")
+    print(f"{'':>24} {'orders/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    await run("unary SubmitOrder", 1, session=False)
+    await run("session, 1 in flight", 1, session=True)
+    await run("session, 32 in flight", 32, session=True)
+    await run("SubmitOrders, 32 a batch", 1, session=False, batch_size=32)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        # engine and client logs go under the working directory
+        os.chdir(directory)
+        asyncio.run(main())
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import grpc
+
+from common.order import CompactOrder
+from engine.cancel_fairy import CancelFairy
+from engine.match_engine import MatchEngine
+from engine.synchronizer import OrderBookSynchronizer
+from network.grpc_server import serve_ME
+import proto.matching_service_pb2 as pb2
+import proto.matching_service_pb2_grpc as pb2_grpc
+
+LEVELS_PER_SIDE = 5_000
+SECONDS_PER_CASE = 2.0
+ADDRESS = "127.0.0.1:50071"
+SYMBOL = "DEEP"
+
+
+def resting_order(engine: MatchEngine, side: str, price_ticks: int) -> CompactOrder:
+    return CompactOrder(
+        order_id=engine.order_ids.next_id(),
+        symbol=SYMBOL,
+        side=side,
+        price=price_ticks / 100,
+        price_ticks=price_ticks,
+        quantity=10,
+        remaining_quantity=10,
+        timestamp=0,
+        client_id="bench",
+        engine_origin_addr=ADDRESS,
+    )
+
+
+def build_deep_book(engine: MatchEngine) -> None:
+    """LEVELS_PER_SIDE one-tick levels on each side of a 100.00 mid"""
+    for i in range(1, LEVELS_PER_SIDE + 1):
+        engine.accept_order(resting_order(engine, "BUY", 10_000 - i))
+        engine.accept_order(resting_order(engine, "SELL", 10_000 + i))
+
+
+async def poll(stub, engine: MatchEngine, num_levels: int, book_changes: bool):
+    """Poll GetOrderBook for SECONDS_PER_CASE, changing the back of the book
+    before every poll if book_changes"""
+    request = pb2.GetOrderbookRequest(symbol=SYMBOL, num_levels=num_levels)
+    deep_bid = 10_000 - LEVELS_PER_SIDE
+    polls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < SECONDS_PER_CASE:
+        if book_changes:
+            engine.accept_order(resting_order(engine, "BUY", deep_bid))
+        response = await stub.GetOrderBook(request)
+        polls += 1
+    elapsed = time.perf_counter() - start
+    return polls / elapsed, response.ByteSize()
+
+
+async def main():
+    logging.disable(logging.CRITICAL)
+    engine = MatchEngine(
+        "bench",
+        ADDRESS,
+        OrderBookSynchronizer("bench", ADDRESS),
+        CancelFairy("bench", ADDRESS),
+    )
+    build_deep_book(engine)
+    server = await serve_ME(engine, ADDRESS)
+    channel = grpc.aio.insecure_channel(ADDRESS)
+    stub = pb2_grpc.MatchingServiceStub(channel)
+
+    print(f"GetOrderBook against {LEVELS_PER_SIDE:,} levels a side, over loopback gRPC")
+    print(f"{'num_levels':>10} {'book':>10} {'polls/s':>9} {'bytes':>9}")
+    for num_levels in (0, 10, 1):
+        for book_changes in (True, False):
+            rate, size = await poll(stub, engine, num_levels, book_changes)
+            book = "changing" if book_changes else "unchanged"
+            print(f"{num_levels:>10} {book:>10} {rate:>9,.0f} {size:>9,}")
+
+    await channel.close()
+    await server.stop(None)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        # engine logs go under the working directory
+        os.chdir(directory)
+        asyncio.run(main())
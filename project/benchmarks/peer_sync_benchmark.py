@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proto.matching_service_pb2 as pb2
+from engine.cancel_fairy import CancelFairy
+from engine.match_engine import MatchEngine
+from engine.synchronizer import OrderBookSynchronizer
+from network.grpc_server import serve_ME
+
+NUM_ORDERS = 20_000
+SYMBOLS = ["AAA", "BBB", "CCC", "DDD"]
+ADDRESSES = ["127.0.0.1:50073", "127.0.0.1:50074"]
+
+
+def make_engine(index: int, flush_interval_ms: float) -> MatchEngine:
+    address = ADDRESSES[index]
+    peers = [peer for peer in ADDRESSES if peer != address]
+    return MatchEngine(
+        f"bench-{index}",
+        address,
+        OrderBookSynchronizer(
+            f"bench-{index}", address, peers, flush_interval_ms=flush_interval_ms
+        ),
+        CancelFairy(f"bench-{index}", address, peers),
+        engine_number=index,
+    )
+
+
+def caught_up(sender: MatchEngine, receiver: MatchEngine) -> bool:
+    """Whether receiver holds sender's current top of every book"""
+    for symbol, orderbook in sender.orderbooks.items():
+        best_bid, _, best_ask, _ = orderbook.get_bbo()
+        held = receiver.synchronizer.global_best_prices.get(symbol, {}).get(
+            sender.address
+        )
+        expected = (
+            None if best_bid is None else orderbook.to_price(best_bid),
+            None if best_ask is None else orderbook.to_price(best_ask),
+        )
+        if held is None or (held[1], held[3]) != expected:
+            return False
+    return True
+
+
+async def run(flush_interval_ms: float):
+    """Submit orders to one engine and measure what its synchronizer sends
+    the other, and how long after the last order the other is up to date"""
+    engines = [make_engine(i, flush_interval_ms) for i in range(len(ADDRESSES))]
+    servers = [await serve_ME(e, e.address) for e in engines]
+    for engine in engines:
+        engine.register_client("bench")
+        await engine.start_synchronizer()
+    sender, receiver = engines
+
+    random.seed(4)
+    start = time.perf_counter()
+    for _ in range(NUM_ORDERS):
+        quantity = random.randint(1, 10)
+        await sender.submit_order(
+            pb2.OrderRequest(
+                symbol=random.choice(SYMBOLS),
+                side=random.choice(["BUY", "SELL"]),
+                price=round(random.gauss(100, 0.5), 2),
+                quantity=quantity,
+                remaining_quantity=quantity,
+                client_id="bench",
+                engine_origin_addr=sender.address,
+            )
+        )
+    elapsed = time.perf_counter() - start
+    while not caught_up(sender, receiver):
+        await asyncio.sleep(0.0005)
+    lag = time.perf_counter() - start - elapsed
+
+    synchronizer = sender.synchronizer
+    print(
+        f"{flush_interval_ms:>9} {NUM_ORDERS / elapsed:>9,.0f} "
+        f"{synchronizer.flushes:>8,} {synchronizer.updates_sent:>8,} "
+        f"{synchronizer.bytes_sent:>9,} {lag * 1e3:>8.1f}"
+    )
+
+    for engine, server in zip(engines, servers):
+        await engine.synchronizer.stop()
+        await server.stop(None)
+
+
+async def main():
+    logging.disable(logging.CRITICAL)
+    print(
+        f"{NUM_ORDERS:,} orders over {len(SYMBOLS)} symbols to one of two engines, "
+        "over loopback gRPC"
+    )
+    print(
+        f"{'flush ms':>9} {'orders/s':>9} {'flushes':>8} {'updates':>8} "
+        f"{'bytes':>9} {'lag ms':>8}"
+    )
+    for flush_interval_ms in (0, 2, 10):
+        await run(flush_interval_ms)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        # engine logs go under the working directory
+        os.chdir(directory)
+        asyncio.run(main())
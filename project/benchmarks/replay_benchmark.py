@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder
+from common.orderbook import OrderBook
+
+NUM_ORDERS = 100_000
+BATCH_SIZE = 1_000
+
+
+def generate_orders(num_orders: int):
+    """Random limit orders around 100 with overlapping sides, so many of them trade"""
+    random.seed(7)
+    orders = []
+    for i in range(num_orders):
+        side = random.choice(["BUY", "SELL"])
+        price_ticks = round(random.gauss(10_000, 50))
+        quantity = random.randint(1, 100)
+        orders.append(
+            CompactOrder(
+                order_id=i + 1,
+                symbol="BENCH",
+                side=side,
+                price=price_ticks / 100,
+                price_ticks=price_ticks,
+                quantity=quantity,
+                remaining_quantity=quantity,
+                timestamp=i,
+                client_id=f"client-{i % 10}",
+                engine_origin_addr="127.0.0.1:50051",
+            )
+        )
+    return orders
+
+
+def replay_one_by_one(orderbook: OrderBook, orders, active_orders) -> int:
+    num_fills = 0
+    for order in orders:
+        fills = orderbook.add_order(order, active_orders)
+        num_fills += len(fills["incoming_fills"])
+    return num_fills
+
+
+def replay_batched(orderbook: OrderBook, orders, active_orders) -> int:
+    num_fills = 0
+    for i in range(0, len(orders), BATCH_SIZE):
+        fills = orderbook.add_orders(orders[i : i + BATCH_SIZE], active_orders)
+        num_fills += len(fills)
+    return num_fills
+
+
+def run(name: str, replay):
+    orders = generate_orders(NUM_ORDERS)
+    active_orders = {order.order_id: order for order in orders}
+    orderbook = OrderBook("BENCH")
+
+    start = time.perf_counter_ns()
+    num_fills = replay(orderbook, orders, active_orders)
+    elapsed = time.perf_counter_ns() - start
+
+    print(f"{name}:")
+    print(f"\t{num_fills} matches, {len(orderbook.order_nodes)} orders left resting")
+    print(f"\t{elapsed / NUM_ORDERS:.0f} ns/order")
+    return elapsed
+
+
+def main():
+    print(f"replaying {NUM_ORDERS} orders")
+    single = run("add_order per order", replay_one_by_one)
+    batched = run(f"add_orders in batches of {BATCH_SIZE}", replay_batched)
+    print(f"batched replay takes {batched / single:.0%} of the per-order time")
+
+
+if __name__ == "__main__":
+    main()
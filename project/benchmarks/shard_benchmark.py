@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.cancel_fairy import CancelFairy
+from engine.match_engine import MatchEngine
+from engine.shards import ShardPool
+from engine.synchronizer import OrderBookSynchronizer
+import proto.matching_service_pb2 as pb2
+
+NUM_ORDERS = 40_000
+NUM_SYMBOLS = 8
+NUM_PRODUCERS = 64
+SHARD_COUNTS = [1, 2, 4]
+ADDRESS = "127.0.0.1:50051"
+
+
+def generate_orders(num_orders: int):
+    """Random limit orders spread evenly over NUM_SYMBOLS symbols"""
+    random.seed(5)
+    orders = []
+    for i in range(num_orders):
+        price_ticks = round(random.gauss(10_000, 50))
+        quantity = random.randint(1, 100)
+        orders.append(
+            pb2.OrderRequest(
+                symbol=f"SYM{i % NUM_SYMBOLS}",
+                side=random.choice(["BUY", "SELL"]),
+                price=price_ticks / 100,
+                price_ticks=price_ticks,
+                quantity=quantity,
+                remaining_quantity=quantity,
+                client_id=f"client-{i % 10}",
+                engine_origin_addr=ADDRESS,
+            )
+        )
+    return orders
+
+
+async def produce(engine: MatchEngine, orders):
+    for order in orders:
+        await engine.submit_order(order)
+
+
+async def run(name: str, shards=None) -> float:
+    engine = MatchEngine(
+        "bench",
+        ADDRESS,
+        OrderBookSynchronizer("bench", ADDRESS),
+        CancelFairy("bench", ADDRESS),
+        shards=shards,
+    )
+    for i in range(10):
+        engine.register_client(f"client-{i}")
+    orders = generate_orders(NUM_ORDERS)
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(produce(engine, orders[i::NUM_PRODUCERS]) for i in range(NUM_PRODUCERS))
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{name}:")
+    print(f"\t{NUM_ORDERS / elapsed:,.0f} orders/s, {engine.num_fills} fills queued")
+    if shards is not None:
+        print(f"\t{shards.commands / shards.batches:.1f} commands per batch")
+    return elapsed
+
+
+async def main():
+    logging.disable(logging.CRITICAL)
+    print(f"{os.cpu_count()} cpus, {NUM_SYMBOLS} symbols, {NUM_PRODUCERS} producers")
+    await run("books in the front end process")
+    for num_shards in SHARD_COUNTS:
+        shards = ShardPool(num_shards)
+        shards.start()
+        try:
+            await run(f"{num_shards} shard workers", shards)
+        finally:
+            shards.close()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        # engine logs go under the working directory
+        os.chdir(directory)
+        asyncio.run(main())
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import CompactOrder
+from engine import snapshot
+from engine.cancel_fairy import ActiveOrder, CancelFairy
+from engine.match_engine import MatchEngine
+from engine.synchronizer import OrderBookSynchronizer
+
+NUM_ORDERS = 1_000_000
+SYMBOLS = ["AAPL", "MSFT", "TSLA", "NVDA"]
+# one symbol has a price band
+PRICE_BANDS = {"NVDA": (50.00, 150.00)}
+ENGINE_ADDR = "127.0.0.1:50051"
+
+
+def new_engine(snapshot_path: str) -> MatchEngine:
+    engine = MatchEngine(
+        engine_id="engine_0",
+        engine_addr=ENGINE_ADDR,
+        synchronizer=OrderBookSynchronizer("engine_0", ENGINE_ADDR),
+        cancel_fairy=CancelFairy("engine_0", ENGINE_ADDR),
+        price_bands=PRICE_BANDS,
+        snapshot_path=snapshot_path,
+    )
+    engine.logger.setLevel(logging.WARNING)
+    return engine
+
+
+def fill_engine(engine: MatchEngine, num_orders: int):
+    """Rest num_orders orders on engine, bids below 100 and asks above"""
+    random.seed(3)
+    batches = {symbol: [] for symbol in SYMBOLS}
+    for i in range(num_orders):
+        symbol = SYMBOLS[i % len(SYMBOLS)]
+        side = random.choice(["BUY", "SELL"])
+        offset = round(abs(random.gauss(0, 500))) + 1
+        price_ticks = 10_000 - offset if side == "BUY" else 10_000 + offset
+        price_ticks = min(max(price_ticks, 5_000), 15_000)
+        quantity = random.randint(1, 100)
+        order = CompactOrder(
+            order_id=engine.order_ids.next_id(),
+            symbol=symbol,
+            side=side,
+            price=price_ticks / 100,
+            price_ticks=price_ticks,
+            quantity=quantity,
+            remaining_quantity=quantity,
+            timestamp=time.time_ns(),
+            client_id=f"client-{i % 100}",
+            engine_origin_addr=ENGINE_ADDR,
+            client_order_id=f"{i:08d}-0000-4000-8000-000000000000",
+        )
+        engine.orders[order.order_id] = order
+        engine.cancel_fairy.active_orders[order.order_id] = ActiveOrder(
+            quantity, ENGINE_ADDR, order
+        )
+        engine.fill_routing_table[order.client_id] = ENGINE_ADDR
+        batches[symbol].append(order)
+
+    for symbol, orders in batches.items():
+        engine.create_orderbook(symbol)
+        fills = engine.orderbooks[symbol].add_orders(
+            orders, engine.cancel_fairy.active_orders
+        )
+        assert len(fills) == 0
+
+
+async def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "engine_0.snapshot")
+
+        engine = new_engine(path)
+        fill_engine(engine, NUM_ORDERS)
+
+        # the part of a save that holds up the event loop
+        start = time.perf_counter()
+        snapshot.snapshot_rows(engine)
+        copy_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await engine.save_snapshot()
+        save_elapsed = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+        restored = new_engine(path)
+        start = time.perf_counter()
+        restored.load_snapshot()
+        load_elapsed = time.perf_counter() - start
+
+        for symbol in SYMBOLS:
+            assert engine.orderbooks[symbol].get_depth() == (
+                restored.orderbooks[symbol].get_depth()
+            )
+            assert type(engine.orderbooks[symbol]) is type(restored.orderbooks[symbol])
+        assert len(restored.orders) == len(engine.cancel_fairy.active_orders)
+        assert restored.order_ids.sequence == engine.order_ids.sequence
+
+    print(f"{NUM_ORDERS} resting orders over {len(SYMBOLS)} symbols")
+    print(f"snapshot: {size / 1e6:.1f} MB, {size / NUM_ORDERS:.0f} bytes/order")
+    print(
+        f"save:     {save_elapsed:.2f} s, {copy_elapsed:.2f} s of it on the event loop"
+    )
+    print(
+        f"restore:  {load_elapsed:.2f} s ({load_elapsed / NUM_ORDERS * 1e6:.2f} us/order)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
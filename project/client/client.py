@@ -7,7 +7,7 @@ import asyncio
 import random
 from datetime import datetime as dt
 import pytz
-from typing import List
+from typing import Dict, List
 import time
 import uuid
 
@@ -17,6 +17,8 @@ from common.order import (
     Side,
     OrderStatus,
     Fill,
+    price_to_ticks,
+    ticks_to_price,
     pretty_print_FillResponse,
     pretty_print_OrderRequest,
 )
@@ -27,6 +29,67 @@ import proto.matching_service_pb2 as pb2
 import proto.matching_service_pb2_grpc as pb2_grpc
 
 
+class OrderSession:
+    """Client end of an OrderSession stream.
+
+    submit and cancel may be awaited concurrently: each request goes out on the
+    stream as soon as it is made and resolves when its ack comes back, so many
+    orders can be in flight at once.
+    """
+
+    def __init__(self, stub: pb2_grpc.MatchingServiceStub):
+        self.requests = asyncio.Queue()
+        # request_id -> future of the request's SessionResponse
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.next_request_id = 0
+        self.call = stub.OrderSession(self._outgoing())
+        self.reader = asyncio.create_task(self._read_acks())
+
+    async def submit(self, order_msg: pb2.OrderRequest) -> pb2.SubmitOrderResponse:
+        return (await self._send(pb2.SessionRequest(order=order_msg))).order
+
+    async def cancel(
+        self, cancel_msg: pb2.CancelOrderRequest
+    ) -> pb2.CancelOrderResponse:
+        return (await self._send(pb2.SessionRequest(cancel=cancel_msg))).cancel
+
+    async def close(self):
+        """End the stream once everything sent so far is acked"""
+        self.requests.put_nowait(None)
+        await self.reader
+
+    def _send(self, request: pb2.SessionRequest) -> asyncio.Future:
+        if self.reader.done():
+            raise ConnectionError("order session is closed")
+        self.next_request_id += 1
+        request.request_id = self.next_request_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request.request_id] = future
+        self.requests.put_nowait(request)
+        return future
+
+    async def _outgoing(self):
+        while True:
+            request = await self.requests.get()
+            if request is None:
+                return
+            yield request
+
+    async def _read_acks(self):
+        error = ConnectionError("order session closed before the ack")
+        try:
+            async for ack in self.call:
+                future = self.pending.pop(ack.request_id, None)
+                if future is not None and not future.done():
+                    future.set_result(ack)
+        except grpc.aio.AioRpcError as e:
+            error = e
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+
 class Client:
     """gRPC client for order submission"""
 
@@ -62,6 +125,15 @@ class Client:
         self.connected_to_me = False
         self.direct_connect = direct_connect
         self.active_orders = []
+        # symbol -> {"bids": {price_ticks: quantity}, "asks": {...}}, kept by
+        # stream_market_data
+        self.books = {}
+        # fills pushed by the engine and not yet taken by get_fills
+        self.received_fills = []
+        self.last_fill_sequence = 0
+        self.fill_stream_task = None
+        # orders and cancels go over this stream, once opened, instead of unary RPCs
+        self.order_session = None
 
         self.running = False
         self.order_running = False
@@ -79,51 +151,125 @@ class Client:
             # self.logger.info(f"{self.name} submitted order with ID: {order.order_id} at time {send_time}")
             self.logger.info(f"{self.name}: {order.pretty_print()}")
 
-            eastern = pytz.timezone("US/Eastern")
-            order_msg = pb2.OrderRequest(
-                order_id=str(order.order_id),
-                symbol=str(order.symbol),
-                side=str(order.side.name),
-                price=float(order.price),
-                quantity=int(order.quantity),
-                remaining_quantity=int(order.quantity),
-                client_id=str(order.client_id),
-                engine_origin_addr=str(self.me_addr),
-                timestamp=(
-                    int(order.timestamp.astimezone(eastern).timestamp() * 10**9)
-                ),
-            )
+            order_msg = self._order_request(order)
             self.logger.debug(f"Sent OrderRequest: {order_msg}")
-            response = await self.stub.SubmitOrder(order_msg)
-
-            if response.status == "ERROR":
-                self.logger.error(
-                    f"Received response to order {order.pretty_print()}: {response.status} {response.error_message}"
-                )
+            if self.order_session is None:
+                response = await self.stub.SubmitOrder(order_msg)
+            else:
+                response = await self.order_session.submit(order_msg)
+            self._handle_submit_response(order, response)
 
             receive_time = time.time()
             self.latencies.append(receive_time - send_time)
 
+    async def submit_orders(self, orders: List[Order]):
+        """Submit orders in one SubmitOrders call"""
+        if not self.connected_to_me:
+            self.logger.error("No matching engine recorded, orders rejected")
+            return
+        if not orders:
+            return
+        self.active_orders.extend(orders)
+        send_time = time.time()
+        self.logger.info(f"{self.name}: batch of {len(orders)} orders")
+
+        request = pb2.SubmitOrdersRequest(
+            orders=[self._order_request(order) for order in orders]
+        )
+        self.logger.debug(f"Sent SubmitOrdersRequest: {request}")
+        response = await self.stub.SubmitOrders(request)
+        for order, item in zip(orders, response.responses):
+            self._handle_submit_response(order, item)
+
+        # each order in the batch waited the whole round trip
+        receive_time = time.time()
+        self.latencies.extend([receive_time - send_time] * len(orders))
+
+    def _order_request(self, order: Order) -> pb2.OrderRequest:
+        eastern = pytz.timezone("US/Eastern")
+        return pb2.OrderRequest(
+            client_order_id=str(order.client_order_id),
+            symbol=str(order.symbol),
+            side=str(order.side.name),
+            price=float(order.price),
+            quantity=int(order.quantity),
+            remaining_quantity=int(order.quantity),
+            client_id=str(order.client_id),
+            engine_origin_addr=str(self.me_addr),
+            timestamp=(int(order.timestamp.astimezone(eastern).timestamp() * 10**9)),
+        )
+
+    def _handle_submit_response(self, order: Order, response) -> None:
+        if response.status == "ERROR":
+            self.logger.error(
+                f"Received response to order {order.pretty_print()}: {response.status} {response.error_message}"
+            )
+        else:
+            # the engine assigns the id used to cancel this order
+            order.order_id = response.order_id
+
     async def get_fills(self):
-        fills = []
+        """Fills the engine has pushed since the last call"""
         if not self.connected_to_me:
             self.logger.error("No matching engine recorded")
-        else:
+        fills, self.received_fills = self.received_fills, []
+        return fills
+
+    async def receive_fills(self):
+        """Keep a GetFills stream open, collecting fills for get_fills as the
+        engine pushes them, and reopen it where it left off if it drops"""
+        while self.connected_to_me:
             fill_stream = self.stub.GetFills(
                 pb2.FillRequest(
                     client_id=self.name,
                     engine_destination_addr=self.me_addr,  # NOTE: Unused
                     timeout=1_000,  # NOTE: Unused
+                    resume_after_sequence=self.last_fill_sequence,
                 )
             )
+            try:
+                async for fill in fill_stream:
+                    self.last_fill_sequence = fill.sequence_number
+                    self.received_fills.append(fill)
+                    self.logger.info(f"FILLED: {pretty_print_FillResponse(fill)}")
+            except grpc.aio.AioRpcError as e:
+                self.logger.warning(f"fill stream ended: {e.code()}, reconnecting")
+            await asyncio.sleep(1)
+
+    async def open_order_session(self):
+        """Send orders and cancels over one OrderSession stream from now on, so
+        several can be in flight at once"""
+        if not self.connected_to_me:
+            self.logger.error("No matching engine recorded")
+        elif self.order_session is None:
+            self.order_session = OrderSession(self.stub)
+
+    async def close_order_session(self):
+        """Go back to one RPC per order once the session's requests are acked"""
+        if self.order_session is not None:
+            session, self.order_session = self.order_session, None
+            await session.close()
+
+    async def stream_market_data(self, symbols: List[str], depth: int = 0):
+        """Keep self.books up to date with the engine's books for symbols, depth
+        levels a side (0 for all of them), until the stream ends"""
+        if not self.connected_to_me:
+            self.logger.error("No matching engine recorded")
+            return
 
-            fill = await fill_stream.read()
-            while fill:
-                fills.append(fill)
-                self.logger.info(f"FILLED: {pretty_print_FillResponse(fill)}")
-                fill = await fill_stream.read()
-
-        return fills
+        stream = self.stub.SubscribeMarketData(
+            pb2.MarketDataRequest(symbols=symbols, depth=depth)
+        )
+        async for update in stream:
+            if update.snapshot:
+                self.books[update.symbol] = {"bids": {}, "asks": {}}
+            book = self.books[update.symbol]
+            for side, levels in (("bids", update.bids), ("asks", update.asks)):
+                for level in levels:
+                    if level.quantity:
+                        book[side][level.price_ticks] = level.quantity
+                    else:
+                        book[side].pop(level.price_ticks, None)
 
     async def register(self):
         if not self.direct_connect:
@@ -163,6 +309,8 @@ class Client:
             )
 
             self.connected_to_me = True
+            if "SUCCESSFUL" in response.status and self.fill_stream_task is None:
+                self.fill_stream_task = asyncio.create_task(self.receive_fills())
             return response
         except Exception as e:
             self.logger.error(f"match engine registration error: {e}")
@@ -244,16 +392,17 @@ class Client:
 
         if gen_quantity % 2 == 0:
             gen_side = Side.SELL
-            gen_price = round(random.uniform(90, 110), 2)
+            gen_price_ticks = random.randint(price_to_ticks(90), price_to_ticks(110))
         else:
             gen_side = Side.BUY
-            gen_price = round(random.uniform(90, 110), 2)
+            gen_price_ticks = random.randint(price_to_ticks(90), price_to_ticks(110))
 
         return Order(
-            order_id=str(uuid.uuid4()),
+            order_id=0,
+            client_order_id=str(uuid.uuid4()),
             symbol=random.choice(order_symbols),
             side=gen_side,
-            price=gen_price,
+            price=ticks_to_price(gen_price_ticks),
             quantity=gen_quantity,
             remaining_quantity=gen_quantity,
             status=OrderStatus.NEW,
@@ -266,6 +415,27 @@ class Client:
         self.logger.info(f"cancelling order {pretty_print_OrderRequest(order)}")
         self.logger.debug(f"cancelling full order {order}")
 
+        cancel_msg = self._cancel_request(order)
+        if self.order_session is None:
+            response = await self.stub.CancelOrder(cancel_msg)
+        else:
+            response = await self.order_session.cancel(cancel_msg)
+        self._handle_cancel_response(response)
+
+    async def cancel_orders(self, orders: List[Order]):
+        """Cancel orders in one CancelOrders call"""
+        if not orders:
+            return
+        self.logger.info(f"cancelling batch of {len(orders)} orders")
+        response = await self.stub.CancelOrders(
+            pb2.CancelOrdersRequest(
+                cancels=[self._cancel_request(order) for order in orders]
+            )
+        )
+        for item in response.responses:
+            self._handle_cancel_response(item)
+
+    def _cancel_request(self, order: Order) -> pb2.CancelOrderRequest:
         eastern = pytz.timezone("US/Eastern")
         #        order_obj = {
         #            "order_id" : order.order_id,
@@ -281,6 +451,7 @@ class Client:
 
         order_obj = pb2.OrderRequest(
             order_id=order.order_id,
+            client_order_id=order.client_order_id,
             symbol=order.symbol,
             side=order.side.name,
             price=order.price,
@@ -291,14 +462,14 @@ class Client:
             timestamp=(int(order.timestamp.astimezone(eastern).timestamp() * 10**9)),
         )
 
-        response = await self.stub.CancelOrder(
-            pb2.CancelOrderRequest(
-                order_id=order.order_id,
-                client_id=order.client_id,
-                order_record=order_obj,
-            )
+        return pb2.CancelOrderRequest(
+            order_id=order.order_id,
+            client_order_id=order.client_order_id,
+            client_id=order.client_id,
+            order_record=order_obj,
         )
 
+    def _handle_cancel_response(self, response) -> None:
         if response.status == "SUCCESSFUL":
             self.logger.info(
                 f"cancel was successful for quantity {response.quantity_cancelled}"
@@ -308,6 +479,5 @@ class Client:
 
     async def cancel_all_orders(self):
         self.logger.info(f"cancelling all orders ({len(self.active_orders)} orders)")
-        for order in self.active_orders:
-            await self.cancel_order(order)
-            self.active_orders.remove(order)
+        orders, self.active_orders = self.active_orders, []
+        await self.cancel_orders(orders)
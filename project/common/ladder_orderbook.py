@@ -0,0 +1,232 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .order import DEFAULT_TICK_SIZE, CompactOrder, IdSequence
+from .orderbook import FillBuffer, OrderBook, OrderNode, PriceLevel
+
+
+class LadderLevel(PriceLevel):
+    """PriceLevel that mirrors its aggregates into its ladder's arrays"""
+
+    def __init__(self, price: int, side: "LadderSide"):
+        super().__init__(price)
+        self.side = side
+        self.slot = side.slot(price)
+
+    def append(self, order: CompactOrder) -> OrderNode:
+        node = super().append(order)
+        self.side.quantity[self.slot] = self.total_quantity
+        self.side.order_count[self.slot] = self.order_count
+        return node
+
+    def fill(self, node: OrderNode, quantity: int) -> None:
+        super().fill(node, quantity)
+        self.side.quantity[self.slot] = self.total_quantity
+
+    def remove(self, node: OrderNode) -> None:
+        super().remove(node)
+        self.side.quantity[self.slot] = self.total_quantity
+        self.side.order_count[self.slot] = self.order_count
+
+
+class LadderSide:
+    """One side of a LadderOrderBook, stored densely over a fixed tick band.
+
+    Levels live in a list of slots ordered from the best possible price to the
+    worst (ascending ticks for asks, descending for bids), with per-level
+    quantity, order count and occupancy mirrored into NumPy arrays and a
+    pointer to the best occupied slot. The same object serves OrderBook as both
+    the price -> PriceLevel map and the sorted price index for its side.
+    """
+
+    def __init__(self, min_tick: int, max_tick: int, descending: bool):
+        self.min_tick = min_tick
+        self.max_tick = max_tick
+        self.num_slots = max_tick - min_tick + 1
+        # price = origin + sign * slot
+        self.sign = -1 if descending else 1
+        self.origin = max_tick if descending else min_tick
+
+        self.levels: List[Optional[LadderLevel]] = [None] * self.num_slots
+        self.quantity = np.zeros(self.num_slots, dtype=np.int64)
+        self.order_count = np.zeros(self.num_slots, dtype=np.int64)
+        self.occupied = np.zeros(self.num_slots, dtype=bool)
+        self.num_levels = 0
+        # best occupied slot, num_slots when the side is empty
+        self.best_slot = self.num_slots
+
+    def __len__(self) -> int:
+        return self.num_levels
+
+    def __contains__(self, price: int) -> bool:
+        return self.get(price) is not None
+
+    def __getitem__(self, price: int) -> LadderLevel:
+        level = self.get(price)
+        if level is None:
+            raise KeyError(price)
+        return level
+
+    def __setitem__(self, price: int, level: LadderLevel) -> None:
+        slot = self.slot(price)
+        self.levels[slot] = level
+        self.occupied[slot] = True
+        self.num_levels += 1
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate occupied prices from best to worst"""
+        return iter(self.prices(self.occupied_slots()).tolist())
+
+    def __reversed__(self) -> Iterator[int]:
+        """Iterate occupied prices from worst to best"""
+        return iter(self.prices(self.occupied_slots()[::-1]).tolist())
+
+    def slot(self, price: int) -> int:
+        if not self.min_tick <= price <= self.max_tick:
+            raise ValueError(
+                f"price {price} ticks is outside the ladder band "
+                f"[{self.min_tick}, {self.max_tick}]"
+            )
+        return self.sign * (price - self.origin)
+
+    def prices(self, slots: np.ndarray) -> np.ndarray:
+        return self.origin + self.sign * slots
+
+    def get(self, price: int, default=None) -> Optional[LadderLevel]:
+        if self.min_tick <= price <= self.max_tick:
+            level = self.levels[self.sign * (price - self.origin)]
+            if level is not None:
+                return level
+        return default
+
+    def pop(self, price: int, default=None) -> Optional[LadderLevel]:
+        level = self.get(price)
+        if level is None:
+            return default
+        self.levels[level.slot] = None
+        self.quantity[level.slot] = 0
+        self.order_count[level.slot] = 0
+        self.occupied[level.slot] = False
+        self.num_levels -= 1
+        return level
+
+    def items(self):
+        for price in self:
+            yield price, self.get(price)
+
+    def occupied_slots(self) -> np.ndarray:
+        """Slots holding resting orders, best first"""
+        return np.flatnonzero(self.occupied)
+
+    def best(self) -> Optional[int]:
+        if self.best_slot == self.num_slots:
+            return None
+        return self.origin + self.sign * self.best_slot
+
+    def add(self, price: int) -> None:
+        slot = self.slot(price)
+        if slot < self.best_slot:
+            self.best_slot = slot
+
+    def remove(self, price: int) -> None:
+        """Move the best pointer on if the best level was removed"""
+        if self.sign * (price - self.origin) != self.best_slot:
+            return
+        # argmax stops at the first occupied slot past the old best
+        rest = self.occupied[self.best_slot + 1 :]
+        next_slot = int(rest.argmax()) if len(rest) else 0
+        if len(rest) and rest[next_slot]:
+            self.best_slot += 1 + next_slot
+        else:
+            self.best_slot = self.num_slots
+
+
+class LadderOrderBook(OrderBook):
+    """OrderBook for a symbol with a bounded price band.
+
+    Both sides are LadderSides covering [min_price, max_price], so best-price
+    moves, BBO and depth snapshots are array operations instead of dict and
+    sorted-list work. Orders priced outside the band are rejected.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        min_price: float,
+        max_price: float,
+        tick_size: float = DEFAULT_TICK_SIZE,
+        execution_ids: Optional[IdSequence] = None,
+    ):
+        super().__init__(symbol, tick_size, execution_ids, (min_price, max_price))
+
+        self.bids = LadderSide(
+            self.min_price_ticks, self.max_price_ticks, descending=True
+        )
+        self.asks = LadderSide(
+            self.min_price_ticks, self.max_price_ticks, descending=False
+        )
+        self.bid_prices = self.bids
+        self.ask_prices = self.asks
+
+    def add_order(self, order: CompactOrder, active_orders):
+        self._check_band(order)
+        return super().add_order(order, active_orders)
+
+    def add_orders(self, orders: Iterable[CompactOrder], active_orders) -> FillBuffer:
+        # reject the whole batch before matching any of it
+        orders = list(orders)
+        for order in orders:
+            self._check_band(order)
+        return super().add_orders(orders, active_orders)
+
+    def _check_band(self, order: CompactOrder) -> None:
+        if not self.in_band(order.price_ticks):
+            raise ValueError(
+                f"price {order.price} is outside the {self.symbol} price band "
+                f"[{self.to_price(self.min_price_ticks)}, {self.to_price(self.max_price_ticks)}]"
+            )
+
+    def get_depth(self, num_levels: int = 0):
+        """Return (price_ticks, quantity, order_count) for the best num_levels bid
+        and ask levels (every level for 0), best first"""
+        return self._side_depth(self.bids, num_levels), self._side_depth(
+            self.asks, num_levels
+        )
+
+    def _side_depth(self, side: LadderSide, num_levels: int):
+        slots = side.occupied_slots()
+        if num_levels:
+            slots = slots[:num_levels]
+        return list(
+            zip(
+                side.prices(slots).tolist(),
+                side.quantity[slots].tolist(),
+                side.order_count[slots].tolist(),
+            )
+        )
+
+    def _add_level(self, levels: LadderSide, prices: LadderSide, price: int):
+        level = levels[price] = LadderLevel(price, levels)
+        prices.add(price)
+        return level
+
+
+def new_orderbook(
+    symbol: str,
+    tick_size: float = DEFAULT_TICK_SIZE,
+    price_band: Optional[Tuple[float, float]] = None,
+    execution_ids: Optional[IdSequence] = None,
+    ladder: bool = False,
+) -> OrderBook:
+    """Book for symbol, limited to its (min, max) price band if it has one.
+
+    With ladder a banded symbol gets a dense LadderOrderBook rather than an
+    OrderBook; under CPython the ladder matches more slowly than the dict of
+    levels (see benchmarks/ladder_benchmark.py) and only its depth snapshots
+    are quicker, so it is not the default.
+    """
+    if price_band is None or not ladder:
+        return OrderBook(symbol, tick_size, execution_ids, price_band)
+    min_price, max_price = price_band
+    return LadderOrderBook(symbol, min_price, max_price, tick_size, execution_ids)
@@ -1,7 +1,83 @@
+import decimal
+import functools
+import sys
+import time
 from dataclasses import dataclass
 from enum import Enum
 from datetime import datetime
 
+# price increment used for symbols without a configured tick size
+DEFAULT_TICK_SIZE = 0.01
+
+# offset from the monotonic clock to the epoch, fixed once at import
+_MONOTONIC_EPOCH_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
+
+def monotonic_time_ns() -> int:
+    """Nanoseconds since the epoch, read from the monotonic clock so it never steps back"""
+    return time.monotonic_ns() + _MONOTONIC_EPOCH_OFFSET_NS
+
+
+# engine-assigned order and execution ids are 64 bit: the engine number in the
+# top ENGINE_NUMBER_BITS and a per-engine sequence number below them
+ENGINE_NUMBER_BITS = 10
+SEQUENCE_BITS = 64 - ENGINE_NUMBER_BITS
+MAX_ENGINE_NUMBER = (1 << ENGINE_NUMBER_BITS) - 1
+
+
+class IdSequence:
+    """Source of globally unique 64-bit ids for one matching engine"""
+
+    def __init__(self, engine_number: int = 0):
+        if not 0 <= engine_number <= MAX_ENGINE_NUMBER:
+            raise ValueError(
+                f"engine number {engine_number} is outside [0, {MAX_ENGINE_NUMBER}]"
+            )
+        self.engine_number = engine_number
+        self._base = engine_number << SEQUENCE_BITS
+        # last sequence number handed out; ids start at 1 so that 0 can mean
+        # "not assigned yet"
+        self.sequence = 0
+
+    def next_id(self) -> int:
+        self.sequence += 1
+        return self._base | self.sequence
+
+
+def engine_number_of(id: int) -> int:
+    """Number of the engine that assigned an order or execution id"""
+    return id >> SEQUENCE_BITS
+
+
+def sequence_of(id: int) -> int:
+    """Sequence number of an order or execution id within its engine"""
+    return id & ((1 << SEQUENCE_BITS) - 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _tick_decimals(tick_size: float) -> int:
+    """Decimal places needed to write multiples of tick_size exactly"""
+    return max(0, -decimal.Decimal(repr(tick_size)).as_tuple().exponent)
+
+
+def price_to_ticks(price: float, tick_size: float = DEFAULT_TICK_SIZE) -> int:
+    """Convert a price to a whole number of ticks.
+
+    Raises ValueError if price is not a multiple of tick_size; float error
+    smaller than a millionth of a tick is ignored.
+    """
+    ticks = round(price / tick_size)
+    if abs(price / tick_size - ticks) > 1e-6:
+        raise ValueError(
+            f"price {price} is not a multiple of the tick size {tick_size}"
+        )
+    return int(ticks)
+
+
+def ticks_to_price(price_ticks: int, tick_size: float = DEFAULT_TICK_SIZE) -> float:
+    # round off the float error of the product so 9999 ticks of 0.01 is 99.99
+    return round(price_ticks * tick_size, _tick_decimals(tick_size))
+
 
 class Side(Enum):
     BUY = "BUY"
@@ -17,7 +93,7 @@ class OrderStatus(Enum):
 
 @dataclass
 class Order:
-    order_id: str
+    order_id: int
     symbol: str
     side: Side
     price: float
@@ -27,6 +103,7 @@ class Order:
     timestamp: datetime
     client_id: str
     engine_origin_addr: str
+    client_order_id: str = ""
 
     def pretty_print(self) -> str:
         if self.side == Side.SELL:
@@ -35,6 +112,84 @@ class Order:
             return f"BUY {self.quantity} {self.symbol} @{self.price}"
 
 
+class CompactOrder:
+    """Slotted order record for orders held by a matching engine.
+
+    Symbol, side, client and address strings are interned so that the many
+    orders sharing them point at one copy, and timestamp is integer ns since
+    the epoch rather than a datetime.
+    """
+
+    __slots__ = (
+        "order_id",
+        "symbol",
+        "side",
+        "price",
+        "price_ticks",
+        "quantity",
+        "remaining_quantity",
+        "status",
+        "timestamp",
+        "client_id",
+        "engine_origin_addr",
+        "client_order_id",
+    )
+
+    def __init__(
+        self,
+        order_id: int,
+        symbol: str,
+        side: str,
+        price: float,
+        price_ticks: int,
+        quantity: int,
+        remaining_quantity: int,
+        timestamp: int,
+        client_id: str,
+        engine_origin_addr: str,
+        status: OrderStatus = OrderStatus.NEW,
+        client_order_id: str = "",
+    ):
+        self.order_id = order_id
+        self.symbol = sys.intern(symbol)
+        self.side = sys.intern(side)
+        self.price = price
+        self.price_ticks = price_ticks
+        self.quantity = quantity
+        self.remaining_quantity = remaining_quantity
+        self.status = status
+        self.timestamp = timestamp
+        self.client_id = sys.intern(client_id)
+        self.engine_origin_addr = sys.intern(engine_origin_addr)
+        self.client_order_id = client_order_id
+
+    @classmethod
+    def from_request(cls, order_msg) -> "CompactOrder":
+        """Build from an OrderRequest message"""
+        return cls(
+            order_id=order_msg.order_id,
+            symbol=order_msg.symbol,
+            side=order_msg.side,
+            price=order_msg.price,
+            price_ticks=order_msg.price_ticks,
+            quantity=order_msg.quantity,
+            remaining_quantity=order_msg.remaining_quantity,
+            timestamp=order_msg.timestamp,
+            client_id=order_msg.client_id,
+            engine_origin_addr=order_msg.engine_origin_addr,
+            client_order_id=order_msg.client_order_id,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"CompactOrder(order_id={self.order_id!r}, {self.pretty_print()}, "
+            f"remaining_quantity={self.remaining_quantity}, client_id={self.client_id!r})"
+        )
+
+    def pretty_print(self) -> str:
+        return pretty_print_OrderRequest(self)
+
+
 def pretty_print_OrderRequest(order) -> str:
     if order.side == "SELL":
         return f"SELL {order.quantity} {order.symbol} @{order.price}"
@@ -50,8 +205,8 @@ def pretty_print_OrderRequest(order) -> str:
 
 @dataclass
 class Fill:
-    fill_id: str
-    order_id: str
+    fill_id: int
+    order_id: int
     symbol: str
     side: Side
     price: float
@@ -61,6 +216,7 @@ class Fill:
     buyer_id: str
     seller_id: str
     engine_destination_addr: str
+    client_order_id: str = ""
 
     def pretty_print(self) -> str:
         if self.side == Side.SELL:
@@ -69,6 +225,63 @@ class Fill:
             return f"{self.buyer_id} BOUGHT {self.quantity} {self.symbol} @{self.price} from {self.seller_id}"
 
 
+class CompactFill:
+    """Slotted fill record produced by the matching engine.
+
+    Like CompactOrder, shared strings are interned and timestamp is integer ns
+    since the epoch.
+    """
+
+    __slots__ = (
+        "fill_id",
+        "order_id",
+        "symbol",
+        "side",
+        "price",
+        "quantity",
+        "remaining_quantity",
+        "timestamp",
+        "buyer_id",
+        "seller_id",
+        "engine_destination_addr",
+        "client_order_id",
+    )
+
+    def __init__(
+        self,
+        fill_id: int,
+        order_id: int,
+        symbol: str,
+        side: str,
+        price: float,
+        quantity: int,
+        remaining_quantity: int,
+        timestamp: int,
+        buyer_id: str,
+        seller_id: str,
+        engine_destination_addr: str,
+        client_order_id: str = "",
+    ):
+        self.fill_id = fill_id
+        self.order_id = order_id
+        self.symbol = sys.intern(symbol)
+        self.side = sys.intern(side)
+        self.price = price
+        self.quantity = quantity
+        self.remaining_quantity = remaining_quantity
+        self.timestamp = timestamp
+        self.buyer_id = sys.intern(buyer_id)
+        self.seller_id = sys.intern(seller_id)
+        self.engine_destination_addr = sys.intern(engine_destination_addr)
+        self.client_order_id = client_order_id
+
+    def __repr__(self) -> str:
+        return f"CompactFill(fill_id={self.fill_id!r}, {self.pretty_print()})"
+
+    def pretty_print(self) -> str:
+        return pretty_print_FillResponse(self)
+
+
 def pretty_print_FillResponse(fill) -> str:
     if fill.side == "SELL":
         return f"{fill.seller_id} SOLD {fill.quantity} {fill.symbol} @{fill.price} to {fill.buyer_id}"
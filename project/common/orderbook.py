@@ -1,14 +1,354 @@
-from datetime import datetime
-from typing import Dict, List
-from collections import defaultdict
-from .order import Order, Fill
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .order import (
+    DEFAULT_TICK_SIZE,
+    CompactFill,
+    CompactOrder,
+    IdSequence,
+    monotonic_time_ns,
+    pretty_print_FillResponse,
+    price_to_ticks,
+    ticks_to_price,
+)
+
+
+class OrderNode:
+    """Handle to a resting order's slot in its price level queue"""
+
+    __slots__ = ("order", "level", "prev", "next")
+
+    def __init__(self, order: CompactOrder, level: "PriceLevel"):
+        self.order = order
+        self.level = level
+        self.prev: Optional[OrderNode] = None
+        self.next: Optional[OrderNode] = None
+
+
+class PriceLevel:
+    """Time-priority queue of the orders resting at one price, in integer ticks.
+
+    Orders are kept in an intrusive doubly-linked list of OrderNodes so that an
+    order can be unlinked in O(1) from anywhere in the queue given its node.
+    The level's total remaining quantity and order count are kept up to date on
+    every append, fill and removal.
+    """
+
+    def __init__(self, price: int):
+        self.price = price
+        self.head: Optional[OrderNode] = None
+        self.tail: Optional[OrderNode] = None
+        self.order_count = 0
+        self.total_quantity = 0
+
+    def __len__(self) -> int:
+        return self.order_count
+
+    def __iter__(self) -> Iterator[CompactOrder]:
+        node = self.head
+        while node is not None:
+            yield node.order
+            node = node.next
+
+    def nodes(self) -> Iterator[OrderNode]:
+        """Iterate nodes in time priority; the yielded node may be removed"""
+        node = self.head
+        while node is not None:
+            next_node = node.next
+            yield node
+            node = next_node
+
+    def append(self, order: CompactOrder) -> OrderNode:
+        node = OrderNode(order, self)
+        if self.tail is None:
+            self.head = node
+        else:
+            node.prev = self.tail
+            self.tail.next = node
+        self.tail = node
+        self.order_count += 1
+        self.total_quantity += order.remaining_quantity
+        return node
+
+    def fill(self, node: OrderNode, quantity: int) -> None:
+        """Take quantity off a resting order in this level"""
+        node.order.remaining_quantity -= quantity
+        self.total_quantity -= quantity
+
+    def remove(self, node: OrderNode) -> None:
+        if node.prev is None:
+            self.head = node.next
+        else:
+            node.prev.next = node.next
+        if node.next is None:
+            self.tail = node.prev
+        else:
+            node.next.prev = node.prev
+        node.prev = node.next = None
+        self.order_count -= 1
+        self.total_quantity -= node.order.remaining_quantity
+
+
+class PriceLevelIndex:
+    """Sorted set of the tick prices resting on one side of an order book.
+
+    Keys are kept in ascending order with the best price last, so the best level
+    is read and removed in O(1) and new levels are placed by bisection. Ask
+    prices are stored negated so that the lowest ask sorts last.
+    """
+
+    def __init__(self, descending: bool):
+        self.sign = 1 if descending else -1
+        self.keys: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, price: int) -> bool:
+        return self._find(self.sign * price) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate prices from best to worst"""
+        for key in reversed(self.keys):
+            yield self.sign * key
+
+    def __reversed__(self) -> Iterator[int]:
+        """Iterate prices from worst to best"""
+        for key in self.keys:
+            yield self.sign * key
+
+    def _find(self, key: int) -> Optional[int]:
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def best(self) -> Optional[int]:
+        if not self.keys:
+            return None
+        return self.sign * self.keys[-1]
+
+    def add(self, price: int) -> None:
+        key = self.sign * price
+        if not self.keys or key > self.keys[-1]:
+            self.keys.append(key)
+        elif self._find(key) is None:
+            insort(self.keys, key)
+
+    def remove(self, price: int) -> None:
+        key = self.sign * price
+        if self.keys and self.keys[-1] == key:
+            self.keys.pop()
+            return
+        i = self._find(key)
+        if i is not None:
+            del self.keys[i]
+
+
+class FillBuffer:
+    """Columnar record of the matches made by an OrderBook.
+
+    Each row is one match between an incoming and a resting order: its
+    execution id, the two orders, the tick price and quantity traded, both orders' remaining quantity
+    after the match and the match timestamp in ns. Rows are appended to flat
+    columns; the fills handed out per client are BufferedFill views onto a row,
+    so nothing is formatted until a consumer reads a field.
+    """
+
+    def __init__(self, tick_size: float = DEFAULT_TICK_SIZE):
+        self.tick_size = tick_size
+        self.fill_id = array("Q")
+        self.incoming_orders: List[CompactOrder] = []
+        self.resting_orders: List[CompactOrder] = []
+        self.price_ticks = array("q")
+        self.quantity = array("q")
+        self.incoming_remaining = array("q")
+        self.resting_remaining = array("q")
+        self.timestamp = array("q")
+
+    def __len__(self) -> int:
+        return len(self.quantity)
+
+    def append(
+        self,
+        fill_id: int,
+        incoming_order: CompactOrder,
+        resting_order: CompactOrder,
+        price_ticks: int,
+        quantity: int,
+        timestamp: int,
+    ) -> None:
+        self.fill_id.append(fill_id)
+        self.incoming_orders.append(incoming_order)
+        self.resting_orders.append(resting_order)
+        self.price_ticks.append(price_ticks)
+        self.quantity.append(quantity)
+        self.incoming_remaining.append(incoming_order.remaining_quantity)
+        self.resting_remaining.append(resting_order.remaining_quantity)
+        self.timestamp.append(timestamp)
+
+    def incoming_fill(self, i: int) -> Tuple[str, "BufferedFill"]:
+        """(client_id, fill) for the incoming order of row i"""
+        return self.incoming_orders[i].client_id, BufferedFill(self, i, True)
+
+    def resting_fill(self, i: int) -> Tuple[str, "BufferedFill"]:
+        """(client_id, fill) for the resting order of row i"""
+        return self.resting_orders[i].client_id, BufferedFill(self, i, False)
+
+    def to_dict(self) -> Dict[str, List[Tuple[str, "BufferedFill"]]]:
+        """Fills in the {"incoming_fills": [...], "resting_fills": [...]} form of add_order"""
+        return {
+            "incoming_fills": [self.incoming_fill(i) for i in range(len(self))],
+            "resting_fills": [self.resting_fill(i) for i in range(len(self))],
+        }
+
+
+class BufferedFill:
+    """One order's side of a FillBuffer row, read through the CompactFill fields.
+
+    Fields are looked up in the buffer's columns when accessed, and the price
+    is only converted from ticks then, e.g. by GetFills or route_fill.
+    """
+
+    __slots__ = ("fills", "row", "incoming")
+
+    def __init__(self, fills: FillBuffer, row: int, incoming: bool):
+        self.fills = fills
+        self.row = row
+        self.incoming = incoming
+
+    def __repr__(self) -> str:
+        return f"BufferedFill(fill_id={self.fill_id!r}, {self.pretty_print()})"
+
+    @property
+    def order(self) -> CompactOrder:
+        if self.incoming:
+            return self.fills.incoming_orders[self.row]
+        return self.fills.resting_orders[self.row]
+
+    @property
+    def fill_id(self) -> int:
+        return self.fills.fill_id[self.row]
+
+    @property
+    def order_id(self) -> int:
+        return self.order.order_id
+
+    @property
+    def client_order_id(self) -> str:
+        return self.order.client_order_id
+
+    @property
+    def symbol(self) -> str:
+        return self.order.symbol
+
+    @property
+    def side(self) -> str:
+        return self.order.side
+
+    @property
+    def price(self) -> float:
+        return ticks_to_price(self.fills.price_ticks[self.row], self.fills.tick_size)
+
+    @property
+    def quantity(self) -> int:
+        return self.fills.quantity[self.row]
+
+    @property
+    def remaining_quantity(self) -> int:
+        if self.incoming:
+            return self.fills.incoming_remaining[self.row]
+        return self.fills.resting_remaining[self.row]
+
+    @property
+    def timestamp(self) -> int:
+        return self.fills.timestamp[self.row]
+
+    @property
+    def buyer_id(self) -> str:
+        incoming_order = self.fills.incoming_orders[self.row]
+        if incoming_order.side == "BUY":
+            return incoming_order.client_id
+        return self.fills.resting_orders[self.row].client_id
+
+    @property
+    def seller_id(self) -> str:
+        incoming_order = self.fills.incoming_orders[self.row]
+        if incoming_order.side == "BUY":
+            return self.fills.resting_orders[self.row].client_id
+        return incoming_order.client_id
+
+    @property
+    def engine_destination_addr(self) -> str:
+        return self.fills.incoming_orders[self.row].engine_origin_addr
+
+    def to_compact(self) -> CompactFill:
+        """A CompactFill copy of this fill that does not hold on to the buffer"""
+        return CompactFill(
+            self.fill_id,
+            self.order_id,
+            self.symbol,
+            self.side,
+            self.price,
+            self.quantity,
+            self.remaining_quantity,
+            self.timestamp,
+            self.buyer_id,
+            self.seller_id,
+            self.engine_destination_addr,
+            self.client_order_id,
+        )
+
+    def pretty_print(self) -> str:
+        return pretty_print_FillResponse(self)
 
 
 class OrderBook:
-    def __init__(self, symbol: str):
+    """Price-time priority book for one symbol.
+
+    Levels are keyed by integer tick prices (price / tick_size). Incoming orders
+    must carry price_ticks; float prices only appear on fills and snapshots.
+
+    A level exists only while it holds resting orders: it is dropped as soon as
+    its last order is filled or cancelled, and lookups never create one, so the
+    number of levels is bounded by the live orders rather than by every price
+    the book has ever seen.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        tick_size: float = DEFAULT_TICK_SIZE,
+        execution_ids: Optional[IdSequence] = None,
+        price_band: Optional[Tuple[float, float]] = None,
+    ):
         self.symbol = symbol
-        self.bids: Dict[float, List[Order]] = defaultdict(list)
-        self.asks: Dict[float, List[Order]] = defaultdict(list)
+        self.tick_size = tick_size
+        # (min_price, max_price) orders must be priced within, if any
+        self.price_band = price_band
+        if price_band is not None:
+            self.min_price_ticks = price_to_ticks(price_band[0], tick_size)
+            self.max_price_ticks = price_to_ticks(price_band[1], tick_size)
+        # source of the execution id given to each match
+        self.execution_ids = IdSequence() if execution_ids is None else execution_ids
+        # read once per incoming order that trades, for the timestamp of its fills
+        self.clock = monotonic_time_ns
+        self.bids: Dict[int, PriceLevel] = {}
+        self.asks: Dict[int, PriceLevel] = {}
+        # prices holding resting orders on each side, best price first
+        self.bid_prices = PriceLevelIndex(descending=True)
+        self.ask_prices = PriceLevelIndex(descending=False)
+        # order_id -> handle of every order resting in this book
+        self.order_nodes: Dict[int, OrderNode] = {}
+        # cached top of book in ticks, refreshed after every add, match and cancel
+        self.best_bid: Optional[int] = None
+        self.best_bid_quantity = 0
+        self.best_ask: Optional[int] = None
+        self.best_ask_quantity = 0
+        # bumped by every add, match, cancel and restore, so depth built from
+        # the book can be cached until it changes
+        self.version = 0
 
     def __repr__(self):
         """Print state of this order book"""
@@ -16,32 +356,71 @@ class OrderBook:
         rep = ""
         rep += f"\nOrder book for {self.symbol}:"
         rep += "\nAsks:\n"
-        for price in sorted(self.asks.keys(), reverse=True):
-            if not (sum(o.remaining_quantity for o in self.asks[price]) == 0):
-                rep += f"\n\t{price}: {sum(o.remaining_quantity for o in self.asks[price])}"
+        for price in reversed(self.ask_prices):
+            rep += f"\n\t{self.to_price(price)}: {self.asks[price].total_quantity}"
         rep += "\nBids:\n"
-        for price in sorted(self.bids.keys(), reverse=True):
-            if not (sum(o.remaining_quantity for o in self.bids[price]) == 0):
-                rep += f"\n\t{price}: {sum(o.remaining_quantity for o in self.bids[price])}"
+        for price in self.bid_prices:
+            rep += f"\n\t{self.to_price(price)}: {self.bids[price].total_quantity}"
 
         return rep
 
+    def in_band(self, price_ticks: int) -> bool:
+        """Whether this book can hold an order at price_ticks"""
+        if self.price_band is None:
+            return True
+        return self.min_price_ticks <= price_ticks <= self.max_price_ticks
+
+    def to_ticks(self, price: float) -> int:
+        return price_to_ticks(price, self.tick_size)
+
+    def to_price(self, price_ticks: int) -> float:
+        return ticks_to_price(price_ticks, self.tick_size)
+
+    def get_depth(self, num_levels: int = 0):
+        """Return (price_ticks, quantity, order_count) for the best num_levels bid
+        and ask levels (every level for 0), best first"""
+        limit = num_levels or None
+        bids = [
+            (price, self.bids[price].total_quantity, self.bids[price].order_count)
+            for price in islice(self.bid_prices, limit)
+        ]
+        asks = [
+            (price, self.asks[price].total_quantity, self.asks[price].order_count)
+            for price in islice(self.ask_prices, limit)
+        ]
+        return bids, asks
+
+    def get_bbo(self):
+        """Return (best_bid, best_bid_quantity, best_ask, best_ask_quantity)
+
+        Prices are in ticks, and None when that side of the book is empty.
+        """
+        return (
+            self.best_bid,
+            self.best_bid_quantity,
+            self.best_ask,
+            self.best_ask_quantity,
+        )
+
+    def _refresh_bbo(self) -> None:
+        self.best_bid = self.bid_prices.best()
+        if self.best_bid is None:
+            self.best_bid_quantity = 0
+        else:
+            self.best_bid_quantity = self.bids[self.best_bid].total_quantity
+
+        self.best_ask = self.ask_prices.best()
+        if self.best_ask is None:
+            self.best_ask_quantity = 0
+        else:
+            self.best_ask_quantity = self.asks[self.best_ask].total_quantity
+
     async def cancel_order(self, order_msg, active_orders, logger):
         if order_msg.order_id in active_orders.keys():
-            if order_msg.side == "BUY":
-                for cancellable_order in self.bids[order_msg.price]:
-                    if cancellable_order.order_id == order_msg.order_id:
-                        remaining_quantity = cancellable_order.remaining_quantity
-                        self.bids[order_msg.price].remove(cancellable_order)
-                        logger.info("Successfully cancelled order!")
-                        return True, remaining_quantity
-            if order_msg.side == "SELL":
-                for cancellable_order in self.asks[order_msg.price]:
-                    if cancellable_order.order_id == order_msg.order_id:
-                        remaining_quantity = cancellable_order.remaining_quantity
-                        self.asks[order_msg.price].remove(cancellable_order)
-                        logger.info("Successfully cancelled order!")
-                        return True, remaining_quantity
+            remaining_quantity = self.remove_order(order_msg.order_id)
+            if remaining_quantity is not None:
+                logger.info("Successfully cancelled order!")
+                return True, remaining_quantity
 
             logger.warning("cancel failed: not in orderbook")
             return False, 0
@@ -49,173 +428,174 @@ class OrderBook:
             logger.warning("cancel failed: not in active_orders")
             return False, 0
 
-    def add_order(self, order: Order, active_orders):
+    def remove_order(self, order_id: int) -> Optional[int]:
+        """Take a resting order out of the book and return its remaining quantity,
+        or None if it is not resting here"""
+        node = self.order_nodes.get(order_id)
+        if node is None:
+            return None
+        remaining_quantity = node.order.remaining_quantity
+        self._remove_node(node)
+        self._refresh_bbo()
+        self.version += 1
+        return remaining_quantity
+
+    def add_order(self, order: CompactOrder, active_orders):
         """Add order to book and return list of fills"""
-        fills = {
-            "incoming_fills": [],
-            "resting_fills": [],
-        }
-        if order.side == "BUY":
-            # Match against asks
-            for price in sorted(self.asks.keys()):
-                if price > order.price or order.remaining_quantity <= 0:
-                    break
+        fills = FillBuffer(self.tick_size)
+        self._add_order(order, active_orders, fills)
+        self._refresh_bbo()
+        self.version += 1
+        return fills.to_dict()
+
+    def add_orders(self, orders: Iterable[CompactOrder], active_orders) -> FillBuffer:
+        """Match a batch of orders in arrival order and return all of their fills.
 
-                updated_fills = self._match_order_at_price(order, price, active_orders)
-                fills["incoming_fills"].extend(updated_fills["incoming_fills"])
-                fills["resting_fills"].extend(updated_fills["resting_fills"])
+        Every order must already be registered in active_orders, as for
+        add_order. The top of book is refreshed once, after the whole batch.
+        """
+        fills = FillBuffer(self.tick_size)
+        for order in orders:
+            self._add_order(order, active_orders, fills)
+        self._refresh_bbo()
+        self.version += 1
+        return fills
+
+    def resting_orders(self) -> Iterator[CompactOrder]:
+        """Iterate resting orders, bids then asks, from the worst level to the best
+        and in time priority within a level.
+
+        Passing them back to rest_orders in this order rebuilds the book with
+        every new level appended at the best end of its side.
+        """
+        for levels, prices in (
+            (self.bids, self.bid_prices),
+            (self.asks, self.ask_prices),
+        ):
+            for price in reversed(prices):
+                yield from levels[price]
+
+    def rest_orders(self, orders: Iterable[CompactOrder]) -> None:
+        """Place orders in the book without matching them, e.g. to restore a snapshot"""
+        for order in orders:
+            self._rest_order(order)
+        self._refresh_bbo()
+        self.version += 1
+
+    def _add_order(self, order: CompactOrder, active_orders, fills: FillBuffer):
+        """Match order against the book, recording into fills, and rest any remainder"""
+        if order.side == "BUY":
+            # Match against asks, walking up from the best ask
+            levels, prices = self.asks, self.ask_prices
         else:
-            # Match against bids
-            for price in sorted(self.bids.keys(), reverse=True):
-                if price < order.price or order.remaining_quantity <= 0:
-                    break
-                updated_fills = self._match_order_at_price(order, price, active_orders)
-                fills["incoming_fills"].extend(updated_fills["incoming_fills"])
-                fills["resting_fills"].extend(updated_fills["resting_fills"])
+            # Match against bids, walking down from the best bid
+            levels, prices = self.bids, self.bid_prices
+
+        timestamp = 0
+        while order.remaining_quantity > 0:
+            price = prices.best()
+            if price is None:
+                break
+            if order.side == "BUY" and price > order.price_ticks:
+                break
+            if order.side != "BUY" and price < order.price_ticks:
+                break
+
+            if not timestamp:
+                # one clock read per incoming order, shared by all of its fills
+                timestamp = self.clock()
+            self._match_order_at_price(order, price, active_orders, fills, timestamp)
+
+            if levels[price]:
+                # incoming order was exhausted before the level was
+                break
+            self._remove_level(levels, prices, price)
 
         # Add remaining quantity to book
         if order.remaining_quantity > 0:
-            if order.side == "BUY":
-                self.bids[order.price].append(order)
-            else:
-                self.asks[order.price].append(order)
+            self._rest_order(order)
 
-        return fills
+    def _rest_order(self, order: CompactOrder) -> None:
+        """Queue order at the back of its price level"""
+        if order.side == "BUY":
+            levels, prices = self.bids, self.bid_prices
+        else:
+            levels, prices = self.asks, self.ask_prices
+        level = levels.get(order.price_ticks)
+        if level is None:
+            level = self._add_level(levels, prices, order.price_ticks)
+        self.order_nodes[order.order_id] = level.append(order)
 
-    def _match_order_at_price(
-        self, incoming_order: Order, price: float, active_orders
-    ) -> Dict[str, list]:
-        incoming_fills = []
-        resting_fills = []
+    def _add_level(
+        self, levels: Dict[int, PriceLevel], prices: PriceLevelIndex, price: int
+    ) -> PriceLevel:
+        level = levels[price] = PriceLevel(price)
+        prices.add(price)
+        return level
 
+    def _remove_level(
+        self, levels: Dict[int, PriceLevel], prices: PriceLevelIndex, price: int
+    ) -> None:
+        levels.pop(price, None)
+        prices.remove(price)
+
+    def _remove_node(self, node: OrderNode) -> None:
+        """Unlink a resting order, dropping its level if it becomes empty"""
+        level = node.level
+        level.remove(node)
+        del self.order_nodes[node.order.order_id]
+        if not level:
+            if node.order.side == "BUY":
+                self._remove_level(self.bids, self.bid_prices, level.price)
+            else:
+                self._remove_level(self.asks, self.ask_prices, level.price)
+
+    def _match_order_at_price(
+        self,
+        incoming_order: CompactOrder,
+        price_ticks: int,
+        active_orders,
+        fills: FillBuffer,
+        timestamp: int,
+    ) -> None:
         if incoming_order.side == "BUY":
-            orders = self.asks[price]
-
-            for resting_order in orders[:]:
-                if resting_order.order_id in active_orders:
-                    fill_qty = min(
-                        incoming_order.remaining_quantity,
-                        resting_order.remaining_quantity,
-                    )
-                    if fill_qty <= 0:
-                        continue
-
-                    # Update quantities
-                    incoming_order.remaining_quantity -= fill_qty
-                    resting_order.remaining_quantity -= fill_qty
-
-                    # Create fill records for the incoming order
-                    incoming_fills.append(
-                        (
-                            incoming_order.client_id,
-                            Fill(
-                                fill_id=f"FILL;incoming:{incoming_order.order_id};resting:{resting_order.order_id}",
-                                order_id=incoming_order.order_id,
-                                symbol=incoming_order.symbol,
-                                side=incoming_order.side,
-                                price=price,
-                                quantity=fill_qty,
-                                remaining_quantity=incoming_order.remaining_quantity,
-                                timestamp=datetime.now(),
-                                buyer_id=incoming_order.client_id,
-                                seller_id=resting_order.client_id,
-                                engine_destination_addr=incoming_order.engine_origin_addr,
-                            ),
-                        )
-                    )
-
-                    resting_fills.append(
-                        (
-                            resting_order.client_id,
-                            Fill(
-                                fill_id=f"FILL;incoming:{incoming_order.order_id};resting:{resting_order.order_id}",
-                                order_id=resting_order.order_id,
-                                symbol=resting_order.symbol,
-                                side=resting_order.side,
-                                price=price,
-                                quantity=fill_qty,
-                                remaining_quantity=resting_order.remaining_quantity,
-                                timestamp=datetime.now(),
-                                buyer_id=incoming_order.client_id,
-                                seller_id=resting_order.client_id,
-                                engine_destination_addr=incoming_order.engine_origin_addr,
-                            ),
-                        )
-                    )
-
-                    # Remove filled orders
-                    if resting_order.remaining_quantity <= 0:
-                        orders.remove(resting_order)
-                        del active_orders[resting_order.order_id]
-                    if incoming_order.remaining_quantity <= 0:
-                        del active_orders[incoming_order.order_id]
-                else:
-                    # cancel logic
-                    orders.remove(resting_order)
-
-        elif incoming_order.side == "SELL":
-            orders = self.bids[price]
-
-            for resting_order in orders[:]:
-                if resting_order.order_id in active_orders:
-                    fill_qty = min(
-                        incoming_order.remaining_quantity,
-                        resting_order.remaining_quantity,
-                    )
-                    if fill_qty <= 0:
-                        continue
-
-                    # Update quantities
-                    incoming_order.remaining_quantity -= fill_qty
-                    resting_order.remaining_quantity -= fill_qty
-
-                    # Create fill records for the incoming order
-                    incoming_fills.append(
-                        (
-                            incoming_order.client_id,
-                            Fill(
-                                fill_id=f"FILL;incoming:{incoming_order.order_id};resting:{resting_order.order_id}",
-                                order_id=incoming_order.order_id,
-                                symbol=incoming_order.symbol,
-                                side=incoming_order.side,
-                                price=price,
-                                quantity=fill_qty,
-                                remaining_quantity=incoming_order.remaining_quantity,
-                                timestamp=datetime.now(),
-                                buyer_id=resting_order.client_id,
-                                seller_id=incoming_order.client_id,
-                                engine_destination_addr=incoming_order.engine_origin_addr,
-                            ),
-                        )
-                    )
-
-                    resting_fills.append(
-                        (
-                            resting_order.client_id,
-                            Fill(
-                                fill_id=f"FILL;incoming:{incoming_order.order_id};resting:{resting_order.order_id}",
-                                order_id=resting_order.order_id,
-                                symbol=resting_order.symbol,
-                                side=resting_order.side,
-                                price=price,
-                                quantity=fill_qty,
-                                remaining_quantity=resting_order.remaining_quantity,
-                                timestamp=datetime.now(),
-                                buyer_id=resting_order.client_id,
-                                seller_id=incoming_order.client_id,
-                                engine_destination_addr=incoming_order.engine_origin_addr,
-                            ),
-                        )
-                    )
-
-                    # Remove filled orders
-                    if resting_order.remaining_quantity <= 0:
-                        orders.remove(resting_order)
-                        del active_orders[resting_order.order_id]
-                    if incoming_order.remaining_quantity <= 0:
-                        # orders.remove(incoming_order)
-                        del active_orders[incoming_order.order_id]
-                else:
-                    orders.remove(resting_order)
-
-        return {"incoming_fills": incoming_fills, "resting_fills": resting_fills}
+            orders = self.asks[price_ticks]
+        else:
+            orders = self.bids[price_ticks]
+
+        for node in orders.nodes():
+            resting_order = node.order
+            if resting_order.order_id in active_orders:
+                fill_qty = min(
+                    incoming_order.remaining_quantity,
+                    resting_order.remaining_quantity,
+                )
+                if fill_qty <= 0:
+                    continue
+
+                # Update quantities
+                incoming_order.remaining_quantity -= fill_qty
+                orders.fill(node, fill_qty)
+
+                # Record the match for both orders
+                fills.append(
+                    self.execution_ids.next_id(),
+                    incoming_order,
+                    resting_order,
+                    price_ticks,
+                    fill_qty,
+                    timestamp,
+                )
+
+                # Remove filled orders
+                if resting_order.remaining_quantity <= 0:
+                    orders.remove(node)
+                    del self.order_nodes[resting_order.order_id]
+                    del active_orders[resting_order.order_id]
+                if incoming_order.remaining_quantity <= 0:
+                    del active_orders[incoming_order.order_id]
+                    break
+            else:
+                # cancel logic
+                orders.remove(node)
+                del self.order_nodes[resting_order.order_id]
@@ -1,6 +1,9 @@
-from common.order import Fill, pretty_print_OrderRequest
+from common.order import CompactOrder, pretty_print_OrderRequest
+from common.orderbook import FillBuffer
 import asyncio
-from typing import List
+import functools
+import sys
+from typing import Dict, List, Optional, Tuple
 import os
 import grpc
 import proto.matching_service_pb2 as pb2
@@ -9,19 +12,45 @@ import proto.matching_service_pb2_grpc as pb2_grpc
 from client.custom_formatter import LogFactory
 
 
+class ActiveOrder:
+    """Entry in CancelFairy.active_orders: where an open order lives and how much is left"""
+
+    __slots__ = ("remaining_quantity", "address", "order_record")
+
+    def __init__(
+        self, remaining_quantity: int, address: str, order_record: CompactOrder
+    ):
+        self.remaining_quantity = remaining_quantity
+        self.address = sys.intern(address)
+        self.order_record = order_record
+
+    def __repr__(self) -> str:
+        return f"ActiveOrder(remaining_quantity={self.remaining_quantity}, address={self.address!r})"
+
+
 class CancelFairy:
     def __init__(self, engine_id, engine_addr, peer_addresses=[]):
         self.engine_id = engine_id
         self.engine_addr = engine_addr
         self.peer_addresses = peer_addresses
         # for cancellation
-        self.active_orders = {}  # order_id : {remaining_quantity : <int>, address: <str>, order_record : <Order>}
+        self.active_orders = {}  # order_id : ActiveOrder
         self.log_directory = os.getcwd() + "/logs/cancelfairy_logs/"
         self.logger = LogFactory(
             f"CancelFairy for ME {self.engine_id}", self.log_directory
         ).get_logger()
 
         self.stubs = {}
+        # set by the MatchEngine when it keeps a journal or shards its books
+        self.journal = None
+        self.shards = None
+        # the MatchEngine's Sequencer, which local cancels go through
+        self.sequencer = None
+        # the MatchEngine's MarketDataFeed, told about every local cancel
+        self.market_data = None
+        # the MatchEngine's OrderBookSynchronizer, which pushes the top of
+        # book to peers after a local cancel
+        self.synchronizer = None
 
     async def connect_to_peers(self):
         for address in self.peer_addresses:
@@ -41,82 +70,191 @@ class CancelFairy:
         self.logger.debug(f"received cancel request for full order {order_msg}")
         self.logger.debug(f"stubs: {self.stubs}")
 
-        order_obj = {
-            "order_id": order_msg.order_id,
-            "symbol": order_msg.symbol,
-            "side": order_msg.side,
-            "price": order_msg.price,
-            "quantity": order_msg.quantity,
-            "remaining_quantity": order_msg.quantity,
-            "client_id": order_msg.client_id,
-            "engine_origin_addr": order_msg.engine_origin_addr,
-            "timestamp": order_msg.timestamp,
-        }
-
         self.logger.debug(f"active_orders: {self.active_orders}")
 
-        async with asyncio.Lock():
-            if order_msg.order_id in self.active_orders.keys():
-                if (
-                    self.engine_addr
-                    != self.active_orders[order_msg.order_id]["address"]
-                ):
-                    self.logger.info(
-                        f"Routing cancel request to ME {self.active_orders[order_msg.order_id]['address']}"
-                    )
-                    response = await self.stubs[
-                        self.active_orders[order_msg.order_id]["address"]
-                    ].CancelOrder(
-                        pb2.CancelOrderRequest(
-                            order_id=order_msg.order_id,
-                            client_id=order_msg.client_id,
-                            order_record=order_obj,
-                        )
-                    )
-
-                    return_val = True if response.status == "SUCCESSFUL" else False
-                    if return_val:
-                        self.logger.info("Remotely handled cancel was successful")
-                    return return_val, response.quantity_cancelled
-                else:
-                    self.logger.info("Cancel being handled on local engine")
-                    cancel_result = await orderbooks[order_msg.symbol].cancel_order(
-                        order_msg, self.active_orders, self.logger
-                    )
-
-                    self.logger.debug(f"cancel called on orderbook {order_msg.symbol}")
-                    try:
-                        del self.active_orders[order_msg.order_id]
-                    except Exception as e:
-                        self.logger.warning(
-                            f"cancel had status {cancel_result} on orderbook but was not found in the active_orders table\nclient may have attempted to cancel a fully filled order. \n Error message {e}"
-                        )
-
-                    if cancel_result[0]:
-                        self.logger.info("Locally handled cancel was successful")
-                    return cancel_result
+        active = self.active_orders.get(order_msg.order_id)
+        if active is None:
+            self.logger.warning(
+                f"cancel for {order_msg} did not have an id in active orders"
+            )
+            return False, 0
 
-            else:
+        if self.engine_addr != active.address:
+            self.logger.info(f"Routing cancel request to ME {active.address}")
+            response = await self.stubs[active.address].CancelOrder(
+                self._cancel_request(order_msg)
+            )
+
+            return_val = True if response.status == "SUCCESSFUL" else False
+            if return_val:
+                self.logger.info("Remotely handled cancel was successful")
+            return return_val, response.quantity_cancelled
+
+        self.logger.info("Cancel being handled on local engine")
+        if self.journal is not None:
+            self.journal.check()
+        # the order's own symbol, whatever the request claims
+        symbol = active.order_record.symbol
+        cancel = functools.partial(self._cancel_here, order_msg.order_id, orderbooks)
+        if self.sequencer is None:
+            cancel_result = await cancel()
+        else:
+            # behind the orders for the symbol that arrived before it
+            cancel_result = await self.sequencer.submit(symbol, cancel)
+        self.logger.debug(f"cancel called on orderbook {symbol}")
+
+        if cancel_result[0]:
+            self.logger.info("Locally handled cancel was successful")
+            if self.journal is not None:
+                await self._commit_journal()
+        else:
+            self.logger.warning("cancel failed: not in orderbook")
+        return cancel_result
+
+    async def cancel_orders(self, order_msgs, orderbooks) -> List[Tuple[bool, int]]:
+        """cancel for a batch of orders, returning (cancelled, quantity) for each.
+
+        Local cancels for a symbol run as one job on its sequencer, and the
+        cancels for orders routed to another engine go to it in one
+        CancelOrders call.
+        """
+        self.logger.info(f"received batch of {len(order_msgs)} cancel requests")
+        results: List[Tuple[bool, int]] = [(False, 0)] * len(order_msgs)
+        local: Dict[str, List[int]] = {}
+        remote: Dict[str, List[int]] = {}
+        for i, order_msg in enumerate(order_msgs):
+            active = self.active_orders.get(order_msg.order_id)
+            if active is None:
                 self.logger.warning(
                     f"cancel for {order_msg} did not have an id in active orders"
                 )
-                return False, 0
-
-    async def update_active_orders_after_fills(self, fills: List[tuple[str, Fill]]):
-        self.logger.info(f"updating active orders with {len(fills)} fills")
-        self.logger.debug(f"updating active orders with fills {fills}")
-        async with asyncio.Lock():
-            for fill in fills:
-                self.logger.debug(f"update active order with specific fill {fill}")
-                if fill[1].order_id in self.active_orders.keys():
-                    self.active_orders[fill[1].order_id]["remaining_quantity"] = fill[
-                        1
-                    ].remaining_quantity
-
-                    if self.active_orders[fill[1].order_id]["remaining_quantity"] <= 0:
-                        try:
-                            del self.active_orders[fill[1].order_id]
-                        except Exception as e:
-                            self.logger.warning(
-                                f"cancel key was not found on fills\nclient may have attempted to cancel a fully filled order \n Error message {e}"
-                            )
+            elif self.engine_addr != active.address:
+                remote.setdefault(active.address, []).append(i)
+            else:
+                local.setdefault(active.order_record.symbol, []).append(i)
+        if local and self.journal is not None:
+            self.journal.check()
+
+        async def cancel_remote(address: str, indices: List[int]):
+            self.logger.info(f"Routing {len(indices)} cancel requests to ME {address}")
+            response = await self.stubs[address].CancelOrders(
+                pb2.CancelOrdersRequest(
+                    cancels=[self._cancel_request(order_msgs[i]) for i in indices]
+                )
+            )
+            return [
+                (item.status == "SUCCESSFUL", item.quantity_cancelled)
+                for item in response.responses
+            ]
+
+        async def cancel_local(symbol: str, indices: List[int]):
+            cancel = functools.partial(
+                self._cancel_all_here, [order_msgs[i] for i in indices], orderbooks
+            )
+            if self.sequencer is None:
+                return await cancel()
+            return await self.sequencer.submit(symbol, cancel)
+
+        groups = list(local.values()) + list(remote.values())
+        group_results = await asyncio.gather(
+            *(cancel_local(symbol, indices) for symbol, indices in local.items()),
+            *(cancel_remote(address, indices) for address, indices in remote.items()),
+        )
+        for indices, group_result in zip(groups, group_results):
+            for i, result in zip(indices, group_result):
+                results[i] = result
+
+        if local and self.journal is not None:
+            await self._commit_journal()
+        return results
+
+    async def _commit_journal(self) -> None:
+        """Wait for the cancels appended so far to be durable; as for
+        MatchEngine._commit_journal, a failure stops the journal but the
+        cancels already applied are still reported"""
+        try:
+            await self.journal.commit()
+        except Exception as e:
+            self.logger.critical(
+                f"journal commit failed, no longer taking cancels: {e}"
+            )
+
+    async def _cancel_all_here(self, order_msgs, orderbooks) -> List[Tuple[bool, int]]:
+        """_cancel_here for a batch of one symbol's orders"""
+        return list(
+            await asyncio.gather(
+                *(
+                    self._cancel_here(order_msg.order_id, orderbooks)
+                    for order_msg in order_msgs
+                )
+            )
+        )
+
+    def _cancel_request(self, order_msg) -> pb2.CancelOrderRequest:
+        """CancelOrderRequest for an order, to send to the engine it rests on"""
+        return pb2.CancelOrderRequest(
+            order_id=order_msg.order_id,
+            client_order_id=order_msg.client_order_id,
+            client_id=order_msg.client_id,
+            order_record={
+                "order_id": order_msg.order_id,
+                "client_order_id": order_msg.client_order_id,
+                "symbol": order_msg.symbol,
+                "side": order_msg.side,
+                "price": order_msg.price,
+                "quantity": order_msg.quantity,
+                "remaining_quantity": order_msg.quantity,
+                "client_id": order_msg.client_id,
+                "engine_origin_addr": order_msg.engine_origin_addr,
+                "timestamp": order_msg.timestamp,
+            },
+        )
+
+    async def _cancel_here(self, order_id: int, orderbooks) -> Tuple[bool, int]:
+        # the order may have filled while the cancel was queued
+        active = self.active_orders.get(order_id)
+        if active is None:
+            return False, 0
+        symbol = active.order_record.symbol
+        if self.shards is None:
+            return self.cancel_local(order_id, orderbooks[symbol])
+        remaining_quantity = await self.shards.cancel(order_id, symbol)
+        return self._record_cancel(order_id, symbol, remaining_quantity)
+
+    def cancel_local(self, order_id: int, orderbook) -> Tuple[bool, int]:
+        """Cancel an order resting in orderbook on this engine, without awaiting.
+
+        The cancel is appended to the journal but not committed.
+        """
+        return self._record_cancel(
+            order_id, orderbook.symbol, orderbook.remove_order(order_id)
+        )
+
+    def _record_cancel(
+        self, order_id: int, symbol: str, remaining_quantity: Optional[int]
+    ) -> Tuple[bool, int]:
+        if remaining_quantity is None:
+            # not in the book; whatever is tracked for it stays as it was
+            return False, 0
+        active = self.active_orders.pop(order_id, None)
+        if self.journal is not None:
+            self.journal.append_cancel(order_id, symbol, remaining_quantity)
+        if self.market_data is not None and active is not None:
+            self.market_data.publish_cancel(active.order_record)
+        if self.synchronizer is not None:
+            self.synchronizer.publish_bbo(symbol)
+        return True, remaining_quantity
+
+    def apply_fills(self, fills: FillBuffer) -> None:
+        """Bring active_orders up to date with fills, dropping filled orders"""
+        self.logger.debug("updating active orders with %d fills", len(fills))
+        for orders, remaining in (
+            (fills.incoming_orders, fills.incoming_remaining),
+            (fills.resting_orders, fills.resting_remaining),
+        ):
+            for order, remaining_quantity in zip(orders, remaining):
+                active = self.active_orders.get(order.order_id)
+                if active is not None:
+                    active.remaining_quantity = remaining_quantity
+                    if remaining_quantity <= 0:
+                        del self.active_orders[order.order_id]
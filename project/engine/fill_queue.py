@@ -0,0 +1,58 @@
+import asyncio
+from collections import deque
+from typing import Deque, List, Tuple
+
+from common.orderbook import BufferedFill
+
+# fills kept per client after they are sent, for streams that resume
+RETAINED_FILLS = 10_000
+
+
+class FillQueue:
+    """A client's fills on this engine, numbered in the order they are queued.
+
+    Fills wait in an asyncio queue until the client's GetFills stream takes
+    them, so a stream is woken as soon as submit_order or PutFill queues one.
+    The latest RETAINED_FILLS are also kept after they are taken, so a client
+    that lost its stream can open a new one resuming after the last sequence
+    number it received. A fill read through a FillBuffer is copied out of it
+    once, when queued, and that copy is what is both sent and retained, so
+    retained fills do not keep whole match batches alive.
+
+    A client has one stream at a time: every fill is taken by exactly one
+    stream, so GetFills turns away a second stream while one is open.
+    """
+
+    def __init__(self, retained: int = RETAINED_FILLS):
+        self.sequence_number = 0
+        self.pending: asyncio.Queue = asyncio.Queue()
+        self.retained: Deque[Tuple[int, object]] = deque(maxlen=retained)
+        # whether a GetFills stream is taking this client's fills
+        self.streaming = False
+
+    def put(self, fill) -> int:
+        """Queue fill, returning its sequence number"""
+        self.sequence_number += 1
+        if isinstance(fill, BufferedFill):
+            fill = fill.to_compact()
+        entry = (self.sequence_number, fill)
+        self.pending.put_nowait(entry)
+        self.retained.append(entry)
+        return self.sequence_number
+
+    async def get(self) -> Tuple[int, object]:
+        """Wait for the next (sequence_number, fill)"""
+        return await self.pending.get()
+
+    def qsize(self) -> int:
+        return self.pending.qsize()
+
+    def retained_after(self, sequence_number: int) -> List[Tuple[int, object]]:
+        """Retained (sequence_number, fill) pairs numbered after sequence_number"""
+        return [entry for entry in self.retained if entry[0] > sequence_number]
+
+    def first_retained(self) -> int:
+        """Sequence number of the oldest retained fill, or the next one if none are"""
+        if self.retained:
+            return self.retained[0][0]
+        return self.sequence_number + 1
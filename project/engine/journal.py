@@ -0,0 +1,330 @@
+"""Append-only binary journal of the orders, cancels and fills an engine accepts.
+
+Each record is framed as
+
+    RECORD_HEADER (payload length, crc32 of the payload, record type), payload
+
+and strings in a payload are written as a uint32 length and utf-8 bytes. A
+record that is cut short or fails its crc marks the end of the journal, so a
+torn write at a crash loses only the events that were never acknowledged; a
+Journal opened on such a file truncates the torn tail before appending.
+
+Appends only copy the encoded record into memory. A single writer task makes
+them durable in groups: it waits until sync_interval_ms has passed since the
+first pending event or sync_every events are pending, whichever is first, then
+writes and fsyncs the whole group in one go. Events appended while a group is
+being written wait for the next one. Callers await commit() to know
+their events are durable, so concurrent requests share one fsync. If a group
+fails to write, the file is truncated back to the last durable record and the
+journal stops: every commit raises the error from then on, as events after the
+lost group could not be replayed without it.
+"""
+
+import asyncio
+import os
+import struct
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+from common.order import CompactOrder
+from common.orderbook import FillBuffer
+
+# payload length, crc32 of the payload, record type
+RECORD_HEADER = struct.Struct("<IIB")
+
+ORDER = 1
+CANCEL = 2
+FILL = 3
+# an order this engine sent on to another engine; ORDER_RECORD followed by its
+# strings and the address it was routed to
+ROUTED = 4
+
+# order_id, price, price_ticks, quantity, timestamp, then symbol, side,
+# client_id, engine_origin_addr and client_order_id strings
+ORDER_RECORD = struct.Struct("<Qdqqq")
+# order_id, quantity cancelled, then the symbol string
+CANCEL_RECORD = struct.Struct("<Qq")
+# fill_id, incoming order_id, resting order_id, price_ticks, quantity, timestamp
+FILL_RECORD = struct.Struct("<QQQqqq")
+
+# client_order_id and client_id come from clients, so allow anything a gRPC
+# message can carry
+STRING_LENGTH = struct.Struct("<I")
+
+
+def _pack_strings(*strings: str) -> bytes:
+    parts = []
+    for string in strings:
+        encoded = string.encode()
+        parts.append(STRING_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    return b"".join(parts)
+
+
+def _unpack_strings(payload: bytes, offset: int, count: int) -> List[str]:
+    strings = []
+    for _ in range(count):
+        (length,) = STRING_LENGTH.unpack_from(payload, offset)
+        offset += STRING_LENGTH.size
+        strings.append(payload[offset : offset + length].decode())
+        offset += length
+    return strings
+
+
+def _pack_order(order: CompactOrder) -> bytes:
+    return ORDER_RECORD.pack(
+        order.order_id,
+        order.price,
+        order.price_ticks,
+        order.quantity,
+        order.timestamp,
+    ) + _pack_strings(
+        order.symbol,
+        order.side,
+        order.client_id,
+        order.engine_origin_addr,
+        order.client_order_id,
+    )
+
+
+class Journal:
+    def __init__(
+        self,
+        path: str,
+        sync_interval_ms: float = 2.0,
+        sync_every: int = 1024,
+        fsync: bool = True,
+    ):
+        """
+        sync_interval_ms: longest an appended event waits for its group to be
+            written; with 0 a group is written as soon as the previous one is
+            done, so groups are whatever arrives during an fsync
+        sync_every: write the group early once this many events are pending
+        fsync: fsync each group; if False groups are only written to the OS
+        """
+        self.path = path
+        self.sync_interval = sync_interval_ms / 1000
+        self.sync_every = sync_every
+        self.fsync = fsync
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "ab", buffering=0)
+        # byte offset just past the last appended record, durable or not;
+        # snapshots store it to mark which events they already include
+        self.offset = _valid_length(path)
+        if self.offset < os.path.getsize(path):
+            self.file.truncate(self.offset)
+        # byte offset just past the last durable record
+        self.durable_offset = self.offset
+
+        self.pending = bytearray()
+        self.pending_events = 0
+        # events appended and events durable since the journal was opened
+        self.appended = 0
+        self.durable = 0
+        # (events that must be durable, future) for each waiting commit()
+        self.waiters: List[Tuple[int, asyncio.Future]] = []
+        # set once a group fails to write; nothing more is written and every
+        # commit() raises it
+        self.error: Optional[Exception] = None
+
+        self.syncs = 0
+        self.bytes_written = 0
+
+        self._writer: Optional[asyncio.Task] = None
+        self._has_pending = asyncio.Event()
+        self._group_full = asyncio.Event()
+
+    def append_order(self, order: CompactOrder) -> None:
+        """Record an order accepted by the engine, before it is matched"""
+        self._append(ORDER, _pack_order(order))
+
+    def append_routed(self, order: CompactOrder, address: str) -> None:
+        """Record an order routed to the engine at address"""
+        self._append(ROUTED, _pack_order(order) + _pack_strings(address))
+
+    def append_cancel(self, order_id: int, symbol: str, quantity: int) -> None:
+        self._append(
+            CANCEL, CANCEL_RECORD.pack(order_id, quantity) + _pack_strings(symbol)
+        )
+
+    def append_fills(
+        self, fills: FillBuffer, start: int = 0, stop: Optional[int] = None
+    ) -> None:
+        """Record the matches in rows [start, stop) of fills (every match by
+        default), one record per match"""
+        for i in range(start, len(fills) if stop is None else stop):
+            self._append(
+                FILL,
+                FILL_RECORD.pack(
+                    fills.fill_id[i],
+                    fills.incoming_orders[i].order_id,
+                    fills.resting_orders[i].order_id,
+                    fills.price_ticks[i],
+                    fills.quantity[i],
+                    fills.timestamp[i],
+                ),
+            )
+
+    def _append(self, record_type: int, payload: bytes) -> None:
+        if self.error is not None:
+            # nothing will be written again, so don't keep buffering
+            return
+        self.pending += RECORD_HEADER.pack(
+            len(payload), zlib.crc32(payload), record_type
+        )
+        self.pending += payload
+        self.offset += RECORD_HEADER.size + len(payload)
+        self.pending_events += 1
+        self.appended += 1
+        self._has_pending.set()
+        if self.pending_events >= self.sync_every:
+            self._group_full.set()
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    def check(self) -> None:
+        """Raise if the journal has stopped, before applying anything it
+        would have to record"""
+        if self.error is not None:
+            raise RuntimeError(
+                f"journal {self.path} stopped after a failed write: {self.error}"
+            )
+
+    async def commit(self) -> None:
+        """Wait until every event appended so far is durable"""
+        if self.error is not None:
+            raise self.error
+        if self.durable >= self.appended:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((self.appended, future))
+        await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._has_pending.wait()
+            if self.sync_interval > 0 and self.pending_events < self.sync_every:
+                # give concurrent requests until the deadline to join this group
+                try:
+                    await asyncio.wait_for(
+                        self._group_full.wait(), timeout=self.sync_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._has_pending.clear()
+            self._group_full.clear()
+
+            data = bytes(self.pending)
+            appended = self.appended
+            self.pending.clear()
+            self.pending_events = 0
+
+            try:
+                await loop.run_in_executor(None, self._write, data)
+            except Exception as e:
+                # cut off whatever part of the group reached the file, so the
+                # journal ends at its last durable record
+                self.offset = self.durable_offset
+                self.pending.clear()
+                self.pending_events = 0
+                try:
+                    await loop.run_in_executor(
+                        None, self.file.truncate, self.durable_offset
+                    )
+                except Exception as truncate_error:
+                    e = truncate_error
+                self.error = e
+                self._resolve(self.appended, e)
+                return
+            self.durable = appended
+            self.durable_offset += len(data)
+            self._resolve(appended)
+
+    def _write(self, data: bytes) -> None:
+        # the file is unbuffered, so a write can be short
+        with memoryview(data) as view:
+            written = 0
+            while written < len(data):
+                written += self.file.write(view[written:])
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.syncs += 1
+        self.bytes_written += len(data)
+
+    def _resolve(self, appended: int, error: Optional[Exception] = None) -> None:
+        waiting = []
+        for target, future in self.waiters:
+            if target > appended:
+                waiting.append((target, future))
+            elif not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+        self.waiters = waiting
+
+    async def close(self) -> None:
+        """Make everything appended durable and close the file"""
+        try:
+            await self.commit()
+        finally:
+            if self._writer is not None:
+                self._writer.cancel()
+                self._writer = None
+            self.file.close()
+
+
+def _records(data: bytes, offset: int) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (end offset, record type, payload) for each complete record in data"""
+    while offset + RECORD_HEADER.size <= len(data):
+        length, crc, record_type = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start : start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            # torn write at the tail
+            return
+        offset = start + length
+        yield offset, record_type, payload
+
+
+def _valid_length(path: str) -> int:
+    """Length of the journal at path up to the end of its last complete record"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb") as f:
+        data = f.read()
+    end = 0
+    for end, _, _ in _records(data, 0):
+        pass
+    return end
+
+
+def read_journal(path: str, offset: int = 0) -> Iterator[Tuple[int, tuple]]:
+    """Yield (record type, fields) for every complete record in the journal at
+    path, starting at byte offset
+
+    Order fields follow ORDER_RECORD and then its strings, routed order fields
+    add the destination address to those, cancel fields are
+    (order_id, quantity, symbol) and fill fields follow FILL_RECORD.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    for _, record_type, payload in _records(data, offset):
+        if record_type == ORDER:
+            fields = ORDER_RECORD.unpack_from(payload)
+            yield ORDER, fields + tuple(_unpack_strings(payload, ORDER_RECORD.size, 5))
+        elif record_type == ROUTED:
+            fields = ORDER_RECORD.unpack_from(payload)
+            yield ROUTED, fields + tuple(_unpack_strings(payload, ORDER_RECORD.size, 6))
+        elif record_type == CANCEL:
+            fields = CANCEL_RECORD.unpack_from(payload)
+            yield CANCEL, fields + tuple(
+                _unpack_strings(payload, CANCEL_RECORD.size, 1)
+            )
+        elif record_type == FILL:
+            yield FILL, FILL_RECORD.unpack_from(payload)
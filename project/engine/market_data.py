@@ -0,0 +1,223 @@
+"""L2 market data for SubscribeMarketData.
+
+The engine tells its MarketDataFeed which price levels each order or cancel
+touched, right after the book changes and before anything else can run, and
+the feed reads the levels' new quantity and order count back from the book.
+Every subscription first gets a snapshot of each of its symbols, then one
+update per book change that alters what it can see: the levels that changed,
+with quantity 0 for a level that went away.
+
+Updates carry the symbol's sequence number, which goes up by one for every
+change published for the symbol. A snapshot carries the sequence number it is
+current as of, so a client applies the updates numbered after it. A
+subscription limited to the top levels only hears about changes within them,
+so its sequence numbers can skip.
+"""
+
+import asyncio
+from itertools import islice
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from common.order import CompactOrder
+from common.orderbook import FillBuffer, OrderBook
+
+# (price_ticks, quantity, order_count)
+Level = Tuple[int, int, int]
+
+# (symbol, sequence_number, is_snapshot, bids, asks)
+Update = Tuple[str, int, bool, List[Level], List[Level]]
+
+# updates a subscription may have waiting before it is resynced with snapshots
+MAX_PENDING_UPDATES = 10_000
+
+
+class MarketDataSubscription:
+    """One subscriber's queue of updates"""
+
+    def __init__(self, symbols: List[str], depth: int):
+        self.symbols = symbols
+        self.depth = depth
+        self.updates: asyncio.Queue = asyncio.Queue(MAX_PENDING_UPDATES)
+        self.resyncs = 0
+
+    async def get(self) -> Update:
+        return await self.updates.get()
+
+
+class _DepthView:
+    """The levels subscribers to one symbol at one depth can see"""
+
+    def __init__(self, depth: int):
+        # 0 for the whole book
+        self.depth = depth
+        self.subscriptions: List[MarketDataSubscription] = []
+        # price_ticks -> (quantity, order_count) last sent, for depth > 0
+        self.bids: Dict[int, Tuple[int, int]] = {}
+        self.asks: Dict[int, Tuple[int, int]] = {}
+
+
+class MarketDataFeed:
+    """Publishes the level changes of an engine's books to subscriptions"""
+
+    def __init__(self, orderbooks: Dict[str, OrderBook]):
+        self.orderbooks = orderbooks
+        # symbol -> depth -> view, only for symbols someone subscribes to
+        self.views: Dict[str, Dict[int, _DepthView]] = {}
+        self.sequence_numbers: Dict[str, int] = {}
+
+    def subscribe(
+        self, symbols: Iterable[str], depth: int = 0
+    ) -> MarketDataSubscription:
+        """Subscribe to symbols, whose books must exist, seeing depth levels a
+        side (all of them for 0). A snapshot of each symbol is queued at once."""
+        if depth < 0:
+            raise ValueError(f"market data depth must be 0 or more, not {depth}")
+        subscription = MarketDataSubscription(list(dict.fromkeys(symbols)), depth)
+        for symbol in subscription.symbols:
+            views = self.views.setdefault(symbol, {})
+            view = views.get(depth)
+            if view is None:
+                view = views[depth] = _DepthView(depth)
+                if depth:
+                    view.bids, view.asks = self._top_levels(
+                        self.orderbooks[symbol], depth
+                    )
+            view.subscriptions.append(subscription)
+            subscription.updates.put_nowait(self._snapshot(symbol, view))
+        return subscription
+
+    def unsubscribe(self, subscription: MarketDataSubscription) -> None:
+        for symbol in subscription.symbols:
+            views = self.views.get(symbol, {})
+            view = views.get(subscription.depth)
+            if view is None:
+                continue
+            view.subscriptions.remove(subscription)
+            if not view.subscriptions:
+                del views[subscription.depth]
+            if not views:
+                self.views.pop(symbol, None)
+
+    def publish_match(self, orders: Sequence[CompactOrder], fills: FillBuffer) -> None:
+        """Publish the levels orders, all for one symbol and matched together,
+        traded against and the levels they rest at, as one update"""
+        symbol = orders[0].symbol
+        if symbol not in self.views:
+            return
+        bid_prices, ask_prices = set(), set()
+        for resting, price_ticks in zip(fills.resting_orders, fills.price_ticks):
+            (bid_prices if resting.side == "BUY" else ask_prices).add(price_ticks)
+        for order in orders:
+            if order.remaining_quantity > 0:
+                (bid_prices if order.side == "BUY" else ask_prices).add(
+                    order.price_ticks
+                )
+        self.publish(symbol, bid_prices, ask_prices)
+
+    def publish_cancel(self, order: CompactOrder) -> None:
+        """Publish the level a cancelled order rested at"""
+        if order.symbol not in self.views:
+            return
+        if order.side == "BUY":
+            self.publish(order.symbol, (order.price_ticks,), ())
+        else:
+            self.publish(order.symbol, (), (order.price_ticks,))
+
+    def publish(
+        self, symbol: str, bid_prices: Iterable[int], ask_prices: Iterable[int]
+    ) -> None:
+        """Send the new state of the bid and ask levels at the given tick
+        prices, which a book change just touched, to symbol's subscribers"""
+        views = self.views.get(symbol)
+        if not views:
+            return
+        orderbook = self.orderbooks[symbol]
+        sequence_number = self.sequence_numbers.get(symbol, 0) + 1
+        self.sequence_numbers[symbol] = sequence_number
+        bid_prices = set(bid_prices)
+        ask_prices = set(ask_prices)
+
+        for view in views.values():
+            if view.depth:
+                bids = (
+                    self._view_changes(
+                        orderbook.bids, orderbook.bid_prices, view.bids, view.depth
+                    )
+                    if bid_prices
+                    else []
+                )
+                asks = (
+                    self._view_changes(
+                        orderbook.asks, orderbook.ask_prices, view.asks, view.depth
+                    )
+                    if ask_prices
+                    else []
+                )
+            else:
+                bids = [_level(orderbook.bids, price) for price in bid_prices]
+                asks = [_level(orderbook.asks, price) for price in ask_prices]
+            if not bids and not asks:
+                continue
+            update = (symbol, sequence_number, False, bids, asks)
+            for subscription in view.subscriptions:
+                if subscription.updates.full():
+                    self._resync(subscription)
+                else:
+                    subscription.updates.put_nowait(update)
+
+    def _snapshot(self, symbol: str, view: _DepthView) -> Update:
+        if view.depth:
+            bids = [(price, *state) for price, state in view.bids.items()]
+            asks = [(price, *state) for price, state in view.asks.items()]
+        else:
+            bids, asks = self.orderbooks[symbol].get_depth()
+        return (symbol, self.sequence_numbers.get(symbol, 0), True, bids, asks)
+
+    def _resync(self, subscription: MarketDataSubscription) -> None:
+        """Replace a subscriber's backlog with fresh snapshots: it is too far
+        behind for the updates to be worth sending"""
+        while not subscription.updates.empty():
+            subscription.updates.get_nowait()
+        subscription.resyncs += 1
+        for symbol in subscription.symbols:
+            view = self.views[symbol][subscription.depth]
+            subscription.updates.put_nowait(self._snapshot(symbol, view))
+
+    @staticmethod
+    def _top_levels(orderbook: OrderBook, depth: int):
+        return (
+            {
+                price: _state(orderbook.bids[price])
+                for price in islice(orderbook.bid_prices, depth)
+            },
+            {
+                price: _state(orderbook.asks[price])
+                for price in islice(orderbook.ask_prices, depth)
+            },
+        )
+
+    @staticmethod
+    def _view_changes(
+        levels, prices, sent: Dict[int, Tuple[int, int]], depth: int
+    ) -> List[Level]:
+        """Bring sent up to date with the best depth levels of one side and
+        return the levels that changed"""
+        top = {price: _state(levels[price]) for price in islice(prices, depth)}
+        changes = [
+            (price, *state) for price, state in top.items() if sent.get(price) != state
+        ]
+        changes.extend((price, 0, 0) for price in sent if price not in top)
+        sent.clear()
+        sent.update(top)
+        return changes
+
+
+def _state(level) -> Tuple[int, int]:
+    return level.total_quantity, level.order_count
+
+
+def _level(levels, price: int) -> Level:
+    level = levels.get(price)
+    if level is None:
+        return price, 0, 0
+    return (price, *_state(level))
@@ -1,12 +1,20 @@
+import functools
 import os
-import queue
-from typing import Dict, Optional
+import time
+from typing import Awaitable, Dict, List, Optional, Tuple
 import asyncio
-from common.order import Order, OrderStatus
-from common.orderbook import OrderBook
+from common.order import DEFAULT_TICK_SIZE, CompactOrder, IdSequence, OrderStatus
+from common.orderbook import FillBuffer, OrderBook
+from common.ladder_orderbook import new_orderbook
 from client.custom_formatter import LogFactory
 from engine.synchronizer import OrderBookSynchronizer
-from engine.cancel_fairy import CancelFairy
+from engine.cancel_fairy import ActiveOrder, CancelFairy
+from engine.fill_queue import FillQueue
+from engine.journal import Journal
+from engine.market_data import MarketDataFeed, MarketDataSubscription
+from engine.sequencer import Sequencer
+from engine.shards import Match, ShardPool
+from engine import replay, snapshot
 
 import grpc
 import proto.matching_service_pb2 as pb2
@@ -22,13 +30,32 @@ class MatchEngine:
         cancel_fairy: CancelFairy,
         authentication_key: str = "password",
         exchange_credentials: str = "password",
+        tick_sizes: Dict[str, float] = {},
+        price_bands: Dict[str, Tuple[float, float]] = {},
+        ladder_books: bool = False,
+        engine_number: int = 0,
+        snapshot_path: Optional[str] = None,
+        journal: Optional[Journal] = None,
+        shards: Optional[ShardPool] = None,
     ):
         self.engine_id = engine_id
         self.address = engine_addr
+        # engine_number goes in the top bits of every id this engine assigns,
+        # so it must be unique across the exchange
+        self.engine_number = engine_number
+        self.order_ids = IdSequence(engine_number)
+        self.execution_ids = IdSequence(engine_number)
         self.orderbooks: Dict[str, OrderBook] = {}
-        self.orders: Dict[str, Order] = {}
+        self.tick_sizes = tick_sizes.copy()
+        # symbol -> (min_price, max_price) its orders must be priced within
+        self.price_bands = price_bands.copy()
+        # give banded symbols an array-backed LadderOrderBook instead of an
+        # OrderBook; see new_orderbook for why it is off by default
+        self.ladder_books = ladder_books
+        self.orders: Dict[int, CompactOrder] = {}
         self.clients = []
-        self.fill_queues = {}
+        # client_id -> FillQueue drained by the client's GetFills stream
+        self.fill_queues: Dict[str, FillQueue] = {}
 
         self.log_directory = os.getcwd() + "/logs/engine_logs/"
         self.logger = LogFactory(
@@ -40,116 +67,508 @@ class MatchEngine:
         self.authentication_key = authentication_key
         self.exchange_credentials = exchange_credentials
         self.synchronizer = synchronizer
+        self.synchronizer.orderbooks = self.orderbooks
         self.cancel_fairy = cancel_fairy
         self.fill_routing_table = {}
+        # write-ahead record of accepted orders, cancels and fills
+        self.journal = journal
+        self.cancel_fairy.journal = journal
+        # with a started ShardPool the books live in its worker processes and
+        # self.orderbooks holds ShardedOrderBook stand-ins
+        self.shards = shards
+        self.cancel_fairy.shards = shards
+        if journal is not None:
+            # recovery replays into books in this process, and the workers may
+            # apply a symbol's orders and cancels in another order than the
+            # one they were journalled in
+            self._check_unsharded("journals")
+        # orders and cancels for each symbol are applied one at a time, in
+        # arrival order, by that symbol's sequencer task
+        self.sequencer = Sequencer()
+        self.cancel_fairy.sequencer = self.sequencer
+        # level changes for SubscribeMarketData, published as books change
+        self.market_data = MarketDataFeed(self.orderbooks)
+        self.cancel_fairy.market_data = self.market_data
+        # peers are pushed this engine's top of book when it moves
+        self.cancel_fairy.synchronizer = self.synchronizer
 
         self.symbol_bbo_lookup = {}
-        self.peer_addresses = []
+        # engines this one trades with, replaced when discover_peers runs
+        self.peer_addresses = list(synchronizer.peer_addresses)
+
+        if snapshot_path is None:
+            snapshot_path = os.getcwd() + f"/snapshots/{self.engine_id}.snapshot"
+        self.snapshot_path = snapshot_path
+        self.snapshotting = False
 
     async def start_synchronizer(self):
         await self.synchronizer.start()
 
-    def create_orderbook(self, symbol: str) -> None:
-        if symbol not in self.orderbooks:
-            self.orderbooks[symbol] = OrderBook(symbol)
+    async def start_snapshots(self, interval: float):
+        """Save a snapshot every interval seconds"""
+        self.snapshotting = True
+        asyncio.create_task(self._snapshot_loop(interval))
+        self.logger.info(f"saving snapshots to {self.snapshot_path} every {interval}s")
+
+    async def _snapshot_loop(self, interval: float):
+        while self.snapshotting:
+            await asyncio.sleep(interval)
+            try:
+                await self.save_snapshot()
+            except Exception as e:
+                self.logger.error(f"snapshot failed: {e}")
+
+    async def save_snapshot(self, path: Optional[str] = None) -> str:
+        """Snapshot the engine's order state to path (snapshot_path by default)"""
+        self._check_unsharded("snapshots")
+        path = path or self.snapshot_path
+        start = time.perf_counter()
+        # copy the live state without yielding so the snapshot is consistent,
+        # then pack and write it off the event loop
+        rows = snapshot.snapshot_rows(self)
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(None, snapshot.encode_rows, rows)
+        if self.journal is not None:
+            # the snapshot records the journal offset it includes events up to;
+            # only write it once those events are durable, or a crash could
+            # leave a snapshot pointing past the end of the recovered journal
+            await self.journal.commit()
+        await loop.run_in_executor(None, snapshot.write_snapshot, path, data)
+        self.logger.info(
+            f"saved snapshot of {len(self.cancel_fairy.active_orders)} active orders "
+            f"({len(data)} bytes) to {path} in {time.perf_counter() - start:.3f}s"
+        )
+        return path
+
+    def load_snapshot(self, path: Optional[str] = None) -> Optional[int]:
+        """Restore order state from path (snapshot_path by default) if it exists.
+
+        Must be called on a new engine, before it accepts orders. Returns the
+        journal offset the snapshot is up to date with, or None if there is
+        no snapshot.
+        """
+        self._check_unsharded("snapshots")
+        path = path or self.snapshot_path
+        if not os.path.exists(path):
+            self.logger.info(f"no snapshot at {path}, starting empty")
+            return None
 
-    async def submit_order(self, order):
-        """Submit new order to matching engine"""
+        start = time.perf_counter()
+        num_orders, journal_offset = snapshot.load_snapshot(self, path)
+        self.logger.info(
+            f"restored {num_orders} orders from {path} in {time.perf_counter() - start:.3f}s"
+        )
+        return journal_offset
 
-        self.logger.debug(f"received order: {order}")
-        self.logger.debug(
-            f"number of active orders: {len(list(self.cancel_fairy.active_orders.keys()))}"
+    def recover(self, snapshot_path: Optional[str] = None) -> None:
+        """Restore the latest snapshot, then replay the journal events after it.
+
+        Must be called on a new engine, before it accepts orders.
+        """
+        journal_offset = self.load_snapshot(snapshot_path) or 0
+        if self.journal is None:
+            return
+
+        start = time.perf_counter()
+        # replayed events are already in the journal
+        journal = self.journal
+        self.journal = self.cancel_fairy.journal = None
+        try:
+            stats = replay.replay_journal(self, journal.path, journal_offset)
+        finally:
+            self.journal = self.cancel_fairy.journal = journal
+        self.logger.info(
+            f"replayed {stats.num_events} journal events from {journal.path} "
+            f"in {time.perf_counter() - start:.3f}s"
         )
-        self.logger.debug(f"active order state: {self.cancel_fairy.active_orders}")
+        if stats.mismatches:
+            self.logger.error(
+                f"{len(stats.mismatches)} fills differ from the journal, first: "
+                f"{stats.mismatches[0]}"
+            )
 
-        # First check if the best price for this symbol is on another engine
-        best_me_addr = await self.synchronizer.lookup_bbo_engine(order)
-        if best_me_addr != self.address and order.engine_origin_addr == self.address:
-            # route the order at most once
-            self.logger.info(f"routing order from {self.address} -> {best_me_addr}")
-            await self.synchronizer.route_order(order, best_me_addr)
-            # add this order to the record of active orders
-            self.cancel_fairy.active_orders.update(
-                {
-                    order.order_id: {
-                        "remaining_quantity": order.remaining_quantity,
-                        "address": best_me_addr,
-                        "order_record": order,
-                    }
-                }
+    def _check_unsharded(self, feature: str) -> None:
+        if self.shards is not None:
+            raise RuntimeError(
+                f"{feature} need the order books in this process, "
+                f"not in {self.shards.num_shards} shard workers"
             )
-            return {"incoming_fills": [], "resting_fills": []}
 
-        # add this order to the record of active orders
-        self.cancel_fairy.active_orders.update(
-            {
-                order.order_id: {
-                    "remaining_quantity": order.remaining_quantity,
-                    "address": self.address,
-                    "order_record": order,
-                }
-            }
-        )
+    async def get_depth(self, symbol: str, num_levels: int = 0):
+        """get_depth of symbol's book, wherever it lives"""
+        if self.shards is not None:
+            return await self.shards.depth(symbol, num_levels)
+        return self.orderbooks[symbol].get_depth(num_levels)
+
+    def subscribe_market_data(
+        self, symbols: List[str], depth: int = 0
+    ) -> MarketDataSubscription:
+        """Subscribe to the level changes of symbols' books, depth levels a side
+        (0 for all of them), starting with a snapshot of each.
+
+        Raises ValueError if a symbol has neither a book nor a configured tick
+        size or price band, so subscribers cannot make the engine create books.
+        """
+        self._check_unsharded("market data feeds")
+        unknown = [
+            symbol
+            for symbol in symbols
+            if symbol not in self.orderbooks
+            and symbol not in self.tick_sizes
+            and symbol not in self.price_bands
+        ]
+        if unknown:
+            raise ValueError(f"unknown symbols: {', '.join(unknown)}")
+        for symbol in symbols:
+            self.create_orderbook(symbol)
+        return self.market_data.subscribe(symbols, depth)
+
+    def create_orderbook(
+        self, symbol: str, price_band: Optional[Tuple[float, float]] = None
+    ) -> None:
+        """Create the book for symbol, limited to its price band if it has one"""
+        if symbol not in self.orderbooks:
+            tick_size = self.tick_sizes.get(symbol, DEFAULT_TICK_SIZE)
+            if price_band is None:
+                price_band = self.price_bands.get(symbol)
+
+            if price_band is not None:
+                self.price_bands[symbol] = price_band
+            if self.shards is None:
+                self.orderbooks[symbol] = new_orderbook(
+                    symbol, tick_size, price_band, self.execution_ids, self.ladder_books
+                )
+            else:
+                self.orderbooks[symbol] = self.shards.create_orderbook(
+                    symbol, tick_size, price_band, self.ladder_books
+                )
 
-        self.orders[order.order_id] = order
+    async def submit_order(self, order):
+        """Submit new order to matching engine
 
-        # update fill routing table
-        self.fill_routing_table[order.client_id] = order.engine_origin_addr
+        Orders submitted here by a client are given an engine-assigned
+        order_id, written back into the request; orders routed here by a peer
+        keep the id given by their origin engine.
+        """
+
+        if self.journal is not None:
+            self.journal.check()
+        self._assign_order_id(order)
+
+        # lazy %s arguments: formatting the active orders is O(orders)
+        self.logger.debug("received order: %s", order)
         self.logger.debug(
-            f"registered {order.client_id} wanting fills on engine address {order.engine_origin_addr}"
+            "number of active orders: %d", len(self.cancel_fairy.active_orders)
         )
+        self.logger.debug("active order state: %s", self.cancel_fairy.active_orders)
 
-        # validate order
-        self.validate_order(order)
-        self.logger.debug("order validated")
+        # the BBO lookup and the match run on the symbol's sequencer, so orders
+        # and cancels for a symbol reach its book in the order they arrived
+        best_me_addr, fills = await self.sequencer.submit(
+            order.symbol, functools.partial(self._sequence_order, order)
+        )
+        if best_me_addr is not None:
+            await self._route_order(order, best_me_addr)
+            if self.journal is not None:
+                await self._commit_journal()
+            return {"incoming_fills": [], "resting_fills": []}
 
-        # add the order if not cancelled
-        fills = {}
-        async with asyncio.Lock():
-            if order.order_id in self.cancel_fairy.active_orders.keys():
-                fills = self.orderbooks[order.symbol].add_order(
-                    order, self.cancel_fairy.active_orders
-                )
+        if self.shards is not None:
+            fills = await fills
+        fills = fills.to_dict()
+
+        if self.journal is not None:
+            # no fill for this order reaches a client before it is durable
+            await self._commit_journal()
 
         self.logger.debug("order added")
         self.num_orders += 1
 
         # NOTE: Turn on this to see order book state after each order
         self.logger.debug(
-            f"order book state for {order.symbol} on engine {self.address}:\n"
-            + str(self.orderbooks[order.symbol])
+            "order book state for %s on engine %s:\n%s",
+            order.symbol,
+            self.address,
+            self.orderbooks[order.symbol],
         )
 
-        # Add fills to queues
-        if fills:
-            await self.cancel_fairy.update_active_orders_after_fills(
-                fills["incoming_fills"] + fills["resting_fills"]
+        await self._distribute_fills(fills)
+        return fills
+
+    async def submit_orders(self, orders) -> List[Optional[Exception]]:
+        """Submit a batch of orders to matching engine
+
+        Each symbol's orders are taken in one job on its sequencer, and the
+        ones not routed are matched in one pass through its book, in the order
+        given. Ids are assigned as for submit_order. Returns, per order, the
+        exception that rejected it, or None if it was accepted or routed.
+        """
+        if self.journal is not None:
+            self.journal.check()
+        by_symbol: Dict[str, List[int]] = {}
+        for i, order in enumerate(orders):
+            self._assign_order_id(order)
+            by_symbol.setdefault(order.symbol, []).append(i)
+        self.logger.debug(
+            "received batch of %d orders for %d symbols", len(orders), len(by_symbol)
+        )
+
+        batches = await asyncio.gather(
+            *(
+                self.sequencer.submit(
+                    symbol,
+                    functools.partial(
+                        self._sequence_orders, [orders[i] for i in indices]
+                    ),
+                )
+                for symbol, indices in by_symbol.items()
             )
-            self.logger.debug(
-                f"clients registered with ME {self.address}: {self.clients}"
+        )
+
+        errors: List[Optional[Exception]] = [None] * len(orders)
+        batch_fills = []
+        for indices, (routes, fills, batch_errors) in zip(by_symbol.values(), batches):
+            for i, error in zip(indices, batch_errors):
+                errors[i] = error
+            for position, order, best_me_addr in routes:
+                try:
+                    await self._route_order(order, best_me_addr)
+                except grpc.aio.AioRpcError as e:
+                    errors[indices[position]] = e
+            if self.shards is not None:
+                batch_fills.extend(await asyncio.gather(*fills))
+            else:
+                batch_fills.append(fills)
+            self.num_orders += (
+                len(indices)
+                - len(routes)
+                - sum(error is not None for error in batch_errors)
+            )
+
+        if self.journal is not None:
+            # no fill for this batch reaches a client before it is durable
+            await self._commit_journal()
+
+        for fills in batch_fills:
+            await self._distribute_fills(fills.to_dict())
+        return errors
+
+    async def _commit_journal(self) -> None:
+        """Wait for the events appended so far to be durable.
+
+        If they cannot be, the journal stops and the engine takes no more
+        orders, but the orders already applied are still reported and their
+        fills delivered: they are in the books, and some may be resting.
+        """
+        try:
+            await self.journal.commit()
+        except Exception as e:
+            self.logger.critical(
+                f"journal commit failed, no longer taking orders or cancels: {e}"
             )
-            for client_id, fill in fills["incoming_fills"] + fills["resting_fills"]:
-                if client_id in self.clients:
-                    self.fill_queues[client_id].put(fill)
-                    self.logger.debug(f"put to {client_id}")
-                    self.logger.debug(f"put: {fill}")
-                    self.num_fills += 1
+
+    def _assign_order_id(self, order) -> None:
+        # only an order routed from a peer keeps its id; a client can put any
+        # origin address on its order
+        if order.engine_origin_addr not in self.peer_addresses or not order.order_id:
+            order.order_id = self.order_ids.next_id()
+
+    async def _sequence_order(self, order):
+        """Route or match order, on its symbol's sequencer.
+
+        Returns (address to route to, None) if the best price is on another
+        engine, else (None, fills). With shards the fills are an awaitable of
+        them: the order is sent to its worker here, but the reply is waited for
+        off the sequencer so the symbol's next order can join the same batch.
+        """
+        # First check if the best price for this symbol is on another engine;
+        # the lookup prices the order's ticks with the symbol's book
+        self.create_orderbook(order.symbol)
+        best_me_addr = self.synchronizer.lookup_bbo_engine(order)
+        if best_me_addr != self.address and order.engine_origin_addr == self.address:
+            return best_me_addr, None
+
+        # the engine keeps a compact copy of the request from here on
+        order = CompactOrder.from_request(order)
+        if self.shards is None:
+            return None, self.accept_order(order)
+        self._register_order(order)
+        return None, self._sharded_fills(order, self.shards.match(order))
+
+    async def _sequence_orders(self, orders):
+        """_sequence_order for a batch of one symbol's orders.
+
+        Returns ([(position in batch, order, address to route to)], fills,
+        per-order exception or None). The orders that stay here are matched
+        together; with shards the fills are a list of awaitables, one per
+        order sent to its worker.
+        """
+        routes = []
+        errors: List[Optional[Exception]] = [None] * len(orders)
+        accepted: List[CompactOrder] = []
+        self.create_orderbook(orders[0].symbol)
+        for position, order in enumerate(orders):
+            best_me_addr = self.synchronizer.lookup_bbo_engine(order)
+            if (
+                best_me_addr != self.address
+                and order.engine_origin_addr == self.address
+            ):
+                routes.append((position, order, best_me_addr))
+                continue
+            compact = CompactOrder.from_request(order)
+            try:
+                self._register_order(compact)
+            except ValueError as e:
+                errors[position] = e
+                continue
+            accepted.append(compact)
+
+        if self.shards is not None:
+            fills = [
+                self._sharded_fills(order, self.shards.match(order))
+                for order in accepted
+            ]
+        elif accepted:
+            fills = self._match_orders(accepted)
+        else:
+            fills = FillBuffer()
+        return routes, fills, errors
+
+    async def _route_order(self, order, best_me_addr: str) -> None:
+        """Send order to the engine at best_me_addr and track it as active
+        there; the journal record is appended but not committed"""
+        # route the order at most once
+        self.logger.info(f"routing order from {self.address} -> {best_me_addr}")
+        await self.synchronizer.route_order(order, best_me_addr)
+        # add this order to the record of active orders
+        record = CompactOrder.from_request(order)
+        self.cancel_fairy.active_orders[order.order_id] = ActiveOrder(
+            order.remaining_quantity, best_me_addr, record
+        )
+        if self.journal is not None:
+            self.journal.append_routed(record, best_me_addr)
+
+    async def _distribute_fills(self, fills) -> None:
+        """Queue each fill for its client, or route it to the engine the
+        client's order came from"""
+        if not fills:
+            return
+        self.logger.debug(f"clients registered with ME {self.address}: {self.clients}")
+        for client_id, fill in fills["incoming_fills"] + fills["resting_fills"]:
+            if client_id in self.clients:
+                self.fill_queues[client_id].put(fill)
+                self.logger.debug(f"put to {client_id}")
+                self.logger.debug("put: %s", fill)
+                self.num_fills += 1
+            else:
+                # the filled order was a routed order
+                if client_id in self.fill_routing_table.keys():
+                    me_dst_addr = self.fill_routing_table[client_id]
+                    self.logger.debug(
+                        f"routing fill for client {client_id} to address {me_dst_addr}"
+                    )
+                    # push a fill
+                    await self.synchronizer.route_fill(fill, client_id, me_dst_addr)
                 else:
-                    # the filled order was a routed order
-                    if client_id in self.fill_routing_table.keys():
-                        me_dst_addr = self.fill_routing_table[client_id]
-                        self.logger.debug(
-                            f"routing fill for client {client_id} to address {me_dst_addr}"
-                        )
-                        # push a fill
-                        await self.synchronizer.route_fill(fill, client_id, me_dst_addr)
-                    else:
-                        self.logger.error(
-                            f"{client_id} not a registered client of {self.engine_id} and is not registered in the routing table"
-                        )
+                    self.logger.error(
+                        f"{client_id} not a registered client of {self.engine_id} and is not registered in the routing table"
+                    )
+
+    def accept_order(self, order: CompactOrder) -> FillBuffer:
+        """Validate, register and match an order on this engine without awaiting,
+        leaving active_orders up to date with the fills.
+
+        The order and its fills are appended to the journal, if there is one,
+        but not committed. Returns the fills of the match.
+        """
+        self._register_order(order)
+        return self._match_orders([order])
+
+    def _match_orders(self, orders: List[CompactOrder]) -> FillBuffer:
+        """Match registered orders for one symbol in one pass through its book,
+        recording the fills as accept_order does"""
+        fills = self.orderbooks[orders[0].symbol].add_orders(
+            orders, self.cancel_fairy.active_orders
+        )
+        self._record_match(orders, fills)
+        return fills
 
+    async def _sharded_fills(
+        self, order: CompactOrder, matches: Awaitable[List[Match]]
+    ) -> FillBuffer:
+        """Finish accepting a registered order sent to a ShardPool worker, once
+        the worker's matches come back"""
+        matches = await matches
+
+        # rebuild the worker's matches over this process's copies of the orders
+        fills = FillBuffer(self.orderbooks[order.symbol].tick_size)
+        for (
+            resting_id,
+            price_ticks,
+            quantity,
+            timestamp,
+            incoming_remaining,
+            resting_remaining,
+        ) in matches:
+            resting = self.orders[resting_id]
+            order.remaining_quantity = incoming_remaining
+            resting.remaining_quantity = resting_remaining
+            fills.append(
+                self.execution_ids.next_id(),
+                order,
+                resting,
+                price_ticks,
+                quantity,
+                timestamp,
+            )
+        self._record_match([order], fills)
         return fills
 
+    def _register_order(self, order: CompactOrder) -> None:
+        self.validate_order(order)
+        # a reused id would replace the live order's entries and orphan it
+        if order.order_id in self.cancel_fairy.active_orders or (
+            self.shards is None
+            and order.order_id in self.orderbooks[order.symbol].order_nodes
+        ):
+            raise ValueError(f"order id {order.order_id} is already in use")
+        self.logger.debug("order validated")
+
+        # add this order to the record of active orders
+        self.cancel_fairy.active_orders[order.order_id] = ActiveOrder(
+            order.remaining_quantity, self.address, order
+        )
+
+        self.orders[order.order_id] = order
+
+        # update fill routing table
+        self.fill_routing_table[order.client_id] = order.engine_origin_addr
+        self.logger.debug(
+            "registered %s wanting fills on engine address %s",
+            order.client_id,
+            order.engine_origin_addr,
+        )
+
+    def _record_match(self, orders: List[CompactOrder], fills: FillBuffer) -> None:
+        """Apply fills of orders matched together to active_orders and journal
+        each order with its own fills"""
+        if len(fills):
+            self.cancel_fairy.apply_fills(fills)
+        self.market_data.publish_match(orders, fills)
+        self.synchronizer.publish_bbo(orders[0].symbol)
+        if self.journal is not None:
+            # each order goes in next to its fills, as replay matches them one
+            # order at a time; add_orders leaves an order's fills in
+            # consecutive rows
+            start = 0
+            for order in orders:
+                stop = start
+                while stop < len(fills) and fills.incoming_orders[stop] is order:
+                    stop += 1
+                self.journal.append_order(order)
+                self.journal.append_fills(fills, start, stop)
+                start = stop
+
     def validate_order(self, order):
         if order.symbol not in self.orderbooks:
             self.create_orderbook(order.symbol)
@@ -160,10 +579,22 @@ class MatchEngine:
             )
             order.remaining_quantity = order.quantity
 
+        # book levels are keyed by integer ticks; the tick price wins if both are sent
+        orderbook = self.orderbooks[order.symbol]
+        if order.price_ticks:
+            order.price = orderbook.to_price(order.price_ticks)
+        else:
+            order.price_ticks = orderbook.to_ticks(order.price)
+
+        if not orderbook.in_band(order.price_ticks):
+            raise ValueError(
+                f"price {order.price} is outside the price band for {order.symbol}"
+            )
+
     def register_client(self, client_name):
         if client_name not in self.clients:
             self.clients.append(client_name)
-            self.fill_queues.update({client_name: queue.Queue()})
+            self.fill_queues.update({client_name: FillQueue()})
             self.logger.info(f"Registered client {client_name}")
         else:
             self.logger.warning(
@@ -214,7 +645,7 @@ class MatchEngine:
 
                 self.synchronizer.peer_addresses = self.peer_addresses
                 self.cancel_fairy.peer_addresses = self.peer_addresses
-                await self.synchronizer._connect_to_peers()
+                await self.start_synchronizer()
                 await self.cancel_fairy.connect_to_peers()
             else:
                 self.logger.error("unsuccessful discovery with exchange")
@@ -231,7 +662,7 @@ class MatchEngine:
             )
             return False
 
-    def cancel_order(self, order_id: str) -> Optional[Order]:
+    def cancel_order(self, order_id: int) -> Optional[CompactOrder]:
         """Cancel existing order"""
         if order_id not in self.orders:
             return None
@@ -0,0 +1,262 @@
+"""Deterministic replay of an engine journal.
+
+Replay feeds the orders and cancels recorded in a journal straight into
+MatchEngine.accept_order and CancelFairy.cancel_local, with no gRPC and nothing
+awaited, so it runs as fast as the matching itself. While an order is replayed
+its book's clock returns the timestamp recorded for that order's fills, so the
+fills come out identical to the recorded ones, timestamps included, and each
+one is checked against its record.
+
+It is how MatchEngine.recover catches up after a snapshot, and the standard
+throughput benchmark for matching changes:
+
+    python engine/replay.py journals/engine_0.journal
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.order import (
+    CompactOrder,
+    engine_number_of,
+    monotonic_time_ns,
+    sequence_of,
+)
+from engine.cancel_fairy import ActiveOrder
+from engine.journal import CANCEL, FILL, ORDER, ROUTED, read_journal
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+@dataclass
+class ReplayStats:
+    """Outcome of replaying a journal: counts, timings and any fills that differ"""
+
+    num_events: int = 0
+    num_fills: int = 0
+    # time spent in the engine, excluding decoding and checking
+    elapsed_ns: int = 0
+    # per event type, the ns each event took
+    latencies_ns: Dict[str, array] = field(default_factory=dict)
+    mismatches: List[str] = field(default_factory=list)
+
+    def events_per_second(self) -> float:
+        return self.num_events / (self.elapsed_ns / 1e9) if self.elapsed_ns else 0.0
+
+    def percentiles(self, event_type: str) -> Dict[float, int]:
+        """Latency in ns at each of PERCENTILES for event_type"""
+        latencies = sorted(self.latencies_ns.get(event_type, ()))
+        if not latencies:
+            return {}
+        return {
+            p: latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+            for p in PERCENTILES
+        }
+
+    def report(self) -> str:
+        lines = [
+            f"{self.num_events} events, {self.num_fills} fills in "
+            f"{self.elapsed_ns / 1e6:.1f} ms: {self.events_per_second():,.0f} events/s"
+        ]
+        for event_type, latencies in self.latencies_ns.items():
+            percentiles = ", ".join(
+                f"p{p:g} {ns / 1e3:.1f} us"
+                for p, ns in self.percentiles(event_type).items()
+            )
+            lines.append(f"\t{event_type} ({len(latencies)}): {percentiles}")
+        if self.mismatches:
+            lines.append(f"\t{len(self.mismatches)} MISMATCHES, first:")
+            lines.extend(f"\t\t{mismatch}" for mismatch in self.mismatches[:10])
+        else:
+            lines.append("\tall fills match the journal")
+        return "\n".join(lines)
+
+
+class _ReplayClock:
+    """Stands in for an order book's clock, returning the recorded timestamp"""
+
+    __slots__ = ("timestamp",)
+
+    def __init__(self):
+        self.timestamp = 0
+
+    def __call__(self) -> int:
+        return self.timestamp
+
+
+def _order_from_record(fields: tuple) -> CompactOrder:
+    (
+        order_id,
+        price,
+        price_ticks,
+        quantity,
+        timestamp,
+        symbol,
+        side,
+        client_id,
+        engine_origin_addr,
+        client_order_id,
+    ) = fields[:10]
+    return CompactOrder(
+        order_id=order_id,
+        symbol=symbol,
+        side=side,
+        price=price,
+        price_ticks=price_ticks,
+        quantity=quantity,
+        remaining_quantity=quantity,
+        timestamp=timestamp,
+        client_id=client_id,
+        engine_origin_addr=engine_origin_addr,
+        client_order_id=client_order_id,
+    )
+
+
+def load_events(path: str, offset: int = 0) -> List[Tuple[int, object, list]]:
+    """Decode the journal at path into (record type, event, recorded fills)
+
+    Orders become CompactOrders followed by the fill records they produced;
+    cancels and routed orders have no fills.
+    """
+    events = []
+    for record_type, fields in read_journal(path, offset):
+        if record_type == FILL:
+            if events and events[-1][0] == ORDER:
+                events[-1][2].append(fields)
+        elif record_type == ORDER:
+            events.append((ORDER, _order_from_record(fields), []))
+        elif record_type == ROUTED:
+            events.append((ROUTED, (_order_from_record(fields), fields[10]), []))
+        elif record_type == CANCEL:
+            events.append((CANCEL, fields, []))
+    return events
+
+
+def replay_events(engine, events: List[Tuple[int, object, list]]) -> ReplayStats:
+    """Apply decoded journal events to engine, which must not have a journal"""
+    stats = ReplayStats()
+    order_latencies = stats.latencies_ns.setdefault("order", array("q"))
+    cancel_latencies = stats.latencies_ns.setdefault("cancel", array("q"))
+    active_orders = engine.cancel_fairy.active_orders
+    clock = _ReplayClock()
+    clocked = set()
+    last_order_sequence = engine.order_ids.sequence
+    perf_counter_ns = time.perf_counter_ns
+
+    try:
+        for record_type, event, recorded in events:
+            if record_type == ORDER:
+                order = event
+                if order.symbol not in clocked:
+                    engine.create_orderbook(order.symbol)
+                    engine.orderbooks[order.symbol].clock = clock
+                    clocked.add(order.symbol)
+                # every fill of an order shares the one timestamp
+                clock.timestamp = recorded[0][5] if recorded else 0
+
+                start = perf_counter_ns()
+                fills = engine.accept_order(order)
+                order_latencies.append(perf_counter_ns() - start)
+
+                stats.num_fills += len(fills)
+                replayed = [
+                    (
+                        fills.fill_id[i],
+                        fills.incoming_orders[i].order_id,
+                        fills.resting_orders[i].order_id,
+                        fills.price_ticks[i],
+                        fills.quantity[i],
+                        fills.timestamp[i],
+                    )
+                    for i in range(len(fills))
+                ]
+                if replayed != recorded:
+                    stats.mismatches.append(
+                        f"order {order.order_id}: journal {recorded}, replay {replayed}"
+                    )
+            elif record_type == ROUTED:
+                order, address = event
+                active_orders[order.order_id] = ActiveOrder(
+                    order.remaining_quantity, address, order
+                )
+            else:
+                order_id, quantity, symbol = event
+                start = perf_counter_ns()
+                if symbol in engine.orderbooks:
+                    cancelled = engine.cancel_fairy.cancel_local(
+                        order_id, engine.orderbooks[symbol]
+                    )
+                else:
+                    cancelled = (False, 0)
+                cancel_latencies.append(perf_counter_ns() - start)
+
+                if cancelled != (True, quantity):
+                    stats.mismatches.append(
+                        f"cancel {order_id}: journal {quantity}, replay {cancelled}"
+                    )
+                order = None
+
+            if order is not None and (
+                engine_number_of(order.order_id) == engine.engine_number
+            ):
+                last_order_sequence = max(
+                    last_order_sequence, sequence_of(order.order_id)
+                )
+            stats.num_events += 1
+    finally:
+        for symbol in clocked:
+            engine.orderbooks[symbol].clock = monotonic_time_ns
+
+    stats.elapsed_ns = sum(order_latencies) + sum(cancel_latencies)
+    # ids this engine handed out before the restart must not be reused
+    engine.order_ids.sequence = last_order_sequence
+    return stats
+
+
+def replay_journal(engine, path: str, offset: int = 0) -> ReplayStats:
+    """Replay the journal at path, from byte offset, into engine"""
+    return replay_events(engine, load_events(path, offset))
+
+
+async def main():
+    from engine.cancel_fairy import CancelFairy
+    from engine.match_engine import MatchEngine
+    from engine.synchronizer import OrderBookSynchronizer
+
+    parser = argparse.ArgumentParser(
+        description="Replay an engine journal into a fresh engine and check its fills"
+    )
+    parser.add_argument("journal")
+    parser.add_argument("--address", default="127.0.0.1:50051")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    events = load_events(args.journal)
+    print(f"decoded {len(events)} events in {time.perf_counter() - start:.2f}s")
+
+    # the fill ids to expect come from the engine that wrote the journal
+    first_fill = next((recorded[0] for _, _, recorded in events if recorded), None)
+    engine_number = 0 if first_fill is None else engine_number_of(first_fill[0])
+    engine = MatchEngine(
+        "replay",
+        args.address,
+        OrderBookSynchronizer("replay", args.address),
+        CancelFairy("replay", args.address),
+        engine_number=engine_number,
+    )
+    if first_fill is not None:
+        engine.execution_ids.sequence = sequence_of(first_fill[0]) - 1
+
+    print(replay_events(engine, events).report())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
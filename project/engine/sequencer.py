@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class Sequencer:
+    """Runs the jobs submitted for each symbol one at a time, in submission order.
+
+    Every symbol gets a queue drained by a single task, so a job that awaits
+    (a BBO lookup on the peers, a shard round trip) still finishes before the
+    next job for its symbol starts, without any lock. Different symbols have
+    different tasks and proceed concurrently.
+    """
+
+    def __init__(self):
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(
+        self, symbol: str, job: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        """Queue job, a coroutine function, behind the jobs already queued for
+        symbol; the returned future gets its result"""
+        queue = self.queues.get(symbol)
+        if queue is None:
+            queue = self.queues[symbol] = asyncio.Queue()
+            self.tasks[symbol] = asyncio.get_running_loop().create_task(
+                self._drain(queue)
+            )
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait((job, future))
+        return future
+
+    async def _drain(self, queue: asyncio.Queue):
+        while True:
+            job, future = await queue.get()
+            if future.cancelled():
+                # the submitter gave up before the job started
+                continue
+            try:
+                result = await job()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def close(self) -> None:
+        """Stop every symbol's task; queued jobs are dropped"""
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks = {}
+        self.queues = {}
@@ -0,0 +1,330 @@
+"""Order books spread by symbol over worker processes.
+
+A MatchEngine given a ShardPool keeps its gRPC front end, ids, active orders
+and fill queues in its own process, while its books live in the pool's
+workers, each owning the symbols shard_of assigns to it. The front end sends
+every order and cancel to its symbol's worker, and turns the matches that come
+back into a FillBuffer over its own copies of the orders, so fills reach
+clients exactly as they do from an unsharded engine. A sharded engine keeps
+no journal, snapshots or market data feeds, as those need the books in the
+front end's process.
+
+Messages to a worker are batched: while one batch is being matched, everything
+sent to that worker queues up and goes over as the next batch, so the pipe
+round trip is paid once per batch rather than once per order. Batches are
+pickled and written in an executor, so a full pipe never blocks the event
+loop.
+
+Whether sharding speeds an engine up is unverified: the shard benchmark has
+only been run on a single core, where the pipe traffic makes it slower than
+keeping the books in process, and slower the more workers there are. Engines
+run unsharded unless asked otherwise.
+"""
+
+import asyncio
+import multiprocessing
+import signal
+import zlib
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from common.ladder_orderbook import new_orderbook
+from common.order import DEFAULT_TICK_SIZE, CompactOrder, price_to_ticks, ticks_to_price
+from common.orderbook import OrderBook
+
+# worker commands, sent as (command, symbol, *arguments)
+BOOK = 0
+ORDER = 1
+CANCEL = 2
+DEPTH = 3
+
+# a match sent back by a worker: resting order_id, price_ticks, quantity,
+# timestamp, then the incoming and resting orders' remaining quantity
+Match = Tuple[int, int, int, int, int, int]
+
+
+def shard_of(symbol: str, num_shards: int) -> int:
+    """Index of the shard that owns symbol, the same in every process and run"""
+    return zlib.crc32(symbol.encode()) % num_shards
+
+
+class _ShardBooks:
+    """The books owned by one worker process"""
+
+    def __init__(self):
+        self.orderbooks: Dict[str, OrderBook] = {}
+        # orders resting in this worker's books, passed to the books as their
+        # active_orders
+        self.active_orders: Dict[int, CompactOrder] = {}
+
+    def handle(self, command: tuple):
+        """Run one command, returning (result, top of book after it or None)"""
+        kind, symbol = command[0], command[1]
+        if kind == ORDER:
+            return self._match(symbol, *command[2:])
+        if kind == CANCEL:
+            orderbook = self.orderbooks[symbol]
+            self.active_orders.pop(command[2], None)
+            return orderbook.remove_order(command[2]), orderbook.get_bbo()
+        if kind == DEPTH:
+            orderbook = self.orderbooks.get(symbol)
+            if orderbook is None:
+                return ([], []), None
+            return orderbook.get_depth(command[2]), None
+        # BOOK
+        tick_size, price_band, ladder = command[2:]
+        if symbol not in self.orderbooks:
+            self.orderbooks[symbol] = new_orderbook(
+                symbol, tick_size, price_band, ladder=ladder
+            )
+        return None, None
+
+    def _match(self, symbol, order_id, side, price, price_ticks, quantity):
+        order = CompactOrder(
+            order_id=order_id,
+            symbol=symbol,
+            side=side,
+            price=price,
+            price_ticks=price_ticks,
+            quantity=quantity,
+            remaining_quantity=quantity,
+            timestamp=0,
+            client_id="",
+            engine_origin_addr="",
+        )
+        self.active_orders[order_id] = order
+        orderbook = self.orderbooks[symbol]
+        fills = orderbook.add_orders([order], self.active_orders)
+        matches = list(
+            zip(
+                [resting.order_id for resting in fills.resting_orders],
+                fills.price_ticks,
+                fills.quantity,
+                fills.timestamp,
+                fills.incoming_remaining,
+                fills.resting_remaining,
+            )
+        )
+        return matches, orderbook.get_bbo()
+
+
+def _worker_main(conn) -> None:
+    # the front end decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    books = _ShardBooks()
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            return
+        if batch is None:
+            return
+
+        results = []
+        for command in batch:
+            try:
+                results.append(books.handle(command))
+            except Exception as e:
+                results.append((e, None))
+        conn.send(results)
+
+
+class ShardedOrderBook:
+    """Front end stand-in for a book that lives in a worker.
+
+    It knows the symbol's tick size and band, for validating orders, and keeps
+    the top of book as of the worker's latest reply.
+    """
+
+    def __init__(
+        self,
+        symbol: str,
+        tick_size: float = DEFAULT_TICK_SIZE,
+        price_band: Optional[Tuple[float, float]] = None,
+    ):
+        self.symbol = symbol
+        self.tick_size = tick_size
+        self.price_band = price_band
+        if price_band is not None:
+            self.min_price_ticks = price_to_ticks(price_band[0], tick_size)
+            self.max_price_ticks = price_to_ticks(price_band[1], tick_size)
+        self.best_bid: Optional[int] = None
+        self.best_bid_quantity = 0
+        self.best_ask: Optional[int] = None
+        self.best_ask_quantity = 0
+        # bumped by every reply from a command that changed the book
+        self.version = 0
+
+    def in_band(self, price_ticks: int) -> bool:
+        if self.price_band is None:
+            return True
+        return self.min_price_ticks <= price_ticks <= self.max_price_ticks
+
+    def to_ticks(self, price: float) -> int:
+        return price_to_ticks(price, self.tick_size)
+
+    def to_price(self, price_ticks: int) -> float:
+        return ticks_to_price(price_ticks, self.tick_size)
+
+    def get_bbo(self):
+        return (
+            self.best_bid,
+            self.best_bid_quantity,
+            self.best_ask,
+            self.best_ask_quantity,
+        )
+
+
+class _Worker:
+    """Front end end of the pipe to one worker process"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        # (command, future) waiting for the next batch
+        self.pending: List[Tuple[tuple, asyncio.Future]] = []
+        # (symbol, future) of the batch the worker is matching, in order
+        self.in_flight: Deque[Tuple[str, asyncio.Future]] = deque()
+        self.reading = False
+
+
+class ShardPool:
+    """Worker processes that each own the books of a subset of symbols"""
+
+    def __init__(self, num_shards: int):
+        if num_shards < 1:
+            raise ValueError(f"a shard pool needs at least one shard, not {num_shards}")
+        self.num_shards = num_shards
+        self.workers: List[_Worker] = []
+        self.orderbooks: Dict[str, ShardedOrderBook] = {}
+        self.batches = 0
+        self.commands = 0
+
+    def start(self) -> None:
+        """Start the worker processes"""
+        # spawn rather than fork, so workers never inherit grpc's threads
+        context = multiprocessing.get_context("spawn")
+        for i in range(self.num_shards):
+            conn, worker_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main, args=(worker_conn,), name=f"shard-{i}", daemon=True
+            )
+            process.start()
+            worker_conn.close()
+            self.workers.append(_Worker(process, conn))
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        for worker in self.workers:
+            if worker.reading:
+                asyncio.get_running_loop().remove_reader(worker.conn.fileno())
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            worker.process.join(timeout=5)
+            worker.conn.close()
+        self.workers = []
+
+    def create_orderbook(
+        self,
+        symbol: str,
+        tick_size: float = DEFAULT_TICK_SIZE,
+        price_band: Optional[Tuple[float, float]] = None,
+        ladder: bool = False,
+    ) -> ShardedOrderBook:
+        """Create symbol's book in the worker that owns it, as new_orderbook
+        would"""
+        if symbol not in self.orderbooks:
+            self.orderbooks[symbol] = ShardedOrderBook(symbol, tick_size, price_band)
+            # the reply needs no waiting for: later commands queue behind it
+            self._send(symbol, (BOOK, symbol, tick_size, price_band, ladder))
+        return self.orderbooks[symbol]
+
+    def match(self, order: CompactOrder) -> "asyncio.Future[List[Match]]":
+        """Send order to its symbol's worker to match, returning a future of the
+        matches it made.
+
+        Commands for a symbol are matched in the order they are sent, whenever
+        their futures are awaited.
+        """
+        return self._send(
+            order.symbol,
+            (
+                ORDER,
+                order.symbol,
+                order.order_id,
+                order.side,
+                order.price,
+                order.price_ticks,
+                order.remaining_quantity,
+            ),
+        )
+
+    def cancel(self, order_id: int, symbol: str) -> "asyncio.Future[Optional[int]]":
+        """Take a resting order out of its book; the future gets its remaining
+        quantity or None if it was not resting"""
+        return self._send(symbol, (CANCEL, symbol, order_id))
+
+    def depth(self, symbol: str, num_levels: int = 0) -> asyncio.Future:
+        """Future of the get_depth of symbol's book"""
+        return self._send(symbol, (DEPTH, symbol, num_levels))
+
+    def _send(self, symbol: str, command: tuple) -> asyncio.Future:
+        worker = self.workers[shard_of(symbol, self.num_shards)]
+        future = asyncio.get_running_loop().create_future()
+        worker.pending.append((command, future))
+        if not worker.in_flight:
+            self._flush(worker)
+        return future
+
+    def _flush(self, worker: _Worker) -> None:
+        """Send everything pending for worker as one batch"""
+        loop = asyncio.get_running_loop()
+        if not worker.reading:
+            loop.add_reader(worker.conn.fileno(), self._receive, worker)
+            worker.reading = True
+        batch = [command for command, _ in worker.pending]
+        worker.in_flight.extend(
+            (command[1], future) for command, future in worker.pending
+        )
+        self.batches += 1
+        self.commands += len(worker.pending)
+        worker.pending = []
+        # pickling a big batch and writing it into a full pipe would hold up
+        # the event loop, so send off it; the next batch only goes once this
+        # one's reply is in, so sends to a worker never overlap
+        sent = loop.run_in_executor(None, worker.conn.send, batch)
+        sent.add_done_callback(lambda sent: self._sent(worker, sent))
+
+    def _sent(self, worker: _Worker, sent: asyncio.Future) -> None:
+        if sent.cancelled() or sent.exception() is None:
+            return
+        # the worker will never reply to the batch
+        error = sent.exception()
+        while worker.in_flight:
+            _, future = worker.in_flight.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    def _receive(self, worker: _Worker) -> None:
+        results = worker.conn.recv()
+        for result, bbo in results:
+            symbol, future = worker.in_flight.popleft()
+            if bbo is not None:
+                orderbook = self.orderbooks[symbol]
+                (
+                    orderbook.best_bid,
+                    orderbook.best_bid_quantity,
+                    orderbook.best_ask,
+                    orderbook.best_ask_quantity,
+                ) = bbo
+                orderbook.version += 1
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        if worker.pending:
+            self._flush(worker)
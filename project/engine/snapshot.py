@@ -0,0 +1,328 @@
+"""Binary snapshots of a MatchEngine's order state.
+
+A snapshot holds the order books, the live orders (those resting in a book or
+in CancelFairy.active_orders), the fill routing table and the engine's id
+sequences, so that a restarted engine can pick up where it left off. Orders
+that have finished, client registrations and undelivered fills are not
+included; clients register again after a restart. The header
+records how far the engine's journal had got, so that recovery replays only
+the events after the snapshot.
+
+File layout, all little endian:
+
+    header   HEADER
+    strings  num_strings + 1 uint32 byte offsets, then the utf-8 bytes
+    books    num_books BOOK records
+    orders   num_orders ORDER records: the resting orders of each book in turn,
+             in the order OrderBook.resting_orders yields them, followed by
+             the other active orders
+    routes   num_routes ROUTE records of fill_routing_table
+
+Orders are fixed size records, so a restore memory-maps the file and rebuilds
+everything in a single struct.iter_unpack pass over the orders section.
+"""
+
+import gc
+import mmap
+import os
+import struct
+import time
+from itertools import accumulate, islice
+from typing import List, Tuple
+
+from common.order import CompactOrder, OrderStatus, ticks_to_price
+from engine.cancel_fairy import ActiveOrder
+
+MAGIC = b"MESNAP03"
+
+# magic, created at (ns), last order and execution sequence numbers, journal
+# offset, num_strings, num_books, num_orders, num_routes
+HEADER = struct.Struct("<8sqqqqIIII")
+# symbol, tick size, has a price band, min and max price ticks, resting order
+# count
+BOOK = struct.Struct("<IdBqqI")
+# order_id, price, price_ticks, quantity, remaining_quantity, timestamp,
+# active remaining quantity, then string indexes for symbol, side, client_id,
+# engine_origin_addr, client_order_id and active address, then status; each
+# order goes in both MatchEngine.orders and CancelFairy.active_orders
+ORDER = struct.Struct("<QdqqqqqIIIIIIB")
+# client_id, engine address
+ROUTE = struct.Struct("<II")
+
+NO_STRING = 0xFFFFFFFF
+STATUSES = list(OrderStatus)
+STATUS_INDEX = {status: i for i, status in enumerate(STATUSES)}
+
+
+class _StringTable(dict):
+    """Maps each string to its index in the snapshot, adding it on first lookup"""
+
+    def __missing__(self, string: str) -> int:
+        i = self[string] = len(self)
+        return i
+
+    def encode(self) -> bytes:
+        encoded = [string.encode() for string in self]
+        offsets = [0, *accumulate(len(string) for string in encoded)]
+        return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+
+
+def snapshot_rows(engine) -> tuple:
+    """Copy the engine's live order state: its books and active orders.
+
+    This does not await, so the copy is consistent with respect to the
+    engine's other coroutines. Only the fields that change once an order is
+    accepted are copied, with a reference to the order for the rest, so it is
+    cheap enough to run on the event loop; encode_rows packs the result and
+    can run in an executor.
+    """
+    # the copy makes a tuple per order, which would otherwise set off
+    # repeated cyclic gc passes over the whole heap
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        books = []
+        for symbol, orderbook in engine.orderbooks.items():
+            banded = orderbook.price_band is not None
+            books.append(
+                (
+                    symbol,
+                    orderbook.tick_size,
+                    banded,
+                    orderbook.min_price_ticks if banded else 0,
+                    orderbook.max_price_ticks if banded else 0,
+                    list(orderbook.resting_orders()),
+                )
+            )
+        active = [
+            (
+                active.order_record,
+                active.order_record.remaining_quantity,
+                active.order_record.status,
+                active.remaining_quantity,
+                active.address,
+            )
+            for active in engine.cancel_fairy.active_orders.values()
+        ]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    header = (
+        time.time_ns(),
+        engine.order_ids.sequence,
+        engine.execution_ids.sequence,
+        0 if engine.journal is None else engine.journal.offset,
+    )
+    return header, books, active, list(engine.fill_routing_table.items())
+
+
+def encode_rows(snapshot: tuple) -> bytes:
+    """Pack state copied by snapshot_rows into the snapshot file format"""
+    header, books, active, routes = snapshot
+    strings = _StringTable()
+    active_rows = {row[0].order_id: row for row in active}
+    records = []
+
+    def add_order(order, remaining_quantity, status, active_remaining, address):
+        records.append(
+            ORDER.pack(
+                order.order_id,
+                order.price,
+                order.price_ticks,
+                order.quantity,
+                remaining_quantity,
+                order.timestamp,
+                active_remaining,
+                strings[order.symbol],
+                strings[order.side],
+                strings[order.client_id],
+                strings[order.engine_origin_addr],
+                strings[order.client_order_id],
+                strings[address],
+                STATUS_INDEX[status],
+            )
+        )
+
+    # resting orders first, book by book, then the active orders resting
+    # elsewhere; every resting order is active, see OrderBook.add_orders
+    packed_books = []
+    for symbol, tick_size, banded, min_ticks, max_ticks, resting in books:
+        for order in resting:
+            add_order(*active_rows.pop(order.order_id))
+        packed_books.append(
+            BOOK.pack(
+                strings[symbol],
+                tick_size,
+                banded,
+                min_ticks,
+                max_ticks,
+                len(resting),
+            )
+        )
+    for row in active_rows.values():
+        add_order(*row)
+
+    packed_routes = [
+        ROUTE.pack(strings[client_id], strings[address])
+        for client_id, address in routes
+    ]
+    packed_header = HEADER.pack(
+        MAGIC,
+        *header,
+        len(strings),
+        len(packed_books),
+        len(records),
+        len(packed_routes),
+    )
+    return b"".join(
+        [packed_header, strings.encode(), *packed_books, *records, *packed_routes]
+    )
+
+
+def encode_snapshot(engine) -> bytes:
+    """Serialize engine's live order state in one go"""
+    return encode_rows(snapshot_rows(engine))
+
+
+def write_snapshot(path: str, data: bytes) -> None:
+    """Write data to path atomically, so a crash never leaves a partial snapshot"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(engine, path: str) -> Tuple[int, int]:
+    """Restore the state saved at path into a freshly created engine.
+
+    Returns the number of orders restored and the journal offset the snapshot
+    is up to date with.
+    """
+    # everything built here is long lived, so cyclic gc passes over the new
+    # objects while restoring are wasted work
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_snapshot(engine, path)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _load_snapshot(engine, path: str) -> Tuple[int, int]:
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm, memoryview(mm) as view:
+        (
+            magic,
+            _,
+            order_sequence,
+            execution_sequence,
+            journal_offset,
+            num_strings,
+            num_books,
+            num_orders,
+            num_routes,
+        ) = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a matching engine snapshot")
+        offset = HEADER.size
+
+        string_offsets = struct.unpack_from(f"<{num_strings + 1}I", view, offset)
+        offset += 4 * (num_strings + 1)
+        blob = view[offset : offset + string_offsets[-1]]
+        strings = [
+            str(blob[start:end], "utf-8")
+            for start, end in zip(string_offsets, string_offsets[1:])
+        ]
+        blob.release()
+        offset += string_offsets[-1]
+
+        books = [
+            BOOK.unpack_from(view, offset + i * BOOK.size) for i in range(num_books)
+        ]
+        offset += num_books * BOOK.size
+
+        with view[offset : offset + num_orders * ORDER.size] as section:
+            orders = _restore_orders(engine, strings, ORDER.iter_unpack(section))
+            for (
+                symbol,
+                tick_size,
+                banded,
+                min_ticks,
+                max_ticks,
+                num_resting,
+            ) in books:
+                orderbook = _restore_orderbook(
+                    engine, strings[symbol], tick_size, banded, min_ticks, max_ticks
+                )
+                orderbook.rest_orders(islice(orders, num_resting))
+            # orders that are not resting in any book
+            for _ in orders:
+                pass
+        offset += num_orders * ORDER.size
+
+        for i in range(num_routes):
+            client_id, address = ROUTE.unpack_from(view, offset + i * ROUTE.size)
+            engine.fill_routing_table[strings[client_id]] = strings[address]
+
+    engine.order_ids.sequence = max(engine.order_ids.sequence, order_sequence)
+    engine.execution_ids.sequence = max(
+        engine.execution_ids.sequence, execution_sequence
+    )
+    return num_orders, journal_offset
+
+
+def _restore_orders(engine, strings: List[str], records):
+    """Rebuild each order record, registering it with the engine, and yield it"""
+    active_orders = engine.cancel_fairy.active_orders
+    for (
+        order_id,
+        price,
+        price_ticks,
+        quantity,
+        remaining_quantity,
+        timestamp,
+        active_remaining,
+        symbol,
+        side,
+        client_id,
+        engine_origin_addr,
+        client_order_id,
+        address,
+        status,
+    ) in records:
+        order = CompactOrder(
+            order_id=order_id,
+            symbol=strings[symbol],
+            side=strings[side],
+            price=price,
+            price_ticks=price_ticks,
+            quantity=quantity,
+            remaining_quantity=remaining_quantity,
+            timestamp=timestamp,
+            client_id=strings[client_id],
+            engine_origin_addr=strings[engine_origin_addr],
+            status=STATUSES[status],
+            client_order_id=strings[client_order_id],
+        )
+        engine.orders[order_id] = order
+        active_orders[order_id] = ActiveOrder(active_remaining, strings[address], order)
+        yield order
+
+
+def _restore_orderbook(engine, symbol, tick_size, banded, min_ticks, max_ticks):
+    engine.tick_sizes[symbol] = tick_size
+    if banded:
+        engine.price_bands[symbol] = (
+            ticks_to_price(min_ticks, tick_size),
+            ticks_to_price(max_ticks, tick_size),
+        )
+    engine.create_orderbook(symbol)
+    return engine.orderbooks[symbol]
@@ -1,11 +1,9 @@
 import asyncio
-import time
-from typing import Dict, List, Set
+from typing import Dict, List, Tuple
 import grpc
 import grpc.aio
-import pytz
 
-from common.order import Order, OrderStatus
+from common.orderbook import OrderBook
 import proto.matching_service_pb2 as pb2
 import proto.matching_service_pb2_grpc as pb2_grpc
 
@@ -21,39 +19,69 @@ from client.custom_formatter import LogFactory
 
 class OrderBookSynchronizer:
     def __init__(
-        self, engine_id: str, engine_addr: str, peer_addresses: List[str] = []
+        self,
+        engine_id: str,
+        engine_addr: str,
+        peer_addresses: List[str] = [],
+        flush_interval_ms: float = 2.0,
+        flush_every: int = 256,
     ):
+        """
+        flush_interval_ms: longest a book change waits to be sent to peers;
+            with 0 a flush goes out as soon as the previous one is done
+        flush_every: flush early once this many symbols have pending updates
+        """
         self.engine_id = engine_id
         self.engine_addr = engine_addr
         self.peer_addresses = peer_addresses
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_every = flush_every
         self.sequence_number = 0
-        self.update_queue = asyncio.Queue()
+        # symbol -> (bids, asks) not yet sent to peers; a newer update for a
+        # symbol replaces the pending one
+        self.pending_updates: Dict[str, Tuple[List[tuple], List[tuple]]] = {}
+        self._has_pending = asyncio.Event()
+        self._flush_full = asyncio.Event()
+        # flushes and per-symbol updates sent since the synchronizer started
+        self.flushes = 0
+        self.updates_sent = 0
+        self.bytes_sent = 0
         self.peer_stubs: Dict[str, pb2_grpc.MatchingServiceStub] = {}
-        self.known_orders: Set[str] = set()
         self.running = False
-        self.lock = asyncio.Lock()
-        self.global_best_prices: Dict[str, Dict[str, Optional[float]]] = {}
+        # symbol -> peer address -> (sequence_number, best bid, quantity,
+        # best ask, quantity), as of the last update applied from the peer
+        self.global_best_prices: Dict[str, Dict[str, tuple]] = {}
+        # peer address -> sequence number of the last update applied from it
+        self.peer_sequence_numbers: Dict[str, int] = {}
+        # symbol -> (best bid, quantity, best ask, quantity) last queued for
+        # peers, prices in ticks
+        self.published_bbo: Dict[str, tuple] = {}
+        # the owning engine's order books, read directly for local top of book
+        self.orderbooks: Dict[str, OrderBook] = {}
 
         self.log_directory = os.getcwd() + "/logs/synchronizer_logs/"
         self.logger = LogFactory(
             name=f"Synchronizer-ME {self.engine_id}", log_directory=self.log_directory
         ).get_logger()
 
-        # Include itself in peer_stubs
-        self.stub = pb2_grpc.MatchingServiceStub(
-            grpc.aio.insecure_channel(self.engine_addr)
-        )
-
     async def start(self):
-        """Start the synchronizer"""
+        """Start the synchronizer, or reconnect it after peers changed, and
+        push the top of every local book to the peers"""
         await self._connect_to_peers()
-        self.running = True
-        asyncio.create_task(self._sync_loop())
+        if not self.running:
+            self.running = True
+            asyncio.create_task(self._sync_loop())
+        # a peer that just connected has none of this engine's books
+        self.published_bbo.clear()
+        for symbol in self.orderbooks:
+            self.publish_bbo(symbol)
         self.logger.info(f"Synchronizer {self.engine_id} started")
 
     async def stop(self):
         """Stop the synchronizer"""
         self.running = False
+        # wake the sync loop so it can exit
+        self._has_pending.set()
         # Close all gRPC channels
         for stub in self.peer_stubs.values():
             if hasattr(stub, "_channel"):
@@ -70,155 +98,217 @@ class OrderBookSynchronizer:
                 self.logger.error(f"Failed to connect to peer at {address}: {e}")
 
     async def _sync_loop(self):
-        """Main synchronization loop"""
-        while self.running:
+        """Send pending updates to every peer in flushes.
+
+        A flush waits until flush_interval_ms has passed since the first
+        pending update or flush_every symbols are pending, whichever is first,
+        then sends each pending symbol's latest state to all peers at once.
+        Updates made while a flush is in flight conflate into the next one, so
+        flushes grow with the load and slow peers delay, rather than queue,
+        what is sent.
+        """
+        while True:
+            await self._has_pending.wait()
+            if not self.running:
+                return
+            if self.flush_interval > 0 and len(self.pending_updates) < self.flush_every:
+                # give more changes until the deadline to join this flush
+                try:
+                    await asyncio.wait_for(
+                        self._flush_full.wait(), timeout=self.flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            self._has_pending.clear()
+            self._flush_full.clear()
+
+            pending, self.pending_updates = self.pending_updates, {}
             try:
-                # Get next update from queue
-                update = await self.update_queue.get()
+                await self._broadcast_updates(pending)
+            except Exception as e:
+                self.logger.error(f"Error broadcasting updates: {e}")
+
+    async def _broadcast_updates(
+        self, pending: Dict[str, Tuple[List[tuple], List[tuple]]]
+    ):
+        """Send the top of book of each pending symbol to all peer engines
+        concurrently, and to each peer in sequence number order"""
+        requests = []
+        for symbol, (bids, asks) in pending.items():
+            # each update carries the next of this engine's sequence numbers
+            self.sequence_number += 1
+            requests.append(
+                pb2.BroadcastOrderbookRequest(
+                    symbol=symbol,
+                    sequence_number=self.sequence_number,
+                    originating_engine_id=self.engine_id,
+                    originating_engine_addr=self.engine_addr,
+                    bids=[
+                        pb2.PriceLevel(price=price, quantity=qty, order_count=count)
+                        for price, qty, count in bids
+                    ],
+                    asks=[
+                        pb2.PriceLevel(price=price, quantity=qty, order_count=count)
+                        for price, qty, count in asks
+                    ],
+                )
+            )
+        if not requests:
+            return
 
+        async def send(address: str, stub: pb2_grpc.MatchingServiceStub):
+            # one at a time, so the peer sees the updates in order
+            for request in requests:
                 try:
-                    await self._broadcast_update(update)
-                    self.update_queue.task_done()
+                    await stub.BroadcastOrderbook(request)
                 except Exception as e:
-                    print(f"Error broadcasting update: {e}")
-                    self.update_queue.task_done()
+                    # the peer resyncs when it sees the gap this leaves
+                    self.logger.error(f"Broadcast error to {address}: {e}")
+                    return
 
-            #                try:
-            #                    await self._process_peer_updates()
-            #                    await asyncio.sleep(0.1)
-            #                except Exception as e:
-            #                    print(f"Error processing peer updates: {e}")
-
-            except Exception as e:
-                print(f"Sync error: {e}")
-                await asyncio.sleep(1)
-
-            await asyncio.sleep(0.1)  # return control
-
-    async def _broadcast_update(self, update: dict):
-        """Broadcast update to all peer engines"""
-        pb_update = pb2.BroadcastOrderbookRequest(
-            symbol=update["symbol"],
-            sequence_number=self.sequence_number,
-            originating_engine_id=self.engine_id,
-            bids=[
-                pb2.PriceLevel(price=price, quantity=qty, order_count=count)
-                for price, qty, count in update["bids"]
-            ],
-            asks=[
-                pb2.PriceLevel(price=price, quantity=qty, order_count=count)
-                for price, qty, count in update["asks"]
-            ],
+        await asyncio.gather(
+            *(send(address, stub) for address, stub in self.peer_stubs.items())
+        )
+        self.flushes += 1
+        self.updates_sent += len(requests)
+        self.bytes_sent += len(self.peer_stubs) * sum(
+            request.ByteSize() for request in requests
         )
-
-        # Broadcast to all peers
-        tasks = []
-        for address, stub in self.peer_stubs.items():
-            try:
-                tasks.append(stub.BroadcastOrderbook(pb_update))
-            except Exception as e:
-                print(f"Error creating broadcast task for {address}: {e}")
-
-        if tasks:
-            # Wait for all broadcasts to complete
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"Broadcast error: {result}")
 
     async def process_peer_update(self, request):
-        """Process incoming updates from peer engines"""
+        """Record the top of book a peer sent in its entry in
+        global_best_prices.
 
+        Each peer numbers its updates 1, 2, ... across all symbols. An update
+        older than the last one applied is dropped; one past a gap means some
+        were lost, so the peer's books are fetched again with SyncOrderBook.
+        """
+        origin = request.originating_engine_addr
+        sequence_number = request.sequence_number
+        held = self.peer_sequence_numbers.get(origin)
+        status = "SUCCESSFUL"
         try:
-            if request.sequence_number > self.sequence_number:
-                await self._apply_update(request)
+            if sequence_number == 1 and held is not None:
+                # the peer restarted and numbers its updates afresh
+                self.logger.info(f"{origin} restarted its updates")
+                for peers in self.global_best_prices.values():
+                    peers.pop(origin, None)
+                held = None
+            expected = 1 if held is None else held + 1
+            if sequence_number == expected:
+                self._apply_top(
+                    origin, request.symbol, sequence_number, request.bids, request.asks
+                )
+                self.peer_sequence_numbers[origin] = sequence_number
+            elif sequence_number < expected:
+                self.logger.warning(
+                    f"update {sequence_number} for {request.symbol} from {origin} is older than the last applied ({held})"
+                )
+                status = "STALE"
             else:
                 self.logger.warning(
-                    f"request {request} has sequence number smaller than sequence number ({self.sequence_number}) of synchronizer"
+                    f"update {sequence_number} for {request.symbol} from {origin} follows a gap after {held}; resyncing"
                 )
+                await self._resync_peer(origin, request.symbol, sequence_number)
+                status = "RESYNCED"
 
         except Exception as e:
-            self.logger.error(
-                f"Error processing updates from {request.originating_engine_addr}: {e}"
-            )
-
-    async def _apply_update(self, update):
-        """Apply an order book update from a peer"""
-        async with self.lock:
-            # Update sequence number
-            self.sequence_number = max(self.sequence_number, update.sequence_number)
-
-            # Add to known orders if it's an order update
-            if hasattr(update, "order_id") and update.order_id not in self.known_orders:
-                self.known_orders.add(update.order_id)
-
-                # Convert protobuf update to internal format
-                order = Order(
-                    order_id=update.order_id,
-                    symbol=update.symbol,
-                    side=update.side,
-                    price=update.price,
-                    quantity=update.quantity,
-                    remaining_quantity=update.quantity,
-                    status=OrderStatus.NEW,
-                    timestamp=time.time(),
-                    client_id=update.user_id,
-                    engine_id=update.engine_id,
-                )
+            self.logger.error(f"Error processing updates from {origin}: {e}")
+            status = "ERROR"
 
-                return order
+        return pb2.BroadcastOrderbookResponse(
+            symbol=request.symbol, receiving_engine_id=self.engine_id, status=status
+        )
 
-    async def publish_update(self, symbol: str, bids: List[tuple], asks: List[tuple]):
-        """
-        Publish an order book update to peers.
-        Only prices with >0 volume are considered for best bid and ask.
-        """
-        # Filter bids and asks to include only those with volume > 0
-        valid_bids = [
-            (price, quantity, count) for price, quantity, count in bids if quantity > 0
-        ]
-        valid_asks = [
-            (price, quantity, count) for price, quantity, count in asks if quantity > 0
-        ]
-
-        # Calculate best bid and ask from valid prices
-        best_bid = max((price for price, _, _ in valid_bids), default=None)
-        best_ask = min((price for price, _, _ in valid_asks), default=None)
-
-        # Log filtered bids, asks, and calculated best prices
-        # print(f"current global Best Bid: {best_bid}, Best Ask: {best_ask}")
-
-        # Proceed with publishing the update if there are valid prices
-        update = {
-            "symbol": symbol,
-            "bids": valid_bids,
-            "asks": valid_asks,
-            "timestamp": time.time(),
-        }
-        await self.update_queue.put(update)
-        # print(f"Publishing update for {symbol} with {len(valid_bids)} valid bids and {len(valid_asks)} valid asks")
+    async def _resync_peer(self, origin: str, symbol: str, sequence_number: int):
+        """Replace what is held of origin's books with the top of each, fetched
+        with SyncOrderBook"""
+        stub = self.peer_stubs.get(origin)
+        if stub is None:
+            self.logger.error(f"cannot resync {origin}: not connected to it")
+            return
+        symbols = {symbol}
+        symbols.update(
+            s for s, peers in self.global_best_prices.items() if origin in peers
+        )
+        for s in symbols:
+            response = await stub.SyncOrderBook(
+                pb2.SyncRequest(symbol=s, engine_id=self.engine_id, num_levels=1)
+            )
+            self._apply_top(origin, s, sequence_number, response.bids, response.asks)
+            # updates the peer sent before the snapshot are already in it
+            sequence_number = max(sequence_number, response.sequence_number)
+        self.peer_sequence_numbers[origin] = sequence_number
+
+    def _apply_top(self, origin: str, symbol: str, sequence_number: int, bids, asks):
+        """Record the best of the PriceLevels origin sent for symbol as its top
+        of book; a side with no levels is empty"""
+        best_bid = max(
+            (level for level in bids if level.quantity > 0),
+            key=lambda level: level.price,
+            default=None,
+        )
+        best_ask = min(
+            (level for level in asks if level.quantity > 0),
+            key=lambda level: level.price,
+            default=None,
+        )
+        self.global_best_prices.setdefault(symbol, {})[origin] = (
+            sequence_number,
+            None if best_bid is None else best_bid.price,
+            0 if best_bid is None else best_bid.quantity,
+            None if best_ask is None else best_ask.price,
+            0 if best_ask is None else best_ask.quantity,
+        )
 
-        # Update sequence number
-        self.sequence_number += 1
+    def publish_bbo(self, symbol: str) -> None:
+        """Queue the local top of book for symbol to be pushed to peers, if its
+        prices or quantities changed since they were last queued. Called after
+        every change to the book; a no-op until the synchronizer is started."""
+        if not self.running:
+            return
+        orderbook = self.orderbooks[symbol]
+        bbo = orderbook.get_bbo()
+        if self.published_bbo.get(symbol) == bbo:
+            return
+        self.published_bbo[symbol] = bbo
+        best_bid, best_bid_quantity, best_ask, best_ask_quantity = bbo
+        # the order count at the top is not tracked by every book type
+        bids = (
+            [(orderbook.to_price(best_bid), best_bid_quantity, 0)]
+            if best_bid is not None
+            else []
+        )
+        asks = (
+            [(orderbook.to_price(best_ask), best_ask_quantity, 0)]
+            if best_ask is not None
+            else []
+        )
+        self._queue_update(symbol, bids, asks)
 
-        # Update global best prices
-        await self.update_global_best_prices(symbol, best_bid, best_ask)
+    def _queue_update(self, symbol: str, bids: List[tuple], asks: List[tuple]):
+        # conflated: peers get the symbol's latest state whatever the rate of
+        # change
+        self.pending_updates[symbol] = (bids, asks)
+        self._has_pending.set()
+        if len(self.pending_updates) >= self.flush_every:
+            self._flush_full.set()
 
     async def route_fill(self, fill, client_id, me_addr):
         stub = self.peer_stubs[me_addr]
 
         self.logger.debug(f"route_fill fill: {fill}")
-        eastern = pytz.timezone("US/Eastern")
 
         fill_dict = {
-            "fill_id": str(fill.fill_id),
-            "order_id": str(fill.order_id),
+            "fill_id": int(fill.fill_id),
+            "order_id": int(fill.order_id),
+            "client_order_id": str(fill.client_order_id),
             "symbol": str(fill.symbol),
             "side": str(fill.side),
             "price": float(fill.price),
             "quantity": int(fill.quantity),
             "remaining_quantity": int(fill.remaining_quantity),
-            "timestamp": (int(fill.timestamp.astimezone(eastern).timestamp() * 10**9)),
+            "timestamp": int(fill.timestamp),
             "buyer_id": str(fill.buyer_id),
             "seller_id": str(fill.seller_id),
             "engine_destination_addr": str(fill.engine_destination_addr),
@@ -240,19 +330,29 @@ class OrderBookSynchronizer:
             f"route order {order.engine_origin_addr} -> {me_addr} return status {order_response.status}"
         )
 
-    async def lookup_bbo_engine(self, order):
-        """Returns the address of the engine with the best bid/ask for a symbol"""
+    def lookup_bbo_engine(self, order):
+        """Returns the address of the engine with the best bid/ask for a symbol.
+
+        The symbol's book must exist, as an order sent with only its tick
+        price is compared at the price the book gives those ticks.
+        """
         side = order.side
         symbol = order.symbol
-        best_bids_asks = await self.get_global_best_bids_asks([symbol])
-        if side == Side.BUY:
+        # validate_order has not run yet, so the tick price wins here as well
+        price = order.price
+        if order.price_ticks:
+            price = self.orderbooks[symbol].to_price(order.price_ticks)
+        best_bids_asks = self.get_global_best_bids_asks([symbol])
+        if side == Side.BUY.value:
             # find best ask available
             if (
                 best_bids_asks[1][symbol][0] is None
-                or order.price < best_bids_asks[1][symbol][0]
+                or price < best_bids_asks[1][symbol][0]
             ):
-                self.logger.info(
-                    f"Best ask for {symbol} is on {best_bids_asks[1][symbol][1]} but order is below, not rerouting"
+                self.logger.debug(
+                    "Best ask for %s is on %s but order is below, not rerouting",
+                    symbol,
+                    best_bids_asks[1][symbol][1],
                 )
                 return self.engine_addr
             return best_bids_asks[1][symbol][1]
@@ -260,98 +360,59 @@ class OrderBookSynchronizer:
             # find best bid available
             if (
                 best_bids_asks[0][symbol][0] is None
-                or order.price > best_bids_asks[0][symbol][0]
+                or price > best_bids_asks[0][symbol][0]
             ):
-                self.logger.info(
-                    f"Best bid for {symbol} is on {best_bids_asks[0][symbol][1]} but order is above, not rerouting"
+                self.logger.debug(
+                    "Best bid for %s is on %s but order is above, not rerouting",
+                    symbol,
+                    best_bids_asks[0][symbol][1],
                 )
                 return self.engine_addr
             return best_bids_asks[0][symbol][1]
 
-    async def get_global_best_bids_asks(self, symbols: List[str]):
-        """Fetch and log global best bids and asks across engines"""
-        self.logger.info(f"Fetching global best bids and asks for {symbols}")
+    def get_global_best_bids_asks(self, symbols: List[str]):
+        """Global best bids and asks across engines, from the local books and
+        the tops of book peers have pushed"""
         global_best_bids = {}
         global_best_asks = {}
 
         for symbol in symbols:
             # Initialize with local best bid and ask
-            local_orderbook = await self._get_local_orderbook(symbol)
-            best_bid = max(
-                (level.price for level in local_orderbook.bids if level.quantity > 0),
-                default=float("-inf"),
-            )
-            best_ask = min(
-                (level.price for level in local_orderbook.asks if level.quantity > 0),
-                default=float("inf"),
-            )
-
-            if best_bid is None:
-                self.logger.info(f"No local best bid found for {symbol}")
-            if best_ask is None:
-                self.logger.info(f"No local best ask found for {symbol}")
-
+            best_bid, best_ask = self._get_local_bbo(symbol)
             global_best_bids[symbol] = (best_bid, self.engine_addr)
             global_best_asks[symbol] = (best_ask, self.engine_addr)
 
-            for address in self.peer_stubs.keys():
-                try:
-                    stub = self.peer_stubs[address]
-                    request = pb2.GetOrderbookRequest(symbol=symbol)
-                    update = await stub.GetOrderBook(request)
+            for address, (_, best_bid, _, best_ask, _) in self.global_best_prices.get(
+                symbol, {}
+            ).items():
+                if best_bid is not None and best_bid > global_best_bids[symbol][0]:
+                    global_best_bids[symbol] = (best_bid, address)
+                if best_ask is not None and best_ask < global_best_asks[symbol][0]:
+                    global_best_asks[symbol] = (best_ask, address)
 
-                    best_bid = max(
-                        (level.price for level in update.bids if level.quantity > 0),
-                        default=None,
-                    )
-                    best_ask = min(
-                        (level.price for level in update.asks if level.quantity > 0),
-                        default=None,
-                    )
-
-                    if best_bid is not None:
-                        if (
-                            symbol not in global_best_bids
-                            or best_bid > global_best_bids[symbol][0]
-                        ):
-                            global_best_bids[symbol] = (best_bid, address)
-
-                    if best_ask is not None:
-                        if (
-                            symbol not in global_best_asks
-                            or best_ask < global_best_asks[symbol][0]
-                        ):
-                            global_best_asks[symbol] = (best_ask, address)
-
-                except Exception as e:
-                    self.logger.error(
-                        f"Error fetching order book from {address} for {symbol}: {e}"
-                    )
-        self.logger.info(f"Global best bids: {global_best_bids}")
-        self.logger.info(f"Global best asks: {global_best_asks}")
+        # lazy %s arguments: this runs for every order
+        self.logger.debug("Global best bids: %s", global_best_bids)
+        self.logger.debug("Global best asks: %s", global_best_asks)
 
         return global_best_bids, global_best_asks
 
-    async def _get_local_orderbook(self, symbol: str):
-        """Fetch the local order book for a symbol"""
-        request = pb2.GetOrderbookRequest(symbol=symbol)
-        response = await self.stub.GetOrderBook(request)
-        return response
+    def _get_local_bbo(self, symbol: str):
+        """Read the local best bid and ask straight from the engine's order book"""
+        best_bid, best_ask = float("-inf"), float("inf")
+        orderbook = self.orderbooks.get(symbol)
+        if orderbook is not None:
+            if orderbook.best_bid is not None:
+                best_bid = orderbook.to_price(orderbook.best_bid)
+            if orderbook.best_ask is not None:
+                best_ask = orderbook.to_price(orderbook.best_ask)
+        return best_bid, best_ask
 
     def get_best_bid(self, symbol: str) -> Optional[float]:
-        """Get the best bid price for a symbol in the local order book"""
-        if (
-            symbol in self.global_best_prices
-            and "bid" in self.global_best_prices[symbol]
-        ):
-            return self.global_best_prices[symbol]["bid"]
-        return None
+        """Get the best bid price for a symbol across engines"""
+        best_bid = self.get_global_best_bids_asks([symbol])[0][symbol][0]
+        return None if best_bid == float("-inf") else best_bid
 
     def get_best_ask(self, symbol: str) -> Optional[float]:
-        """Get the best ask price for a symbol in the local order book"""
-        if (
-            symbol in self.global_best_prices
-            and "ask" in self.global_best_prices[symbol]
-        ):
-            return self.global_best_prices[symbol]["ask"]
-        return None
+        """Get the best ask price for a symbol across engines"""
+        best_ask = self.get_global_best_bids_asks([symbol])[1][symbol][0]
+        return None if best_ask == float("inf") else best_ask
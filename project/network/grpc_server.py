@@ -1,21 +1,23 @@
+import asyncio
+import grpc
 from grpc import aio
-from datetime import datetime as dt
 import os
 
 from proto import matching_service_pb2 as pb2
 from proto import matching_service_pb2_grpc as pb2_grpc
 from engine.match_engine import MatchEngine
 from engine.exchange import Exchange
-from common.order import pretty_print_FillResponse, Fill, Side
+from common.order import pretty_print_FillResponse, CompactFill
 from client.custom_formatter import LogFactory
 
-import pytz
-
 
 class MatchingServicer(pb2_grpc.MatchingServiceServicer):
     def __init__(self, engine: MatchEngine):
         self.engine = engine
         self.clients = []
+        # symbol -> (book version, num_levels, GetOrderbookResponse) of the
+        # last GetOrderBook response built, one per symbol
+        self.orderbook_responses = {}
 
         self.log_directory = os.getcwd() + "/logs/serve_logs/"
         self.logger = LogFactory(
@@ -23,15 +25,25 @@ class MatchingServicer(pb2_grpc.MatchingServiceServicer):
         ).get_logger()
 
     async def SubmitOrder(self, request, context):
+        return await self._submit_order(request)
+
+    async def _submit_order(self, request) -> pb2.SubmitOrderResponse:
         try:
             await self.engine.submit_order(request)
-            return pb2.SubmitOrderResponse(order_id=request.order_id, status="SUCCESS")
+            return pb2.SubmitOrderResponse(
+                order_id=request.order_id,
+                client_order_id=request.client_order_id,
+                status="SUCCESS",
+            )
         except Exception as e:
             self.logger.error(
                 f"Error while handling order request:\n {request} \n\n Error message: {e}"
             )
             return pb2.SubmitOrderResponse(
-                order_id=request.order_id, status="ERROR", error_message=str(e)
+                order_id=request.order_id,
+                client_order_id=request.client_order_id,
+                status="ERROR",
+                error_message=str(e),
             )
 
     async def SyncOrderBook(self, request, context):
@@ -55,24 +67,16 @@ class MatchingServicer(pb2_grpc.MatchingServiceServicer):
         orderbook = self.engine.orderbooks[request.symbol]
 
         # Construct the response with bids and asks
+        bids, asks = await self.engine.get_depth(
+            request.symbol, max(request.num_levels, 0)
+        )
         response = pb2.SyncResponse(
             symbol=request.symbol,
-            bids=[
-                pb2.PriceLevel(
-                    price=price,
-                    quantity=int(sum(o.remaining_quantity for o in orders)),
-                    order_count=len(orders),
-                )
-                for price, orders in orderbook.bids.items()
-            ],
-            asks=[
-                pb2.PriceLevel(
-                    price=price,
-                    quantity=int(sum(o.remaining_quantity for o in orders)),
-                    order_count=len(orders),
-                )
-                for price, orders in orderbook.asks.items()
-            ],
+            bids=self._price_levels(orderbook, bids),
+            asks=self._price_levels(orderbook, asks),
+            # the last BroadcastOrderbook update numbered, which a peer
+            # resyncing from this snapshot can drop anything up to
+            sequence_number=self.engine.synchronizer.sequence_number,
             engine_id=self.engine.engine_id,
         )
 
@@ -95,74 +99,167 @@ class MatchingServicer(pb2_grpc.MatchingServiceServicer):
             self.engine.create_orderbook(symbol)
 
         orderbook = self.engine.orderbooks[symbol]
+        num_levels = max(request.num_levels, 0)
+        # polls between book changes are answered from the response already
+        # built, if it has the levels asked for
+        version = orderbook.version
+        cached = self.orderbook_responses.get(symbol)
+        if cached is not None and cached[0] == version:
+            _, cached_levels, response = cached
+            if num_levels == cached_levels:
+                return response
+            # a response that stopped short of its depth on both sides holds
+            # the whole book
+            whole_book = cached_levels == 0 or (
+                len(response.bids) < cached_levels
+                and len(response.asks) < cached_levels
+            )
+            if whole_book or 0 < num_levels < cached_levels:
+                limit = num_levels or None
+                return pb2.GetOrderbookResponse(
+                    symbol=symbol,
+                    bids=response.bids[:limit],
+                    asks=response.asks[:limit],
+                )
+
+        # lazy %s argument: formatting the book is O(levels)
         self.logger.debug(
-            f"processing GetOrderBook for {symbol} \n orderbook: \n {str(orderbook)}"
+            "processing GetOrderBook for %s \n orderbook: \n %s", symbol, orderbook
         )
+        bids, asks = await self.engine.get_depth(symbol, num_levels)
         response = pb2.GetOrderbookResponse(
             symbol=symbol,
-            bids=[
-                pb2.PriceLevel(
-                    price=price,
-                    quantity=int(sum(o.remaining_quantity for o in orders)),
-                    order_count=len(orders),
-                )
-                for price, orders in orderbook.bids.items()
-            ],
-            asks=[
-                pb2.PriceLevel(
-                    price=price,
-                    quantity=int(sum(o.remaining_quantity for o in orders)),
-                    order_count=len(orders),
-                )
-                for price, orders in orderbook.asks.items()
-            ],
+            bids=self._price_levels(orderbook, bids),
+            asks=self._price_levels(orderbook, asks),
         )
+        # keyed by the version read before get_depth, so a change that lands
+        # while a sharded book is read only makes the entry stale sooner
+        self.orderbook_responses[symbol] = (version, num_levels, response)
 
         return response
 
-    async def GetFills(self, request, context):
-        eastern = pytz.timezone("US/Eastern")
+    def _price_levels(self, orderbook, levels):
+        return [
+            pb2.PriceLevel(
+                price=orderbook.to_price(price_ticks),
+                quantity=int(qty),
+                order_count=count,
+                price_ticks=price_ticks,
+            )
+            for price_ticks, qty, count in levels
+        ]
 
-        self.logger.debug(
-            f"[GET] size of {request.client_id} queue: {len(self.engine.fill_queues[request.client_id].queue)}"
+    async def SubscribeMarketData(self, request, context):
+        try:
+            subscription = self.engine.subscribe_market_data(
+                list(request.symbols), request.depth
+            )
+        except (RuntimeError, ValueError) as e:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+            return
+
+        self.logger.info(
+            f"market data subscription to {list(request.symbols)} at depth {request.depth}"
         )
+        try:
+            while True:
+                symbol, sequence_number, is_snapshot, bids, asks = (
+                    await subscription.get()
+                )
+                orderbook = self.engine.orderbooks[symbol]
+                yield pb2.MarketDataUpdate(
+                    symbol=symbol,
+                    sequence_number=sequence_number,
+                    snapshot=is_snapshot,
+                    bids=self._price_levels(orderbook, bids),
+                    asks=self._price_levels(orderbook, asks),
+                )
+        finally:
+            self.engine.market_data.unsubscribe(subscription)
+            self.logger.info(
+                f"market data subscription to {list(request.symbols)} ended "
+                f"after {subscription.resyncs} resyncs"
+            )
+
+    async def GetFills(self, request, context):
+        """Stream the client's fills as they are queued, until the client goes away"""
+        if request.client_id not in self.engine.fill_queues:
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND,
+                f"{request.client_id} is not registered with this engine",
+            )
+            return
+        fills = self.engine.fill_queues[request.client_id]
+        if fills.streaming:
+            # a second stream would take half of the client's fills
+            await context.abort(
+                grpc.StatusCode.ALREADY_EXISTS,
+                f"{request.client_id} already has a GetFills stream open",
+            )
+            return
         self.logger.debug(
-            f"[GET] state of {request.client_id} queue: {self.engine.fill_queues[request.client_id].queue}"
+            "[GET] size of %s queue: %d", request.client_id, fills.qsize()
+        )
+
+        fills.streaming = True
+        try:
+            last_sent = request.resume_after_sequence
+            if last_sent:
+                if fills.first_retained() > last_sent + 1:
+                    self.logger.warning(
+                        f"{request.client_id} resumed after fill {last_sent}, but "
+                        f"fills before {fills.first_retained()} are no longer retained"
+                    )
+                for sequence_number, fill in fills.retained_after(last_sent):
+                    last_sent = sequence_number
+                    yield self._fill_message(sequence_number, fill)
+
+            while True:
+                sequence_number, fill = await fills.get()
+                if sequence_number <= last_sent:
+                    # already resent from the retained fills
+                    continue
+                last_sent = sequence_number
+                yield self._fill_message(sequence_number, fill)
+        finally:
+            fills.streaming = False
+
+    def _fill_message(self, sequence_number: int, fill):
+        self.logger.info(f"{pretty_print_FillResponse(fill)}")
+        return pb2.Fill(
+            fill_id=int(fill.fill_id),
+            order_id=int(fill.order_id),
+            client_order_id=str(fill.client_order_id),
+            symbol=str(fill.symbol),
+            side=str(fill.side),
+            price=float(fill.price),
+            quantity=int(fill.quantity),
+            remaining_quantity=int(fill.remaining_quantity),
+            timestamp=int(fill.timestamp),
+            buyer_id=str(fill.buyer_id),
+            seller_id=(fill.seller_id),
+            engine_destination_addr=(fill.engine_destination_addr),
+            sequence_number=sequence_number,
         )
-        while not (self.engine.fill_queues[request.client_id].empty()):
-            fill = self.engine.fill_queues[request.client_id].get(timeout=1)
-            self.logger.info(f"{pretty_print_FillResponse(fill)}")
-            yield pb2.Fill(
-                fill_id=str(fill.fill_id),
-                order_id=str(fill.order_id),
-                symbol=str(fill.symbol),
-                side=str(fill.side),
-                price=float(fill.price),
-                quantity=int(fill.quantity),
-                remaining_quantity=int(fill.remaining_quantity),
-                timestamp=(int(fill.timestamp.astimezone(eastern).timestamp() * 10**9)),
-                buyer_id=str(fill.buyer_id),
-                seller_id=(fill.seller_id),
-                engine_destination_addr=(fill.engine_destination_addr),
-            )
 
     async def PutFill(self, request, context):
         try:
-            self.logger.debug(f"Fill queues state: {self.engine.fill_queues}")
+            self.logger.debug("Fill queues state: %s", self.engine.fill_queues)
 
-            # convert request message fill to Fill object
-            fill_obj = Fill(
+            # convert request message fill to a fill record
+            fill_obj = CompactFill(
                 fill_id=request.fill.fill_id,
                 order_id=request.fill.order_id,
                 symbol=request.fill.symbol,
-                side=Side.SELL if request.fill.side == "SELL" else Side.BUY,
+                side="SELL" if request.fill.side == "SELL" else "BUY",
                 price=request.fill.price,
                 quantity=request.fill.quantity,
                 remaining_quantity=request.fill.remaining_quantity,
-                timestamp=dt.fromtimestamp(request.fill.timestamp / (10**9)),
+                timestamp=request.fill.timestamp,
                 buyer_id=request.fill.buyer_id,
                 seller_id=request.fill.seller_id,
                 engine_destination_addr=request.fill.engine_destination_addr,
+                client_order_id=request.fill.client_order_id,
             )
 
             self.logger.info(
@@ -170,10 +267,9 @@ class MatchingServicer(pb2_grpc.MatchingServiceServicer):
             )
             self.engine.fill_queues[request.client_id].put(fill_obj)
             self.logger.debug(
-                f"[PUT] size of {request.client_id} queue: {len(self.engine.fill_queues[request.client_id].queue)}"
-            )
-            self.logger.debug(
-                f"[PUT] state of {request.client_id} queue: {self.engine.fill_queues[request.client_id].queue}"
+                "[PUT] size of %s queue: %d",
+                request.client_id,
+                self.engine.fill_queues[request.client_id].qsize(),
             )
 
             return pb2.PutFillResponse(status="ACCEPTED")
@@ -194,6 +290,135 @@ class MatchingServicer(pb2_grpc.MatchingServiceServicer):
             )
 
     async def CancelOrder(self, request, context):
+        return await self._cancel_order(request)
+
+    async def SubmitOrders(self, request, context):
+        orders = request.orders
+        try:
+            errors = await self.engine.submit_orders(orders)
+        except Exception as e:
+            self.logger.error(
+                f"Error while handling batch of {len(orders)} orders\n\n Error message: {e}"
+            )
+            errors = [e] * len(orders)
+        for order, error in zip(orders, errors):
+            if error is not None:
+                self.logger.error(
+                    f"Error while handling order request:\n {order} \n\n Error message: {error}"
+                )
+        return pb2.SubmitOrdersResponse(
+            responses=[
+                pb2.SubmitOrderResponse(
+                    order_id=order.order_id,
+                    client_order_id=order.client_order_id,
+                    status="SUCCESS" if error is None else "ERROR",
+                    error_message="" if error is None else str(error),
+                )
+                for order, error in zip(orders, errors)
+            ]
+        )
+
+    async def CancelOrders(self, request, context):
+        self.logger.debug(f"received batch of {len(request.cancels)} cancel requests")
+        results = await self.engine.cancel_fairy.cancel_orders(
+            [cancel.order_record for cancel in request.cancels], self.engine.orderbooks
+        )
+        return pb2.CancelOrdersResponse(
+            responses=[
+                pb2.CancelOrderResponse(
+                    order_id=cancel.order_id,
+                    client_order_id=cancel.client_order_id,
+                    status="SUCCESSFUL" if is_cancelled else "FAILED",
+                    quantity_cancelled=cancelled_amt,
+                )
+                for cancel, (is_cancelled, cancelled_amt) in zip(
+                    request.cancels, results
+                )
+            ]
+        )
+
+    async def OrderSession(self, request_iterator, context):
+        """Orders and cancels from one client on one stream, each acked when it
+        completes.
+
+        Requests are handled concurrently, so a client can have many orders in
+        flight; they are started in the order they arrive, which is the order
+        they reach each symbol's sequencer.
+        """
+        acks = asyncio.Queue()
+        handlers = set()
+
+        async def handle(message):
+            try:
+                if message.HasField("cancel"):
+                    ack = pb2.SessionResponse(
+                        request_id=message.request_id,
+                        cancel=await self._cancel_order(message.cancel),
+                    )
+                else:
+                    ack = pb2.SessionResponse(
+                        request_id=message.request_id,
+                        order=await self._submit_order(message.order),
+                    )
+            except Exception as e:
+                # every request gets its ack, even if handling it failed
+                self.logger.error(
+                    f"Error while handling session request {message.request_id}"
+                    f"\n\n Error message: {e}"
+                )
+                if message.HasField("cancel"):
+                    ack = pb2.SessionResponse(
+                        request_id=message.request_id,
+                        cancel=pb2.CancelOrderResponse(
+                            order_id=message.cancel.order_id,
+                            client_order_id=message.cancel.client_order_id,
+                            status="FAILED",
+                            quantity_cancelled=0,
+                        ),
+                    )
+                else:
+                    ack = pb2.SessionResponse(
+                        request_id=message.request_id,
+                        order=pb2.SubmitOrderResponse(
+                            order_id=message.order.order_id,
+                            client_order_id=message.order.client_order_id,
+                            status="ERROR",
+                            error_message=str(e),
+                        ),
+                    )
+            acks.put_nowait(ack)
+
+        async def read():
+            try:
+                async for message in request_iterator:
+                    handler = asyncio.create_task(handle(message))
+                    handlers.add(handler)
+                    handler.add_done_callback(handlers.discard)
+            finally:
+                # the client closed its side, or reading failed: ack what is
+                # in flight, then end
+                await asyncio.gather(*handlers, return_exceptions=True)
+                acks.put_nowait(None)
+
+        reader = asyncio.create_task(read())
+        try:
+            while True:
+                ack = await acks.get()
+                if ack is None:
+                    break
+                yield ack
+            try:
+                await reader
+            except Exception as e:
+                # end the call with an error status rather than as if the
+                # client had closed the session
+                self.logger.error(f"OrderSession failed reading requests: {e}")
+                await context.abort(grpc.StatusCode.INTERNAL, str(e))
+                return
+        finally:
+            reader.cancel()
+
+    async def _cancel_order(self, request) -> pb2.CancelOrderResponse:
         self.logger.debug(f"received cancel order request: {request}")
         is_cancelled, cancelled_amt = await self.engine.cancel_fairy.cancel(
             request.order_record, self.engine.orderbooks
@@ -201,12 +426,16 @@ class MatchingServicer(pb2_grpc.MatchingServiceServicer):
         if is_cancelled:
             return pb2.CancelOrderResponse(
                 order_id=request.order_id,
+                client_order_id=request.client_order_id,
                 status="SUCCESSFUL",
                 quantity_cancelled=cancelled_amt,
             )
         else:
             return pb2.CancelOrderResponse(
-                order_id=request.order_id, status="FAILED", quantity_cancelled=0
+                order_id=request.order_id,
+                client_order_id=request.client_order_id,
+                status="FAILED",
+                quantity_cancelled=0,
             )
 
 
@@ -20,7 +20,7 @@ _sym_db = _symbol_database.Default()
 
 
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x1cproto/matching_service.proto\x12\x08matching"\xbd\x01\n\x0cOrderRequest\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x0e\n\x06symbol\x18\x02 \x01(\t\x12\x0c\n\x04side\x18\x03 \x01(\t\x12\r\n\x05price\x18\x04 \x01(\x01\x12\x10\n\x08quantity\x18\x05 \x01(\x03\x12\x1a\n\x12remaining_quantity\x18\x06 \x01(\x03\x12\x11\n\tclient_id\x18\x07 \x01(\t\x12\x1a\n\x12\x65ngine_origin_addr\x18\x08 \x01(\t\x12\x11\n\ttimestamp\x18\t \x01(\x03"N\n\x13SubmitOrderResponse\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x15\n\rerror_message\x18\x03 \x01(\t"R\n\x0b\x46illRequest\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x1f\n\x17\x65ngine_destination_addr\x18\x02 \x01(\t\x12\x0f\n\x07timeout\x18\x03 \x01(\x03"\xdd\x01\n\x04\x46ill\x12\x0f\n\x07\x66ill_id\x18\x01 \x01(\t\x12\x10\n\x08order_id\x18\x02 \x01(\t\x12\x0e\n\x06symbol\x18\x03 \x01(\t\x12\x0c\n\x04side\x18\x04 \x01(\t\x12\r\n\x05price\x18\x05 \x01(\x01\x12\x10\n\x08quantity\x18\x06 \x01(\x03\x12\x1a\n\x12remaining_quantity\x18\x07 \x01(\x03\x12\x11\n\ttimestamp\x18\x08 \x01(\x03\x12\x10\n\x08\x62uyer_id\x18\t \x01(\t\x12\x11\n\tseller_id\x18\n \x01(\t\x12\x1f\n\x17\x65ngine_destination_addr\x18\x0b \x01(\t"A\n\x0ePutFillRequest\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x1c\n\x04\x66ill\x18\x02 \x01(\x0b\x32\x0e.matching.Fill"!\n\x0fPutFillResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"g\n\x12\x43\x61ncelOrderRequest\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x11\n\tclient_id\x18\x02 \x01(\t\x12,\n\x0corder_record\x18\x03 \x01(\x0b\x32\x16.matching.OrderRequest"S\n\x13\x43\x61ncelOrderResponse\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x1a\n\x12quantity_cancelled\x18\x03 \x01(\x03"B\n\nPriceLevel\x12\r\n\x05price\x18\x01 \x01(\x01\x12\x10\n\x08quantity\x18\x02 \x01(\x03\x12\x13\n\x0border_count\x18\x03 \x01(\x05"D\n\x0bSyncRequest\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x11\n\tengine_id\x18\x02 \x01(\t\x12\x12\n\nnum_levels\x18\x03 \x01(\x03"\x92\x01\n\x0cSyncResponse\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12"\n\x04\x62ids\x18\x02 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x03 \x03(\x0b\x32\x14.matching.PriceLevel\x12\x17\n\x0fsequence_number\x18\x04 \x01(\x03\x12\x11\n\tengine_id\x18\x05 \x01(\t"\xbf\x01\n\x19\x42roadcastOrderbookRequest\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x1d\n\x15originating_engine_id\x18\x02 \x01(\t\x12\x12\n\nnum_levels\x18\x03 \x01(\x03\x12"\n\x04\x62ids\x18\x04 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x05 \x03(\x0b\x32\x14.matching.PriceLevel\x12\x17\n\x0fsequence_number\x18\x06 \x01(\x03"Y\n\x1a\x42roadcastOrderbookResponse\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x1b\n\x13receiving_engine_id\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t"%\n\x13GetOrderbookRequest\x12\x0e\n\x06symbol\x18\x01 \x01(\t"\x81\x01\n\x14GetOrderbookResponse\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12"\n\x04\x62ids\x18\x02 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x03 \x03(\x0b\x32\x14.matching.PriceLevel\x12\x11\n\ttimestamp\x18\x04 \x01(\x03"q\n\x19\x43lientRegistrationRequest\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x1d\n\x15\x63lient_authentication\x18\x02 \x01(\t\x12\x10\n\x08\x63lient_x\x18\x03 \x01(\x03\x12\x10\n\x08\x63lient_y\x18\x04 \x01(\x03"J\n\x1a\x43lientRegistrationResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x1c\n\x14match_engine_address\x18\x02 \x01(\t"W\n\x11RegisterMERequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x13\n\x0b\x65ngine_addr\x18\x02 \x01(\t\x12\x1a\n\x12\x65ngine_credentials\x18\x03 \x01(\t"$\n\x12RegisterMEResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"W\n\x11\x44iscoverMERequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x13\n\x0b\x65ngine_addr\x18\x02 \x01(\t\x12\x1a\n\x12\x65ngine_credentials\x18\x03 \x01(\t">\n\x12\x44iscoverMEResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x18\n\x10\x65ngine_addresses\x18\x02 \x03(\t2\x8b\x06\n\x0fMatchingService\x12\x46\n\x0bSubmitOrder\x12\x16.matching.OrderRequest\x1a\x1d.matching.SubmitOrderResponse"\x00\x12L\n\x0b\x43\x61ncelOrder\x12\x1c.matching.CancelOrderRequest\x1a\x1d.matching.CancelOrderResponse"\x00\x12@\n\rSyncOrderBook\x12\x15.matching.SyncRequest\x1a\x16.matching.SyncResponse"\x00\x12\x61\n\x12\x42roadcastOrderbook\x12#.matching.BroadcastOrderbookRequest\x1a$.matching.BroadcastOrderbookResponse"\x00\x12O\n\x0cGetOrderBook\x12\x1d.matching.GetOrderbookRequest\x1a\x1e.matching.GetOrderbookResponse"\x00\x12\x35\n\x08GetFills\x12\x15.matching.FillRequest\x1a\x0e.matching.Fill"\x00\x30\x01\x12@\n\x07PutFill\x12\x18.matching.PutFillRequest\x1a\x19.matching.PutFillResponse"\x00\x12]\n\x0eRegisterClient\x12#.matching.ClientRegistrationRequest\x1a$.matching.ClientRegistrationResponse"\x00\x12I\n\nRegisterME\x12\x1b.matching.RegisterMERequest\x1a\x1c.matching.RegisterMEResponse"\x00\x12I\n\nDiscoverME\x12\x1b.matching.DiscoverMERequest\x1a\x1c.matching.DiscoverMEResponse"\x00\x62\x06proto3'
+    b'\n\x1cproto/matching_service.proto\x12\x08matching"\xeb\x01\n\x0cOrderRequest\x12\x17\n\x0f\x63lient_order_id\x18\x01 \x01(\t\x12\x0e\n\x06symbol\x18\x02 \x01(\t\x12\x0c\n\x04side\x18\x03 \x01(\t\x12\r\n\x05price\x18\x04 \x01(\x01\x12\x10\n\x08quantity\x18\x05 \x01(\x03\x12\x1a\n\x12remaining_quantity\x18\x06 \x01(\x03\x12\x11\n\tclient_id\x18\x07 \x01(\t\x12\x1a\n\x12\x65ngine_origin_addr\x18\x08 \x01(\t\x12\x11\n\ttimestamp\x18\t \x01(\x03\x12\x13\n\x0bprice_ticks\x18\n \x01(\x03\x12\x10\n\x08order_id\x18\x0b \x01(\x04"g\n\x13SubmitOrderResponse\x12\x17\n\x0f\x63lient_order_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x15\n\rerror_message\x18\x03 \x01(\t\x12\x10\n\x08order_id\x18\x04 \x01(\x04"=\n\x13SubmitOrdersRequest\x12&\n\x06orders\x18\x01 \x03(\x0b\x32\x16.matching.OrderRequest"H\n\x14SubmitOrdersResponse\x12\x30\n\tresponses\x18\x01 \x03(\x0b\x32\x1d.matching.SubmitOrderResponse"q\n\x0b\x46illRequest\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x1f\n\x17\x65ngine_destination_addr\x18\x02 \x01(\t\x12\x0f\n\x07timeout\x18\x03 \x01(\x03\x12\x1d\n\x15resume_after_sequence\x18\x04 \x01(\x04"\x9b\x02\n\x04\x46ill\x12\x0f\n\x07\x66ill_id\x18\x0c \x01(\x04\x12\x10\n\x08order_id\x18\r \x01(\x04\x12\x17\n\x0f\x63lient_order_id\x18\x0e \x01(\t\x12\x0e\n\x06symbol\x18\x03 \x01(\t\x12\x0c\n\x04side\x18\x04 \x01(\t\x12\r\n\x05price\x18\x05 \x01(\x01\x12\x10\n\x08quantity\x18\x06 \x01(\x03\x12\x1a\n\x12remaining_quantity\x18\x07 \x01(\x03\x12\x11\n\ttimestamp\x18\x08 \x01(\x03\x12\x10\n\x08\x62uyer_id\x18\t \x01(\t\x12\x11\n\tseller_id\x18\n \x01(\t\x12\x1f\n\x17\x65ngine_destination_addr\x18\x0b \x01(\t\x12\x17\n\x0fsequence_number\x18\x0f \x01(\x04J\x04\x08\x01\x10\x02J\x04\x08\x02\x10\x03"A\n\x0ePutFillRequest\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x1c\n\x04\x66ill\x18\x02 \x01(\x0b\x32\x0e.matching.Fill"!\n\x0fPutFillResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"\x80\x01\n\x12\x43\x61ncelOrderRequest\x12\x17\n\x0f\x63lient_order_id\x18\x01 \x01(\t\x12\x11\n\tclient_id\x18\x02 \x01(\t\x12,\n\x0corder_record\x18\x03 \x01(\x0b\x32\x16.matching.OrderRequest\x12\x10\n\x08order_id\x18\x04 \x01(\x04"l\n\x13\x43\x61ncelOrderResponse\x12\x17\n\x0f\x63lient_order_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x1a\n\x12quantity_cancelled\x18\x03 \x01(\x03\x12\x10\n\x08order_id\x18\x04 \x01(\x04"D\n\x13\x43\x61ncelOrdersRequest\x12-\n\x07\x63\x61ncels\x18\x01 \x03(\x0b\x32\x1c.matching.CancelOrderRequest"H\n\x14\x43\x61ncelOrdersResponse\x12\x30\n\tresponses\x18\x01 \x03(\x0b\x32\x1d.matching.CancelOrderResponse"\x88\x01\n\x0eSessionRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\x04\x12\'\n\x05order\x18\x02 \x01(\x0b\x32\x16.matching.OrderRequestH\x00\x12.\n\x06\x63\x61ncel\x18\x03 \x01(\x0b\x32\x1c.matching.CancelOrderRequestH\x00\x42\t\n\x07request"\x92\x01\n\x0fSessionResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\x04\x12.\n\x05order\x18\x02 \x01(\x0b\x32\x1d.matching.SubmitOrderResponseH\x00\x12/\n\x06\x63\x61ncel\x18\x03 \x01(\x0b\x32\x1d.matching.CancelOrderResponseH\x00\x42\n\n\x08response"W\n\nPriceLevel\x12\r\n\x05price\x18\x01 \x01(\x01\x12\x10\n\x08quantity\x18\x02 \x01(\x03\x12\x13\n\x0border_count\x18\x03 \x01(\x05\x12\x13\n\x0bprice_ticks\x18\x04 \x01(\x03"D\n\x0bSyncRequest\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x11\n\tengine_id\x18\x02 \x01(\t\x12\x12\n\nnum_levels\x18\x03 \x01(\x03"\x92\x01\n\x0cSyncResponse\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12"\n\x04\x62ids\x18\x02 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x03 \x03(\x0b\x32\x14.matching.PriceLevel\x12\x17\n\x0fsequence_number\x18\x04 \x01(\x03\x12\x11\n\tengine_id\x18\x05 \x01(\t"\xe0\x01\n\x19\x42roadcastOrderbookRequest\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x1d\n\x15originating_engine_id\x18\x02 \x01(\t\x12\x12\n\nnum_levels\x18\x03 \x01(\x03\x12"\n\x04\x62ids\x18\x04 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x05 \x03(\x0b\x32\x14.matching.PriceLevel\x12\x17\n\x0fsequence_number\x18\x06 \x01(\x03\x12\x1f\n\x17originating_engine_addr\x18\x07 \x01(\t"Y\n\x1a\x42roadcastOrderbookResponse\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x1b\n\x13receiving_engine_id\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t"9\n\x13GetOrderbookRequest\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x12\n\nnum_levels\x18\x02 \x01(\x03"\x81\x01\n\x14GetOrderbookResponse\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12"\n\x04\x62ids\x18\x02 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x03 \x03(\x0b\x32\x14.matching.PriceLevel\x12\x11\n\ttimestamp\x18\x04 \x01(\x03"3\n\x11MarketDataRequest\x12\x0f\n\x07symbols\x18\x01 \x03(\t\x12\r\n\x05\x64\x65pth\x18\x02 \x01(\x05"\x95\x01\n\x10MarketDataUpdate\x12\x0e\n\x06symbol\x18\x01 \x01(\t\x12\x17\n\x0fsequence_number\x18\x02 \x01(\x03\x12\x10\n\x08snapshot\x18\x03 \x01(\x08\x12"\n\x04\x62ids\x18\x04 \x03(\x0b\x32\x14.matching.PriceLevel\x12"\n\x04\x61sks\x18\x05 \x03(\x0b\x32\x14.matching.PriceLevel"q\n\x19\x43lientRegistrationRequest\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x1d\n\x15\x63lient_authentication\x18\x02 \x01(\t\x12\x10\n\x08\x63lient_x\x18\x03 \x01(\x03\x12\x10\n\x08\x63lient_y\x18\x04 \x01(\x03"J\n\x1a\x43lientRegistrationResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x1c\n\x14match_engine_address\x18\x02 \x01(\t"W\n\x11RegisterMERequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x13\n\x0b\x65ngine_addr\x18\x02 \x01(\t\x12\x1a\n\x12\x65ngine_credentials\x18\x03 \x01(\t"$\n\x12RegisterMEResponse\x12\x0e\n\x06status\x18\x01 \x01(\t"W\n\x11\x44iscoverMERequest\x12\x11\n\tengine_id\x18\x01 \x01(\t\x12\x13\n\x0b\x65ngine_addr\x18\x02 \x01(\t\x12\x1a\n\x12\x65ngine_credentials\x18\x03 \x01(\t">\n\x12\x44iscoverMEResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\x12\x18\n\x10\x65ngine_addresses\x18\x02 \x03(\t2\xcc\x08\n\x0fMatchingService\x12\x46\n\x0bSubmitOrder\x12\x16.matching.OrderRequest\x1a\x1d.matching.SubmitOrderResponse"\x00\x12L\n\x0b\x43\x61ncelOrder\x12\x1c.matching.CancelOrderRequest\x1a\x1d.matching.CancelOrderResponse"\x00\x12O\n\x0cSubmitOrders\x12\x1d.matching.SubmitOrdersRequest\x1a\x1e.matching.SubmitOrdersResponse"\x00\x12O\n\x0c\x43\x61ncelOrders\x12\x1d.matching.CancelOrdersRequest\x1a\x1e.matching.CancelOrdersResponse"\x00\x12I\n\x0cOrderSession\x12\x18.matching.SessionRequest\x1a\x19.matching.SessionResponse"\x00(\x01\x30\x01\x12@\n\rSyncOrderBook\x12\x15.matching.SyncRequest\x1a\x16.matching.SyncResponse"\x00\x12\x61\n\x12\x42roadcastOrderbook\x12#.matching.BroadcastOrderbookRequest\x1a$.matching.BroadcastOrderbookResponse"\x00\x12O\n\x0cGetOrderBook\x12\x1d.matching.GetOrderbookRequest\x1a\x1e.matching.GetOrderbookResponse"\x00\x12R\n\x13SubscribeMarketData\x12\x1b.matching.MarketDataRequest\x1a\x1a.matching.MarketDataUpdate"\x00\x30\x01\x12\x35\n\x08GetFills\x12\x15.matching.FillRequest\x1a\x0e.matching.Fill"\x00\x30\x01\x12@\n\x07PutFill\x12\x18.matching.PutFillRequest\x1a\x19.matching.PutFillResponse"\x00\x12]\n\x0eRegisterClient\x12#.matching.ClientRegistrationRequest\x1a$.matching.ClientRegistrationResponse"\x00\x12I\n\nRegisterME\x12\x1b.matching.RegisterMERequest\x1a\x1c.matching.RegisterMEResponse"\x00\x12I\n\nDiscoverME\x12\x1b.matching.DiscoverMERequest\x1a\x1c.matching.DiscoverMEResponse"\x00\x62\x06proto3'
 )
 
 _globals = globals()
@@ -31,47 +31,63 @@ _builder.BuildTopDescriptorsAndMessages(
 if not _descriptor._USE_C_DESCRIPTORS:
     DESCRIPTOR._loaded_options = None
     _globals["_ORDERREQUEST"]._serialized_start = 43
-    _globals["_ORDERREQUEST"]._serialized_end = 232
-    _globals["_SUBMITORDERRESPONSE"]._serialized_start = 234
-    _globals["_SUBMITORDERRESPONSE"]._serialized_end = 312
-    _globals["_FILLREQUEST"]._serialized_start = 314
-    _globals["_FILLREQUEST"]._serialized_end = 396
-    _globals["_FILL"]._serialized_start = 399
-    _globals["_FILL"]._serialized_end = 620
-    _globals["_PUTFILLREQUEST"]._serialized_start = 622
-    _globals["_PUTFILLREQUEST"]._serialized_end = 687
-    _globals["_PUTFILLRESPONSE"]._serialized_start = 689
-    _globals["_PUTFILLRESPONSE"]._serialized_end = 722
-    _globals["_CANCELORDERREQUEST"]._serialized_start = 724
-    _globals["_CANCELORDERREQUEST"]._serialized_end = 827
-    _globals["_CANCELORDERRESPONSE"]._serialized_start = 829
-    _globals["_CANCELORDERRESPONSE"]._serialized_end = 912
-    _globals["_PRICELEVEL"]._serialized_start = 914
-    _globals["_PRICELEVEL"]._serialized_end = 980
-    _globals["_SYNCREQUEST"]._serialized_start = 982
-    _globals["_SYNCREQUEST"]._serialized_end = 1050
-    _globals["_SYNCRESPONSE"]._serialized_start = 1053
-    _globals["_SYNCRESPONSE"]._serialized_end = 1199
-    _globals["_BROADCASTORDERBOOKREQUEST"]._serialized_start = 1202
-    _globals["_BROADCASTORDERBOOKREQUEST"]._serialized_end = 1393
-    _globals["_BROADCASTORDERBOOKRESPONSE"]._serialized_start = 1395
-    _globals["_BROADCASTORDERBOOKRESPONSE"]._serialized_end = 1484
-    _globals["_GETORDERBOOKREQUEST"]._serialized_start = 1486
-    _globals["_GETORDERBOOKREQUEST"]._serialized_end = 1523
-    _globals["_GETORDERBOOKRESPONSE"]._serialized_start = 1526
-    _globals["_GETORDERBOOKRESPONSE"]._serialized_end = 1655
-    _globals["_CLIENTREGISTRATIONREQUEST"]._serialized_start = 1657
-    _globals["_CLIENTREGISTRATIONREQUEST"]._serialized_end = 1770
-    _globals["_CLIENTREGISTRATIONRESPONSE"]._serialized_start = 1772
-    _globals["_CLIENTREGISTRATIONRESPONSE"]._serialized_end = 1846
-    _globals["_REGISTERMEREQUEST"]._serialized_start = 1848
-    _globals["_REGISTERMEREQUEST"]._serialized_end = 1935
-    _globals["_REGISTERMERESPONSE"]._serialized_start = 1937
-    _globals["_REGISTERMERESPONSE"]._serialized_end = 1973
-    _globals["_DISCOVERMEREQUEST"]._serialized_start = 1975
-    _globals["_DISCOVERMEREQUEST"]._serialized_end = 2062
-    _globals["_DISCOVERMERESPONSE"]._serialized_start = 2064
-    _globals["_DISCOVERMERESPONSE"]._serialized_end = 2126
-    _globals["_MATCHINGSERVICE"]._serialized_start = 2129
-    _globals["_MATCHINGSERVICE"]._serialized_end = 2908
+    _globals["_ORDERREQUEST"]._serialized_end = 278
+    _globals["_SUBMITORDERRESPONSE"]._serialized_start = 280
+    _globals["_SUBMITORDERRESPONSE"]._serialized_end = 383
+    _globals["_SUBMITORDERSREQUEST"]._serialized_start = 385
+    _globals["_SUBMITORDERSREQUEST"]._serialized_end = 446
+    _globals["_SUBMITORDERSRESPONSE"]._serialized_start = 448
+    _globals["_SUBMITORDERSRESPONSE"]._serialized_end = 520
+    _globals["_FILLREQUEST"]._serialized_start = 522
+    _globals["_FILLREQUEST"]._serialized_end = 635
+    _globals["_FILL"]._serialized_start = 638
+    _globals["_FILL"]._serialized_end = 921
+    _globals["_PUTFILLREQUEST"]._serialized_start = 923
+    _globals["_PUTFILLREQUEST"]._serialized_end = 988
+    _globals["_PUTFILLRESPONSE"]._serialized_start = 990
+    _globals["_PUTFILLRESPONSE"]._serialized_end = 1023
+    _globals["_CANCELORDERREQUEST"]._serialized_start = 1026
+    _globals["_CANCELORDERREQUEST"]._serialized_end = 1154
+    _globals["_CANCELORDERRESPONSE"]._serialized_start = 1156
+    _globals["_CANCELORDERRESPONSE"]._serialized_end = 1264
+    _globals["_CANCELORDERSREQUEST"]._serialized_start = 1266
+    _globals["_CANCELORDERSREQUEST"]._serialized_end = 1334
+    _globals["_CANCELORDERSRESPONSE"]._serialized_start = 1336
+    _globals["_CANCELORDERSRESPONSE"]._serialized_end = 1408
+    _globals["_SESSIONREQUEST"]._serialized_start = 1411
+    _globals["_SESSIONREQUEST"]._serialized_end = 1547
+    _globals["_SESSIONRESPONSE"]._serialized_start = 1550
+    _globals["_SESSIONRESPONSE"]._serialized_end = 1696
+    _globals["_PRICELEVEL"]._serialized_start = 1698
+    _globals["_PRICELEVEL"]._serialized_end = 1785
+    _globals["_SYNCREQUEST"]._serialized_start = 1787
+    _globals["_SYNCREQUEST"]._serialized_end = 1855
+    _globals["_SYNCRESPONSE"]._serialized_start = 1858
+    _globals["_SYNCRESPONSE"]._serialized_end = 2004
+    _globals["_BROADCASTORDERBOOKREQUEST"]._serialized_start = 2007
+    _globals["_BROADCASTORDERBOOKREQUEST"]._serialized_end = 2231
+    _globals["_BROADCASTORDERBOOKRESPONSE"]._serialized_start = 2233
+    _globals["_BROADCASTORDERBOOKRESPONSE"]._serialized_end = 2322
+    _globals["_GETORDERBOOKREQUEST"]._serialized_start = 2324
+    _globals["_GETORDERBOOKREQUEST"]._serialized_end = 2381
+    _globals["_GETORDERBOOKRESPONSE"]._serialized_start = 2384
+    _globals["_GETORDERBOOKRESPONSE"]._serialized_end = 2513
+    _globals["_MARKETDATAREQUEST"]._serialized_start = 2515
+    _globals["_MARKETDATAREQUEST"]._serialized_end = 2566
+    _globals["_MARKETDATAUPDATE"]._serialized_start = 2569
+    _globals["_MARKETDATAUPDATE"]._serialized_end = 2718
+    _globals["_CLIENTREGISTRATIONREQUEST"]._serialized_start = 2720
+    _globals["_CLIENTREGISTRATIONREQUEST"]._serialized_end = 2833
+    _globals["_CLIENTREGISTRATIONRESPONSE"]._serialized_start = 2835
+    _globals["_CLIENTREGISTRATIONRESPONSE"]._serialized_end = 2909
+    _globals["_REGISTERMEREQUEST"]._serialized_start = 2911
+    _globals["_REGISTERMEREQUEST"]._serialized_end = 2998
+    _globals["_REGISTERMERESPONSE"]._serialized_start = 3000
+    _globals["_REGISTERMERESPONSE"]._serialized_end = 3036
+    _globals["_DISCOVERMEREQUEST"]._serialized_start = 3038
+    _globals["_DISCOVERMEREQUEST"]._serialized_end = 3125
+    _globals["_DISCOVERMERESPONSE"]._serialized_start = 3127
+    _globals["_DISCOVERMERESPONSE"]._serialized_end = 3189
+    _globals["_MATCHINGSERVICE"]._serialized_start = 3192
+    _globals["_MATCHINGSERVICE"]._serialized_end = 4292
 # @@protoc_insertion_point(module_scope)
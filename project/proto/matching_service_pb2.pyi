@@ -13,7 +13,7 @@ DESCRIPTOR: _descriptor.FileDescriptor
 
 class OrderRequest(_message.Message):
     __slots__ = (
-        "order_id",
+        "client_order_id",
         "symbol",
         "side",
         "price",
@@ -22,8 +22,10 @@ class OrderRequest(_message.Message):
         "client_id",
         "engine_origin_addr",
         "timestamp",
+        "price_ticks",
+        "order_id",
     )
-    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    CLIENT_ORDER_ID_FIELD_NUMBER: _ClassVar[int]
     SYMBOL_FIELD_NUMBER: _ClassVar[int]
     SIDE_FIELD_NUMBER: _ClassVar[int]
     PRICE_FIELD_NUMBER: _ClassVar[int]
@@ -32,7 +34,9 @@ class OrderRequest(_message.Message):
     CLIENT_ID_FIELD_NUMBER: _ClassVar[int]
     ENGINE_ORIGIN_ADDR_FIELD_NUMBER: _ClassVar[int]
     TIMESTAMP_FIELD_NUMBER: _ClassVar[int]
-    order_id: str
+    PRICE_TICKS_FIELD_NUMBER: _ClassVar[int]
+    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    client_order_id: str
     symbol: str
     side: str
     price: float
@@ -41,9 +45,11 @@ class OrderRequest(_message.Message):
     client_id: str
     engine_origin_addr: str
     timestamp: int
+    price_ticks: int
+    order_id: int
     def __init__(
         self,
-        order_id: _Optional[str] = ...,
+        client_order_id: _Optional[str] = ...,
         symbol: _Optional[str] = ...,
         side: _Optional[str] = ...,
         price: _Optional[float] = ...,
@@ -52,42 +58,73 @@ class OrderRequest(_message.Message):
         client_id: _Optional[str] = ...,
         engine_origin_addr: _Optional[str] = ...,
         timestamp: _Optional[int] = ...,
+        price_ticks: _Optional[int] = ...,
+        order_id: _Optional[int] = ...,
     ) -> None: ...
 
 class SubmitOrderResponse(_message.Message):
-    __slots__ = ("order_id", "status", "error_message")
-    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    __slots__ = ("client_order_id", "status", "error_message", "order_id")
+    CLIENT_ORDER_ID_FIELD_NUMBER: _ClassVar[int]
     STATUS_FIELD_NUMBER: _ClassVar[int]
     ERROR_MESSAGE_FIELD_NUMBER: _ClassVar[int]
-    order_id: str
+    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    client_order_id: str
     status: str
     error_message: str
+    order_id: int
     def __init__(
         self,
-        order_id: _Optional[str] = ...,
+        client_order_id: _Optional[str] = ...,
         status: _Optional[str] = ...,
         error_message: _Optional[str] = ...,
+        order_id: _Optional[int] = ...,
+    ) -> None: ...
+
+class SubmitOrdersRequest(_message.Message):
+    __slots__ = ("orders",)
+    ORDERS_FIELD_NUMBER: _ClassVar[int]
+    orders: _containers.RepeatedCompositeFieldContainer[OrderRequest]
+    def __init__(
+        self, orders: _Optional[_Iterable[_Union[OrderRequest, _Mapping]]] = ...
+    ) -> None: ...
+
+class SubmitOrdersResponse(_message.Message):
+    __slots__ = ("responses",)
+    RESPONSES_FIELD_NUMBER: _ClassVar[int]
+    responses: _containers.RepeatedCompositeFieldContainer[SubmitOrderResponse]
+    def __init__(
+        self,
+        responses: _Optional[_Iterable[_Union[SubmitOrderResponse, _Mapping]]] = ...,
     ) -> None: ...
 
 class FillRequest(_message.Message):
-    __slots__ = ("client_id", "engine_destination_addr", "timeout")
+    __slots__ = (
+        "client_id",
+        "engine_destination_addr",
+        "timeout",
+        "resume_after_sequence",
+    )
     CLIENT_ID_FIELD_NUMBER: _ClassVar[int]
     ENGINE_DESTINATION_ADDR_FIELD_NUMBER: _ClassVar[int]
     TIMEOUT_FIELD_NUMBER: _ClassVar[int]
+    RESUME_AFTER_SEQUENCE_FIELD_NUMBER: _ClassVar[int]
     client_id: str
     engine_destination_addr: str
     timeout: int
+    resume_after_sequence: int
     def __init__(
         self,
         client_id: _Optional[str] = ...,
         engine_destination_addr: _Optional[str] = ...,
         timeout: _Optional[int] = ...,
+        resume_after_sequence: _Optional[int] = ...,
     ) -> None: ...
 
 class Fill(_message.Message):
     __slots__ = (
         "fill_id",
         "order_id",
+        "client_order_id",
         "symbol",
         "side",
         "price",
@@ -97,9 +134,11 @@ class Fill(_message.Message):
         "buyer_id",
         "seller_id",
         "engine_destination_addr",
+        "sequence_number",
     )
     FILL_ID_FIELD_NUMBER: _ClassVar[int]
     ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    CLIENT_ORDER_ID_FIELD_NUMBER: _ClassVar[int]
     SYMBOL_FIELD_NUMBER: _ClassVar[int]
     SIDE_FIELD_NUMBER: _ClassVar[int]
     PRICE_FIELD_NUMBER: _ClassVar[int]
@@ -109,8 +148,10 @@ class Fill(_message.Message):
     BUYER_ID_FIELD_NUMBER: _ClassVar[int]
     SELLER_ID_FIELD_NUMBER: _ClassVar[int]
     ENGINE_DESTINATION_ADDR_FIELD_NUMBER: _ClassVar[int]
-    fill_id: str
-    order_id: str
+    SEQUENCE_NUMBER_FIELD_NUMBER: _ClassVar[int]
+    fill_id: int
+    order_id: int
+    client_order_id: str
     symbol: str
     side: str
     price: float
@@ -120,10 +161,12 @@ class Fill(_message.Message):
     buyer_id: str
     seller_id: str
     engine_destination_addr: str
+    sequence_number: int
     def __init__(
         self,
-        fill_id: _Optional[str] = ...,
-        order_id: _Optional[str] = ...,
+        fill_id: _Optional[int] = ...,
+        order_id: _Optional[int] = ...,
+        client_order_id: _Optional[str] = ...,
         symbol: _Optional[str] = ...,
         side: _Optional[str] = ...,
         price: _Optional[float] = ...,
@@ -133,6 +176,7 @@ class Fill(_message.Message):
         buyer_id: _Optional[str] = ...,
         seller_id: _Optional[str] = ...,
         engine_destination_addr: _Optional[str] = ...,
+        sequence_number: _Optional[int] = ...,
     ) -> None: ...
 
 class PutFillRequest(_message.Message):
@@ -154,48 +198,104 @@ class PutFillResponse(_message.Message):
     def __init__(self, status: _Optional[str] = ...) -> None: ...
 
 class CancelOrderRequest(_message.Message):
-    __slots__ = ("order_id", "client_id", "order_record")
-    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    __slots__ = ("client_order_id", "client_id", "order_record", "order_id")
+    CLIENT_ORDER_ID_FIELD_NUMBER: _ClassVar[int]
     CLIENT_ID_FIELD_NUMBER: _ClassVar[int]
     ORDER_RECORD_FIELD_NUMBER: _ClassVar[int]
-    order_id: str
+    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    client_order_id: str
     client_id: str
     order_record: OrderRequest
+    order_id: int
     def __init__(
         self,
-        order_id: _Optional[str] = ...,
+        client_order_id: _Optional[str] = ...,
         client_id: _Optional[str] = ...,
         order_record: _Optional[_Union[OrderRequest, _Mapping]] = ...,
+        order_id: _Optional[int] = ...,
     ) -> None: ...
 
 class CancelOrderResponse(_message.Message):
-    __slots__ = ("order_id", "status", "quantity_cancelled")
-    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    __slots__ = ("client_order_id", "status", "quantity_cancelled", "order_id")
+    CLIENT_ORDER_ID_FIELD_NUMBER: _ClassVar[int]
     STATUS_FIELD_NUMBER: _ClassVar[int]
     QUANTITY_CANCELLED_FIELD_NUMBER: _ClassVar[int]
-    order_id: str
+    ORDER_ID_FIELD_NUMBER: _ClassVar[int]
+    client_order_id: str
     status: str
     quantity_cancelled: int
+    order_id: int
     def __init__(
         self,
-        order_id: _Optional[str] = ...,
+        client_order_id: _Optional[str] = ...,
         status: _Optional[str] = ...,
         quantity_cancelled: _Optional[int] = ...,
+        order_id: _Optional[int] = ...,
+    ) -> None: ...
+
+class CancelOrdersRequest(_message.Message):
+    __slots__ = ("cancels",)
+    CANCELS_FIELD_NUMBER: _ClassVar[int]
+    cancels: _containers.RepeatedCompositeFieldContainer[CancelOrderRequest]
+    def __init__(
+        self, cancels: _Optional[_Iterable[_Union[CancelOrderRequest, _Mapping]]] = ...
+    ) -> None: ...
+
+class CancelOrdersResponse(_message.Message):
+    __slots__ = ("responses",)
+    RESPONSES_FIELD_NUMBER: _ClassVar[int]
+    responses: _containers.RepeatedCompositeFieldContainer[CancelOrderResponse]
+    def __init__(
+        self,
+        responses: _Optional[_Iterable[_Union[CancelOrderResponse, _Mapping]]] = ...,
+    ) -> None: ...
+
+class SessionRequest(_message.Message):
+    __slots__ = ("request_id", "order", "cancel")
+    REQUEST_ID_FIELD_NUMBER: _ClassVar[int]
+    ORDER_FIELD_NUMBER: _ClassVar[int]
+    CANCEL_FIELD_NUMBER: _ClassVar[int]
+    request_id: int
+    order: OrderRequest
+    cancel: CancelOrderRequest
+    def __init__(
+        self,
+        request_id: _Optional[int] = ...,
+        order: _Optional[_Union[OrderRequest, _Mapping]] = ...,
+        cancel: _Optional[_Union[CancelOrderRequest, _Mapping]] = ...,
+    ) -> None: ...
+
+class SessionResponse(_message.Message):
+    __slots__ = ("request_id", "order", "cancel")
+    REQUEST_ID_FIELD_NUMBER: _ClassVar[int]
+    ORDER_FIELD_NUMBER: _ClassVar[int]
+    CANCEL_FIELD_NUMBER: _ClassVar[int]
+    request_id: int
+    order: SubmitOrderResponse
+    cancel: CancelOrderResponse
+    def __init__(
+        self,
+        request_id: _Optional[int] = ...,
+        order: _Optional[_Union[SubmitOrderResponse, _Mapping]] = ...,
+        cancel: _Optional[_Union[CancelOrderResponse, _Mapping]] = ...,
     ) -> None: ...
 
 class PriceLevel(_message.Message):
-    __slots__ = ("price", "quantity", "order_count")
+    __slots__ = ("price", "quantity", "order_count", "price_ticks")
     PRICE_FIELD_NUMBER: _ClassVar[int]
     QUANTITY_FIELD_NUMBER: _ClassVar[int]
     ORDER_COUNT_FIELD_NUMBER: _ClassVar[int]
+    PRICE_TICKS_FIELD_NUMBER: _ClassVar[int]
     price: float
     quantity: int
     order_count: int
+    price_ticks: int
     def __init__(
         self,
         price: _Optional[float] = ...,
         quantity: _Optional[int] = ...,
         order_count: _Optional[int] = ...,
+        price_ticks: _Optional[int] = ...,
     ) -> None: ...
 
 class SyncRequest(_message.Message):
@@ -242,6 +342,7 @@ class BroadcastOrderbookRequest(_message.Message):
         "bids",
         "asks",
         "sequence_number",
+        "originating_engine_addr",
     )
     SYMBOL_FIELD_NUMBER: _ClassVar[int]
     ORIGINATING_ENGINE_ID_FIELD_NUMBER: _ClassVar[int]
@@ -249,12 +350,14 @@ class BroadcastOrderbookRequest(_message.Message):
     BIDS_FIELD_NUMBER: _ClassVar[int]
     ASKS_FIELD_NUMBER: _ClassVar[int]
     SEQUENCE_NUMBER_FIELD_NUMBER: _ClassVar[int]
+    ORIGINATING_ENGINE_ADDR_FIELD_NUMBER: _ClassVar[int]
     symbol: str
     originating_engine_id: str
     num_levels: int
     bids: _containers.RepeatedCompositeFieldContainer[PriceLevel]
     asks: _containers.RepeatedCompositeFieldContainer[PriceLevel]
     sequence_number: int
+    originating_engine_addr: str
     def __init__(
         self,
         symbol: _Optional[str] = ...,
@@ -263,6 +366,7 @@ class BroadcastOrderbookRequest(_message.Message):
         bids: _Optional[_Iterable[_Union[PriceLevel, _Mapping]]] = ...,
         asks: _Optional[_Iterable[_Union[PriceLevel, _Mapping]]] = ...,
         sequence_number: _Optional[int] = ...,
+        originating_engine_addr: _Optional[str] = ...,
     ) -> None: ...
 
 class BroadcastOrderbookResponse(_message.Message):
@@ -281,10 +385,14 @@ class BroadcastOrderbookResponse(_message.Message):
     ) -> None: ...
 
 class GetOrderbookRequest(_message.Message):
-    __slots__ = ("symbol",)
+    __slots__ = ("symbol", "num_levels")
     SYMBOL_FIELD_NUMBER: _ClassVar[int]
+    NUM_LEVELS_FIELD_NUMBER: _ClassVar[int]
     symbol: str
-    def __init__(self, symbol: _Optional[str] = ...) -> None: ...
+    num_levels: int
+    def __init__(
+        self, symbol: _Optional[str] = ..., num_levels: _Optional[int] = ...
+    ) -> None: ...
 
 class GetOrderbookResponse(_message.Message):
     __slots__ = ("symbol", "bids", "asks", "timestamp")
@@ -304,6 +412,37 @@ class GetOrderbookResponse(_message.Message):
         timestamp: _Optional[int] = ...,
     ) -> None: ...
 
+class MarketDataRequest(_message.Message):
+    __slots__ = ("symbols", "depth")
+    SYMBOLS_FIELD_NUMBER: _ClassVar[int]
+    DEPTH_FIELD_NUMBER: _ClassVar[int]
+    symbols: _containers.RepeatedScalarFieldContainer[str]
+    depth: int
+    def __init__(
+        self, symbols: _Optional[_Iterable[str]] = ..., depth: _Optional[int] = ...
+    ) -> None: ...
+
+class MarketDataUpdate(_message.Message):
+    __slots__ = ("symbol", "sequence_number", "snapshot", "bids", "asks")
+    SYMBOL_FIELD_NUMBER: _ClassVar[int]
+    SEQUENCE_NUMBER_FIELD_NUMBER: _ClassVar[int]
+    SNAPSHOT_FIELD_NUMBER: _ClassVar[int]
+    BIDS_FIELD_NUMBER: _ClassVar[int]
+    ASKS_FIELD_NUMBER: _ClassVar[int]
+    symbol: str
+    sequence_number: int
+    snapshot: bool
+    bids: _containers.RepeatedCompositeFieldContainer[PriceLevel]
+    asks: _containers.RepeatedCompositeFieldContainer[PriceLevel]
+    def __init__(
+        self,
+        symbol: _Optional[str] = ...,
+        sequence_number: _Optional[int] = ...,
+        snapshot: bool = ...,
+        bids: _Optional[_Iterable[_Union[PriceLevel, _Mapping]]] = ...,
+        asks: _Optional[_Iterable[_Union[PriceLevel, _Mapping]]] = ...,
+    ) -> None: ...
+
 class ClientRegistrationRequest(_message.Message):
     __slots__ = ("client_id", "client_authentication", "client_x", "client_y")
     CLIENT_ID_FIELD_NUMBER: _ClassVar[int]
@@ -49,6 +49,24 @@ class MatchingServiceStub(object):
             response_deserializer=proto_dot_matching__service__pb2.CancelOrderResponse.FromString,
             _registered_method=True,
         )
+        self.SubmitOrders = channel.unary_unary(
+            "/matching.MatchingService/SubmitOrders",
+            request_serializer=proto_dot_matching__service__pb2.SubmitOrdersRequest.SerializeToString,
+            response_deserializer=proto_dot_matching__service__pb2.SubmitOrdersResponse.FromString,
+            _registered_method=True,
+        )
+        self.CancelOrders = channel.unary_unary(
+            "/matching.MatchingService/CancelOrders",
+            request_serializer=proto_dot_matching__service__pb2.CancelOrdersRequest.SerializeToString,
+            response_deserializer=proto_dot_matching__service__pb2.CancelOrdersResponse.FromString,
+            _registered_method=True,
+        )
+        self.OrderSession = channel.stream_stream(
+            "/matching.MatchingService/OrderSession",
+            request_serializer=proto_dot_matching__service__pb2.SessionRequest.SerializeToString,
+            response_deserializer=proto_dot_matching__service__pb2.SessionResponse.FromString,
+            _registered_method=True,
+        )
         self.SyncOrderBook = channel.unary_unary(
             "/matching.MatchingService/SyncOrderBook",
             request_serializer=proto_dot_matching__service__pb2.SyncRequest.SerializeToString,
@@ -67,6 +85,12 @@ class MatchingServiceStub(object):
             response_deserializer=proto_dot_matching__service__pb2.GetOrderbookResponse.FromString,
             _registered_method=True,
         )
+        self.SubscribeMarketData = channel.unary_stream(
+            "/matching.MatchingService/SubscribeMarketData",
+            request_serializer=proto_dot_matching__service__pb2.MarketDataRequest.SerializeToString,
+            response_deserializer=proto_dot_matching__service__pb2.MarketDataUpdate.FromString,
+            _registered_method=True,
+        )
         self.GetFills = channel.unary_stream(
             "/matching.MatchingService/GetFills",
             request_serializer=proto_dot_matching__service__pb2.FillRequest.SerializeToString,
@@ -114,6 +138,24 @@ class MatchingServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def SubmitOrders(self, request, context):
+        """Submit or cancel many orders in one call, with a status for each"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def CancelOrders(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def OrderSession(self, request_iterator, context):
+        """Orders and cancels in, their acks out, on one long-lived stream"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def SyncOrderBook(self, request, context):
         """Poll for order book updates for synchronization"""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -132,8 +174,14 @@ class MatchingServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def SubscribeMarketData(self, request, context):
+        """Stream of L2 book changes: a snapshot of each symbol, then per-level updates"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def GetFills(self, request, context):
-        """Stream of fill notifications"""
+        """Stream of fill notifications, pushed as they happen until the client disconnects"""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
@@ -175,6 +223,21 @@ def add_MatchingServiceServicer_to_server(servicer, server):
             request_deserializer=proto_dot_matching__service__pb2.CancelOrderRequest.FromString,
             response_serializer=proto_dot_matching__service__pb2.CancelOrderResponse.SerializeToString,
         ),
+        "SubmitOrders": grpc.unary_unary_rpc_method_handler(
+            servicer.SubmitOrders,
+            request_deserializer=proto_dot_matching__service__pb2.SubmitOrdersRequest.FromString,
+            response_serializer=proto_dot_matching__service__pb2.SubmitOrdersResponse.SerializeToString,
+        ),
+        "CancelOrders": grpc.unary_unary_rpc_method_handler(
+            servicer.CancelOrders,
+            request_deserializer=proto_dot_matching__service__pb2.CancelOrdersRequest.FromString,
+            response_serializer=proto_dot_matching__service__pb2.CancelOrdersResponse.SerializeToString,
+        ),
+        "OrderSession": grpc.stream_stream_rpc_method_handler(
+            servicer.OrderSession,
+            request_deserializer=proto_dot_matching__service__pb2.SessionRequest.FromString,
+            response_serializer=proto_dot_matching__service__pb2.SessionResponse.SerializeToString,
+        ),
         "SyncOrderBook": grpc.unary_unary_rpc_method_handler(
             servicer.SyncOrderBook,
             request_deserializer=proto_dot_matching__service__pb2.SyncRequest.FromString,
@@ -190,6 +253,11 @@ def add_MatchingServiceServicer_to_server(servicer, server):
             request_deserializer=proto_dot_matching__service__pb2.GetOrderbookRequest.FromString,
             response_serializer=proto_dot_matching__service__pb2.GetOrderbookResponse.SerializeToString,
         ),
+        "SubscribeMarketData": grpc.unary_stream_rpc_method_handler(
+            servicer.SubscribeMarketData,
+            request_deserializer=proto_dot_matching__service__pb2.MarketDataRequest.FromString,
+            response_serializer=proto_dot_matching__service__pb2.MarketDataUpdate.SerializeToString,
+        ),
         "GetFills": grpc.unary_stream_rpc_method_handler(
             servicer.GetFills,
             request_deserializer=proto_dot_matching__service__pb2.FillRequest.FromString,
@@ -289,6 +357,96 @@ class MatchingService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def SubmitOrders(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/matching.MatchingService/SubmitOrders",
+            proto_dot_matching__service__pb2.SubmitOrdersRequest.SerializeToString,
+            proto_dot_matching__service__pb2.SubmitOrdersResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def CancelOrders(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/matching.MatchingService/CancelOrders",
+            proto_dot_matching__service__pb2.CancelOrdersRequest.SerializeToString,
+            proto_dot_matching__service__pb2.CancelOrdersResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def OrderSession(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            "/matching.MatchingService/OrderSession",
+            proto_dot_matching__service__pb2.SessionRequest.SerializeToString,
+            proto_dot_matching__service__pb2.SessionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def SyncOrderBook(
         request,
@@ -379,6 +537,36 @@ class MatchingService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def SubscribeMarketData(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/matching.MatchingService/SubscribeMarketData",
+            proto_dot_matching__service__pb2.MarketDataRequest.SerializeToString,
+            proto_dot_matching__service__pb2.MarketDataUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def GetFills(
         request,
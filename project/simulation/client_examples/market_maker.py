@@ -31,8 +31,8 @@ class MarketMaker(Client):
                 fills = await self.get_fills()
                 await self.process_fills(fills)
             if self.order_running:
-                for order in order_list:
-                    await self.submit_order(order)
+                # one round trip for the whole set of quotes
+                await self.submit_orders(order_list)
 
     async def stop(self):
         self.logger.info("Stopping run")
@@ -51,7 +51,8 @@ class MarketMaker(Client):
         for symbol in self.symbols: 
             if (random.random() < 0.5):
                 order_list.append(Order(
-                    order_id=str(uuid.uuid4()),
+                    order_id=0,
+                    client_order_id=str(uuid.uuid4()),
                     symbol=symbol,
                     side=Side.BUY,
                     price=99.00,
@@ -64,7 +65,8 @@ class MarketMaker(Client):
                 ))
             else: 
                 order_list.append(Order(
-                    order_id=str(uuid.uuid4()),
+                    order_id=0,
+                    client_order_id=str(uuid.uuid4()),
                     symbol=symbol,
                     side=Side.SELL,
                     price=101.00,
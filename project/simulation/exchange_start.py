@@ -59,6 +59,7 @@ async def main():
             synchronizer=synchronizer,
             cancel_fairy=cancel_fairy,
             authentication_key=PASSWORD,
+            engine_number=i,
         )
         engines.append(engine)
 
@@ -8,6 +8,8 @@ sys.path.append(os.getcwd())
 from engine.match_engine import MatchEngine
 from engine.synchronizer import OrderBookSynchronizer
 from engine.cancel_fairy import CancelFairy
+from engine.journal import Journal
+from engine.shards import ShardPool
 from network.grpc_server import serve_ME
 
 from client.custom_formatter import LogFactory
@@ -20,6 +22,12 @@ async def main():
     IP_ADDR = "127.0.0.1"
     EXCHANGE_ADDR = "127.0.0.1:50050"
     BASE_PORT = 50060 + INDEX
+    SNAPSHOT_INTERVAL = 10  # seconds
+    # worker processes to spread the order books over; 0 keeps them in this
+    # process. Any speed-up is unverified: on one core it is slower, see
+    # benchmarks/shard_benchmark.py. Snapshots and the journal need the books
+    # in this process, so a sharded engine runs without them.
+    NUM_SHARDS = 0
 
     log_directory = os.getcwd()
     log_name = f"simulation_me_{INDEX}"
@@ -35,13 +43,28 @@ async def main():
         engine_addr=f"{IP_ADDR}:{BASE_PORT + INDEX}",
     )
 
+    shards = None
+    if NUM_SHARDS:
+        shards = ShardPool(NUM_SHARDS)
+        shards.start()
+
     engine = MatchEngine(
         engine_id=f"engine_{INDEX}",
         engine_addr=f"{IP_ADDR}:{BASE_PORT + INDEX}",
         synchronizer=synchronizer,
         cancel_fairy=cancel_fairy,
         authentication_key=PASSWORD,
+        engine_number=INDEX,
+        journal=(
+            None
+            if shards is not None
+            else Journal(f"{os.getcwd()}/journals/engine_{INDEX}.journal")
+        ),
+        shards=shards,
     )
+    if shards is None:
+        # pick up where the last run of this engine left off
+        engine.recover()
 
     # Start gRPC server
     try:
@@ -64,6 +87,9 @@ async def main():
         f"cancel fairy {engine.engine_id} peers: {engine.cancel_fairy.peer_addresses}"
     )
 
+    if shards is None:
+        await engine.start_snapshots(SNAPSHOT_INTERVAL)
+
     # server cleanup
     await server.wait_for_termination()
 
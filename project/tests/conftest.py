@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# the packages are imported from the project directory, as when running main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import proto.matching_service_pb2 as pb2
+from engine.cancel_fairy import CancelFairy
+from engine.match_engine import MatchEngine
+from engine.synchronizer import OrderBookSynchronizer
+
+ENGINE_ADDR = "127.0.0.1:50051"
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path, monkeypatch):
+    # the engine's components write their logs under the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+def make_engine(peer_addresses=(), **kwargs) -> MatchEngine:
+    """A MatchEngine driven in process; its peers are never connected to"""
+    return MatchEngine(
+        "engine_0",
+        ENGINE_ADDR,
+        OrderBookSynchronizer("engine_0", ENGINE_ADDR, list(peer_addresses)),
+        CancelFairy("engine_0", ENGINE_ADDR, list(peer_addresses)),
+        **kwargs,
+    )
+
+
+def order_request(
+    symbol: str,
+    side: str,
+    price: float,
+    quantity: int,
+    client_id: str = "c1",
+    **kwargs,
+) -> pb2.OrderRequest:
+    kwargs.setdefault("engine_origin_addr", ENGINE_ADDR)
+    return pb2.OrderRequest(
+        symbol=symbol,
+        side=side,
+        price=price,
+        quantity=quantity,
+        remaining_quantity=quantity,
+        client_id=client_id,
+        **kwargs,
+    )
+
+
+class AbortedRpc(Exception):
+    """Raised by FakeContext.abort, as grpc's own context raises to end the call"""
+
+
+class FakeContext:
+    """The parts of a grpc.aio servicer context the servicers use"""
+
+    def __init__(self):
+        self.code = None
+        self.details = None
+
+    async def abort(self, code, details=""):
+        self.code, self.details = code, details
+        raise AbortedRpc(code, details)
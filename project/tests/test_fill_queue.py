@@ -0,0 +1,50 @@
+import asyncio
+
+from common.order import CompactFill, CompactOrder
+from common.orderbook import FillBuffer
+from engine.fill_queue import FillQueue
+
+
+def buffered_fills(count: int) -> list:
+    """count BufferedFill views, one per row of a FillBuffer"""
+    orders = [
+        CompactOrder(i, "X", side, 100.0, 10000, 1, 0, i, f"c{i}", "127.0.0.1:50051")
+        for i, side in ((1, "BUY"), (2, "SELL"))
+    ]
+    fills = FillBuffer()
+    for i in range(count):
+        fills.append(i + 1, orders[0], orders[1], 10000, 1, 123)
+    return [fill for _, fill in fills.to_dict()["incoming_fills"]]
+
+
+def test_queued_fills_are_copied_out_of_their_buffer_once():
+    async def run():
+        queue = FillQueue()
+        fill = buffered_fills(1)[0]
+        assert queue.put(fill) == 1
+        sequence_number, sent = await queue.get()
+        assert sequence_number == 1
+        assert isinstance(sent, CompactFill)
+        # the copy sent is the one retained
+        assert queue.retained[0][1] is sent
+        assert (sent.fill_id, sent.price, sent.buyer_id, sent.seller_id) == (
+            1,
+            100.0,
+            "c1",
+            "c2",
+        )
+
+    asyncio.run(run())
+
+
+def test_resume_gets_the_retained_fills_after_a_sequence_number():
+    async def run():
+        queue = FillQueue(retained=3)
+        for fill in buffered_fills(5):
+            queue.put(fill)
+        # the two oldest are no longer retained
+        assert queue.first_retained() == 3
+        assert [number for number, _ in queue.retained_after(3)] == [4, 5]
+        assert [number for number, _ in queue.retained_after(0)] == [3, 4, 5]
+
+    asyncio.run(run())
@@ -0,0 +1,241 @@
+import asyncio
+
+import grpc
+import pytest
+
+import proto.matching_service_pb2 as pb2
+from common.order import CompactOrder
+from conftest import AbortedRpc, FakeContext, make_engine, order_request
+from engine.cancel_fairy import ActiveOrder
+from network.grpc_server import MatchingServicer
+
+PEER = "127.0.0.1:50052"
+
+
+def make_servicer(**kwargs) -> MatchingServicer:
+    engine = make_engine(**kwargs)
+    engine.register_client("c1")
+    engine.register_client("c2")
+    return MatchingServicer(engine)
+
+
+def test_get_fills_resumes_and_refuses_a_second_stream():
+    async def run():
+        servicer = make_servicer()
+        engine = servicer.engine
+        await engine.submit_order(order_request("X", "SELL", 100.0, 3, "c2"))
+        for _ in range(2):
+            await engine.submit_order(order_request("X", "BUY", 100.0, 1, "c1"))
+
+        stream = servicer.GetFills(pb2.FillRequest(client_id="c1"), FakeContext())
+        assert [(await stream.__anext__()).sequence_number for _ in range(2)] == [1, 2]
+
+        # a second stream would take some of the first one's fills
+        context = FakeContext()
+        with pytest.raises(AbortedRpc):
+            await servicer.GetFills(
+                pb2.FillRequest(client_id="c1"), context
+            ).__anext__()
+        assert context.code == grpc.StatusCode.ALREADY_EXISTS
+
+        # once the first stream is gone, a new one resumes where it left off
+        # and then carries on with new fills
+        await stream.aclose()
+        resumed = servicer.GetFills(
+            pb2.FillRequest(client_id="c1", resume_after_sequence=1), FakeContext()
+        )
+        fill = await resumed.__anext__()
+        assert (fill.sequence_number, fill.quantity, fill.price) == (2, 1, 100.0)
+        await engine.submit_order(order_request("X", "BUY", 100.0, 1, "c1"))
+        assert (await resumed.__anext__()).sequence_number == 3
+        await resumed.aclose()
+
+    asyncio.run(run())
+
+
+def test_get_fills_for_an_unknown_client_is_not_found():
+    async def run():
+        context = FakeContext()
+        with pytest.raises(AbortedRpc):
+            await make_servicer().GetFills(
+                pb2.FillRequest(client_id="nobody"), context
+            ).__anext__()
+        assert context.code == grpc.StatusCode.NOT_FOUND
+
+    asyncio.run(run())
+
+
+def test_market_data_for_an_unknown_symbol_is_refused():
+    async def run():
+        servicer = make_servicer(tick_sizes={"Y": 0.5})
+        context = FakeContext()
+        request = pb2.MarketDataRequest(symbols=["Y", "NOPE"])
+        with pytest.raises(AbortedRpc):
+            await servicer.SubscribeMarketData(request, context).__anext__()
+        assert context.code == grpc.StatusCode.FAILED_PRECONDITION
+        assert "NOPE" in context.details
+        # nothing was created for either symbol
+        assert servicer.engine.orderbooks == {}
+
+        # a symbol with a configured tick size starts with a snapshot
+        stream = servicer.SubscribeMarketData(
+            pb2.MarketDataRequest(symbols=["Y"]), FakeContext()
+        )
+        update = await stream.__anext__()
+        assert (update.symbol, update.snapshot) == ("Y", True)
+        assert list(servicer.engine.orderbooks) == ["Y"]
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_get_order_book_reuses_one_response_per_symbol():
+    async def run():
+        servicer = make_servicer()
+        engine = servicer.engine
+        for price in (99.0, 98.0, 97.0):
+            await engine.submit_order(order_request("X", "BUY", price, 1))
+        await engine.submit_order(order_request("Y", "BUY", 50.0, 1))
+
+        depth_reads = []
+        get_depth = engine.get_depth
+
+        async def counting_get_depth(symbol, num_levels):
+            depth_reads.append((symbol, num_levels))
+            return await get_depth(symbol, num_levels)
+
+        engine.get_depth = counting_get_depth
+
+        async def bids(num_levels, symbol="X"):
+            response = await servicer.GetOrderBook(
+                pb2.GetOrderbookRequest(symbol=symbol, num_levels=num_levels),
+                FakeContext(),
+            )
+            return [level.price for level in response.bids]
+
+        assert await bids(2) == [99.0, 98.0]
+        assert await bids(2) == [99.0, 98.0]
+        assert await bids(1) == [99.0]
+        # more levels than the cached response holds
+        assert await bids(0) == [99.0, 98.0, 97.0]
+        assert await bids(2) == [99.0, 98.0]
+        assert await bids(5) == [99.0, 98.0, 97.0]
+        assert await bids(0, "Y") == [50.0]
+        assert depth_reads == [("X", 2), ("X", 0), ("Y", 0)]
+        assert sorted(servicer.orderbook_responses) == ["X", "Y"]
+
+        # a change to the book makes its response stale
+        await engine.submit_order(order_request("X", "BUY", 99.5, 1))
+        assert await bids(2) == [99.5, 99.0]
+        assert depth_reads[-1] == ("X", 2)
+        assert servicer.orderbook_responses["X"][1] == 2
+
+    asyncio.run(run())
+
+
+def cancel_request(symbol: str, order_id: int) -> pb2.CancelOrderRequest:
+    return pb2.CancelOrderRequest(
+        order_id=order_id,
+        order_record=order_request(symbol, "BUY", 0, 0, order_id=order_id),
+    )
+
+
+def test_batches_report_each_item_on_its_own():
+    async def run():
+        servicer = make_servicer()
+        orders = [
+            order_request("X", "SELL", 100.0, 5),
+            # not a whole number of ticks
+            order_request("X", "SELL", 100.005, 5),
+            order_request("Y", "BUY", 50.0, 2),
+            order_request("X", "BUY", 100.0, 5, "c2"),
+        ]
+        submitted = await servicer.SubmitOrders(
+            pb2.SubmitOrdersRequest(orders=orders), FakeContext()
+        )
+        ids = [response.order_id for response in submitted.responses]
+        cancels = [
+            # the resting Y order; the symbol the request names does not matter
+            cancel_request("X", ids[2]),
+            # filled by the last order of the batch
+            cancel_request("X", ids[0]),
+            cancel_request("X", 12345),
+        ]
+        cancelled = await servicer.CancelOrders(
+            pb2.CancelOrdersRequest(cancels=cancels), FakeContext()
+        )
+        return servicer.engine, submitted.responses, cancelled.responses
+
+    engine, submitted, cancelled = asyncio.run(run())
+    assert [response.status for response in submitted] == [
+        "SUCCESS",
+        "ERROR",
+        "SUCCESS",
+        "SUCCESS",
+    ]
+    assert "tick size" in submitted[1].error_message
+    assert len({response.order_id for response in submitted}) == 4
+    assert [
+        (response.order_id, response.status, response.quantity_cancelled)
+        for response in cancelled
+    ] == [
+        (submitted[2].order_id, "SUCCESSFUL", 2),
+        (submitted[0].order_id, "FAILED", 0),
+        (12345, "FAILED", 0),
+    ]
+    assert engine.orderbooks["X"].get_depth() == ([], [])
+    assert engine.orderbooks["Y"].get_depth() == ([], [])
+
+
+def test_order_session_acks_every_request():
+    async def session(servicer, messages):
+        async def requests():
+            for message in messages:
+                yield message
+
+        return {
+            ack.request_id: ack
+            async for ack in servicer.OrderSession(requests(), FakeContext())
+        }
+
+    async def run():
+        servicer = make_servicer(peer_addresses=[PEER])
+        orders = await session(
+            servicer,
+            [
+                pb2.SessionRequest(
+                    request_id=1, order=order_request("X", "SELL", 100.0, 5)
+                ),
+                pb2.SessionRequest(
+                    request_id=2, order=order_request("X", "SELL", 100.005, 5)
+                ),
+            ],
+        )
+        # an order routed to a peer this engine never connected to, so its
+        # cancel fails inside the handler
+        servicer.engine.cancel_fairy.active_orders[999] = ActiveOrder(
+            5, PEER, CompactOrder.from_request(order_request("X", "BUY", 1.0, 5))
+        )
+        cancels = await session(
+            servicer,
+            [
+                pb2.SessionRequest(
+                    request_id=3, cancel=cancel_request("X", orders[1].order.order_id)
+                ),
+                pb2.SessionRequest(request_id=4, cancel=cancel_request("X", 999)),
+            ],
+        )
+        return orders, cancels
+
+    orders, cancels = asyncio.run(run())
+    assert sorted(orders) == [1, 2]
+    assert orders[1].order.status == "SUCCESS"
+    assert orders[2].order.status == "ERROR"
+    assert "tick size" in orders[2].order.error_message
+    assert sorted(cancels) == [3, 4]
+    assert (cancels[3].cancel.status, cancels[3].cancel.quantity_cancelled) == (
+        "SUCCESSFUL",
+        5,
+    )
+    assert cancels[3].cancel.order_id == orders[1].order.order_id
+    assert (cancels[4].cancel.status, cancels[4].cancel.order_id) == ("FAILED", 999)
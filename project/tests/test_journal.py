@@ -0,0 +1,74 @@
+import asyncio
+import os
+
+import pytest
+
+from engine.journal import CANCEL, Journal, read_journal
+
+
+def cancelled_ids(path: str) -> list:
+    return [
+        fields[0] for record_type, fields in read_journal(path) if record_type == CANCEL
+    ]
+
+
+def test_reopen_truncates_a_torn_tail(tmp_path):
+    path = str(tmp_path / "engine.journal")
+
+    async def write():
+        journal = Journal(path, sync_interval_ms=0)
+        journal.append_cancel(1, "X", 5)
+        journal.append_cancel(2, "X", 7)
+        await journal.commit()
+        await journal.close()
+        return journal.offset
+
+    offset = asyncio.run(write())
+    with open(path, "ab") as f:
+        # a record header promising more bytes than were written
+        f.write(b"\x10\x00\x00\x00torn")
+
+    journal = Journal(path)
+    assert journal.offset == offset
+    assert os.path.getsize(path) == offset
+    assert cancelled_ids(path) == [1, 2]
+    journal.file.close()
+
+
+def test_failed_write_is_truncated_and_stops_the_journal(tmp_path):
+    path = str(tmp_path / "engine.journal")
+
+    async def write():
+        journal = Journal(path, sync_interval_ms=0)
+        journal.append_cancel(1, "X", 5)
+        await journal.commit()
+        durable_offset = journal.offset
+
+        write = journal.file.write
+
+        def short_write(data):
+            write(bytes(data)[:7])
+            raise OSError("disk full")
+
+        journal.file.write = short_write
+        journal.append_cancel(2, "X", 5)
+        with pytest.raises(OSError, match="disk full"):
+            await journal.commit()
+
+        # events after the lost one could not be replayed, so nothing more
+        # is taken
+        journal.file.write = write
+        journal.append_cancel(3, "X", 5)
+        with pytest.raises(OSError, match="disk full"):
+            await journal.commit()
+        with pytest.raises(RuntimeError, match="stopped"):
+            journal.check()
+        assert journal.offset == durable_offset
+        with pytest.raises(OSError):
+            await journal.close()
+        return durable_offset
+
+    offset = asyncio.run(write())
+    # the partial record was cut off
+    assert os.path.getsize(path) == offset
+    assert cancelled_ids(path) == [1]
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from common.ladder_orderbook import LadderOrderBook
+from common.orderbook import OrderBook
+from test_orderbook import TICK_SIZE, make_order
+
+BAND = (90.0, 110.0)
+
+
+def fill_rows(fills) -> list:
+    return [
+        (fill.fill_id, fill.order_id, fill.price, fill.quantity)
+        for _, fill in fills["incoming_fills"] + fills["resting_fills"]
+    ]
+
+
+def test_ladder_matches_like_the_dict_book():
+    dict_book = OrderBook("X", TICK_SIZE, price_band=BAND)
+    ladder_book = LadderOrderBook("X", *BAND, TICK_SIZE)
+    books = [(dict_book, {}), (ladder_book, {})]
+    rng = random.Random(7)
+
+    resting = []
+    for order_id in range(1, 2001):
+        if resting and rng.random() < 0.2:
+            cancelled = resting.pop(rng.randrange(len(resting)))
+            removed = [book.remove_order(cancelled) for book, _ in books]
+            assert removed[0] == removed[1]
+            for _, active_orders in books:
+                active_orders.pop(cancelled, None)
+            continue
+
+        side = rng.choice(["BUY", "SELL"])
+        price = round(rng.uniform(*BAND) * 2) / 2
+        quantity = rng.randint(1, 20)
+        results = []
+        for book, active_orders in books:
+            order = make_order(order_id, side, price, quantity)
+            active_orders[order_id] = order
+            results.append(fill_rows(book.add_order(order, active_orders)))
+        assert results[0] == results[1]
+        if order_id in dict_book.order_nodes:
+            resting.append(order_id)
+
+        assert dict_book.get_bbo() == ladder_book.get_bbo()
+        assert dict_book.get_depth(5) == ladder_book.get_depth(5)
+
+    assert dict_book.get_depth() == ladder_book.get_depth()
+    assert set(dict_book.order_nodes) == set(ladder_book.order_nodes)
+
+
+def test_ladder_rejects_orders_outside_its_band():
+    book = LadderOrderBook("X", *BAND, TICK_SIZE)
+    with pytest.raises(ValueError, match="outside the X price band"):
+        book.add_order(make_order(1, "BUY", 110.5, 1), {})
+    assert book.get_depth() == ([], [])
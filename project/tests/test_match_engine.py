@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+import proto.matching_service_pb2 as pb2
+from common.order import engine_number_of
+from conftest import make_engine, order_request
+from engine.journal import Journal
+
+PEER = "127.0.0.1:50052"
+
+
+def test_client_orders_get_engine_ids_whatever_their_origin():
+    engine = make_engine(peer_addresses=[PEER], engine_number=3)
+    engine.register_client("c1")
+    # a made-up origin and a reused id must not replace the first order
+    orders = [
+        order_request("X", "BUY", 100.0 - i, 5, order_id=2, engine_origin_addr=origin)
+        for i, origin in enumerate(["127.0.0.1:9", "127.0.0.1:9", engine.address])
+    ]
+
+    async def submit():
+        for order in orders:
+            await engine.submit_order(order)
+
+    asyncio.run(submit())
+    ids = [order.order_id for order in orders]
+    assert len(set(ids)) == 3
+    assert all(engine_number_of(order_id) == 3 for order_id in ids)
+    book = engine.orderbooks["X"]
+    assert set(book.order_nodes) == set(ids)
+    assert book.get_depth()[0] == [(10000, 5, 1), (9900, 5, 1), (9800, 5, 1)]
+
+
+def test_peer_orders_keep_their_id_and_reused_ids_are_rejected():
+    engine = make_engine(peer_addresses=[PEER])
+
+    async def submit():
+        routed = order_request(
+            "X", "BUY", 100.0, 5, order_id=7, engine_origin_addr=PEER
+        )
+        await engine.submit_order(routed)
+        assert routed.order_id == 7
+        with pytest.raises(ValueError, match="already in use"):
+            await engine.submit_order(
+                order_request("X", "BUY", 99.0, 3, order_id=7, engine_origin_addr=PEER)
+            )
+
+    asyncio.run(submit())
+    book = engine.orderbooks["X"]
+    assert list(book.order_nodes) == [7]
+    assert book.get_depth() == ([(10000, 5, 1)], [])
+    assert engine.cancel_fairy.active_orders[7].remaining_quantity == 5
+
+
+class RecordingPeerStub:
+    def __init__(self):
+        self.orders = []
+
+    async def SubmitOrder(self, order):
+        self.orders.append(order)
+        return pb2.SubmitOrderResponse(status="SUCCESSFUL")
+
+
+def test_ticks_only_orders_are_routed_on_their_tick_price():
+    engine = make_engine(peer_addresses=[PEER])
+    engine.register_client("c1")
+    stub = RecordingPeerStub()
+    engine.synchronizer.peer_stubs[PEER] = stub
+    # the peer's best bid is 99.00
+    engine.synchronizer.global_best_prices["X"] = {PEER: (1, 99.0, 5, None, 0)}
+
+    async def submit():
+        above = order_request("X", "SELL", 0, 5, price_ticks=10100)
+        await engine.submit_order(above)
+        below = order_request("X", "SELL", 0, 5, price_ticks=9800)
+        await engine.submit_order(below)
+        return above, below
+
+    above, below = asyncio.run(submit())
+    assert [order.order_id for order in stub.orders] == [below.order_id]
+    assert engine.orderbooks["X"].get_depth() == ([], [(10100, 5, 1)])
+    assert engine.cancel_fairy.active_orders[above.order_id].address == engine.address
+    assert engine.cancel_fairy.active_orders[below.order_id].address == PEER
+
+
+def test_failed_journal_commit_stops_the_engine_after_the_applied_order(tmp_path):
+    engine = make_engine(
+        journal=Journal(str(tmp_path / "engine.journal"), sync_interval_ms=0)
+    )
+    engine.register_client("c1")
+    engine.register_client("c2")
+
+    async def trade():
+        await engine.submit_order(order_request("X", "SELL", 100.0, 5, "c2"))
+
+        def failed_write(data):
+            raise OSError("disk full")
+
+        engine.journal.file.write = failed_write
+        # the order is matched before the commit fails, so it is reported as
+        # done and both sides get their fills
+        resting = order_request("X", "BUY", 100.0, 8, "c1")
+        fills = await engine.submit_order(resting)
+        assert len(fills["incoming_fills"]) == 1
+        assert engine.fill_queues["c2"].qsize() == 1
+        assert engine.orderbooks["X"].get_depth() == ([(10000, 3, 1)], [])
+
+        # then the engine takes no more orders or cancels
+        with pytest.raises(RuntimeError, match="stopped"):
+            await engine.submit_order(order_request("X", "SELL", 100.0, 1, "c2"))
+        with pytest.raises(RuntimeError, match="stopped"):
+            await engine.submit_orders([order_request("X", "SELL", 100.0, 1, "c2")])
+        with pytest.raises(RuntimeError, match="stopped"):
+            await engine.cancel_fairy.cancel(resting, engine.orderbooks)
+        engine.journal.file.close()
+
+    asyncio.run(trade())
+    assert engine.orderbooks["X"].get_depth() == ([(10000, 3, 1)], [])
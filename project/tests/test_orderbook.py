@@ -0,0 +1,82 @@
+from common.order import CompactOrder, price_to_ticks
+from common.orderbook import OrderBook
+
+TICK_SIZE = 0.01
+
+
+def make_order(order_id: int, side: str, price: float, quantity: int) -> CompactOrder:
+    return CompactOrder(
+        order_id=order_id,
+        symbol="X",
+        side=side,
+        price=price,
+        price_ticks=price_to_ticks(price, TICK_SIZE),
+        quantity=quantity,
+        remaining_quantity=quantity,
+        timestamp=order_id,
+        client_id=f"c{order_id}",
+        engine_origin_addr="127.0.0.1:50051",
+    )
+
+
+def add(book: OrderBook, active_orders: dict, order: CompactOrder) -> list:
+    """Add order to book and return its (resting order id, price, quantity) fills"""
+    active_orders[order.order_id] = order
+    fills = book.add_order(order, active_orders)
+    return [
+        (fill.order_id, fill.price, fill.quantity) for _, fill in fills["resting_fills"]
+    ]
+
+
+def test_orders_that_do_not_cross_rest():
+    book, active_orders = OrderBook("X", TICK_SIZE), {}
+    assert add(book, active_orders, make_order(1, "BUY", 99.5, 10)) == []
+    assert add(book, active_orders, make_order(2, "SELL", 100.5, 5)) == []
+    assert book.get_depth() == ([(9950, 10, 1)], [(10050, 5, 1)])
+    assert book.get_bbo() == (9950, 10, 10050, 5)
+
+
+def test_match_in_price_then_time_priority():
+    book, active_orders = OrderBook("X", TICK_SIZE), {}
+    add(book, active_orders, make_order(1, "SELL", 101.0, 5))
+    add(book, active_orders, make_order(2, "SELL", 100.0, 3))
+    add(book, active_orders, make_order(3, "SELL", 100.0, 4))
+
+    # fills at the resting prices, best level first and oldest order first
+    fills = add(book, active_orders, make_order(4, "BUY", 101.0, 9))
+    assert fills == [(2, 100.0, 3), (3, 100.0, 4), (1, 101.0, 2)]
+    assert book.get_depth() == ([], [(10100, 3, 1)])
+    assert set(active_orders) == {1}
+
+
+def test_partial_fill_rests_the_remainder():
+    book, active_orders = OrderBook("X", TICK_SIZE), {}
+    add(book, active_orders, make_order(1, "BUY", 100.0, 4))
+    assert add(book, active_orders, make_order(2, "SELL", 99.0, 10)) == [(1, 100.0, 4)]
+    assert book.get_depth() == ([], [(9900, 6, 1)])
+    assert book.get_bbo() == (None, 0, 9900, 6)
+
+
+def test_cancel_removes_the_order_and_empty_level():
+    book, active_orders = OrderBook("X", TICK_SIZE), {}
+    add(book, active_orders, make_order(1, "BUY", 100.0, 4))
+    add(book, active_orders, make_order(2, "BUY", 100.0, 6))
+    add(book, active_orders, make_order(3, "BUY", 99.0, 1))
+
+    assert book.remove_order(1) == 4
+    assert book.get_depth() == ([(10000, 6, 1), (9900, 1, 1)], [])
+    assert book.remove_order(2) == 6
+    assert book.get_bbo() == (9900, 1, None, 0)
+    # already gone
+    assert book.remove_order(2) is None
+
+
+def test_cancelled_order_is_not_matched():
+    book, active_orders = OrderBook("X", TICK_SIZE), {}
+    add(book, active_orders, make_order(1, "SELL", 100.0, 5))
+    add(book, active_orders, make_order(2, "SELL", 100.0, 5))
+    book.remove_order(1)
+    del active_orders[1]
+
+    assert add(book, active_orders, make_order(3, "BUY", 100.0, 5)) == [(2, 100.0, 5)]
+    assert book.get_depth() == ([], [])
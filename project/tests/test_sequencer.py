@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from conftest import make_engine, order_request
+from engine.sequencer import Sequencer
+
+
+def test_each_symbols_jobs_run_one_at_a_time_in_order():
+    events = []
+
+    def job(symbol: str, i: int, delay: float):
+        async def run():
+            events.append(("start", symbol, i))
+            await asyncio.sleep(delay)
+            events.append(("end", symbol, i))
+            return i
+
+        return run
+
+    async def run():
+        sequencer = Sequencer()
+        # the first X job is the slowest, so only a queue keeps the X jobs in
+        # order; Y has its own task and finishes while X is still running
+        futures = [
+            sequencer.submit("X", job("X", 0, 0.02)),
+            sequencer.submit("Y", job("Y", 0, 0)),
+            sequencer.submit("X", job("X", 1, 0)),
+            sequencer.submit("X", job("X", 2, 0.01)),
+        ]
+        results = await asyncio.gather(*futures)
+        sequencer.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 0, 1, 2]
+    x_events = [(event, i) for event, symbol, i in events if symbol == "X"]
+    assert x_events == [
+        ("start", 0),
+        ("end", 0),
+        ("start", 1),
+        ("end", 1),
+        ("start", 2),
+        ("end", 2),
+    ]
+    assert events.index(("end", "Y", 0)) < events.index(("end", "X", 0))
+
+
+def test_a_failed_job_does_not_stop_its_symbol():
+    async def fail():
+        raise ValueError("rejected")
+
+    async def succeed():
+        return "done"
+
+    async def run():
+        sequencer = Sequencer()
+        failed = sequencer.submit("X", fail)
+        succeeded = sequencer.submit("X", succeed)
+        with pytest.raises(ValueError, match="rejected"):
+            await failed
+        result = await succeeded
+        sequencer.close()
+        return result
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_cancels_queue_behind_orders_for_the_cancelled_orders_symbol():
+    engine = make_engine()
+    engine.register_client("c1")
+    engine.register_client("c2")
+
+    async def run():
+        resting = order_request("X", "SELL", 100.0, 5)
+        await engine.submit_order(resting)
+        # hold X's sequencer so the next order and the cancel queue up together
+        release = asyncio.Event()
+        held = engine.sequencer.submit("X", release.wait)
+        crossing = asyncio.create_task(
+            engine.submit_order(order_request("X", "BUY", 100.0, 5, client_id="c2"))
+        )
+        await asyncio.sleep(0)
+        # the cancel names another symbol, but is sequenced by its order's
+        cancel = asyncio.create_task(
+            engine.cancel_fairy.cancel(
+                order_request("Y", "SELL", 100.0, 5, order_id=resting.order_id),
+                engine.orderbooks,
+            )
+        )
+        await asyncio.sleep(0)
+        release.set()
+        await held
+        fills = await crossing
+        return fills, await cancel
+
+    fills, cancelled = asyncio.run(run())
+    assert len(fills["resting_fills"]) == 1
+    assert cancelled == (False, 0)
+    assert engine.orderbooks["X"].get_depth() == ([], [])
@@ -0,0 +1,76 @@
+import asyncio
+import random
+
+import pytest
+
+from conftest import make_engine, order_request
+from engine.journal import Journal
+from engine.shards import ShardPool
+
+
+async def trade(engine, num_orders: int) -> list:
+    """Submit random orders over four symbols, cancelling some, and return
+    what each call gave back"""
+    rng = random.Random(9)
+    engine.register_client("c1")
+    submitted, results = [], []
+    for i in range(num_orders):
+        order = order_request(
+            rng.choice(["W", "X", "Y", "Z"]),
+            rng.choice(["BUY", "SELL"]),
+            round(rng.gauss(100, 1), 2),
+            rng.randint(1, 20),
+        )
+        fills = await engine.submit_order(order)
+        submitted.append(order)
+        results.append(
+            sorted(
+                (fill.fill_id, fill.order_id, fill.quantity, fill.price)
+                for _, fill in fills["incoming_fills"] + fills["resting_fills"]
+            )
+        )
+        if i % 5 == 0:
+            results.append(
+                await engine.cancel_fairy.cancel(
+                    rng.choice(submitted), engine.orderbooks
+                )
+            )
+    return results
+
+
+async def engine_state(engine) -> tuple:
+    return (
+        {symbol: await engine.get_depth(symbol) for symbol in engine.orderbooks},
+        {symbol: book.get_bbo() for symbol, book in engine.orderbooks.items()},
+        {
+            order_id: active.remaining_quantity
+            for order_id, active in engine.cancel_fairy.active_orders.items()
+        },
+    )
+
+
+def test_sharded_engine_matches_like_one_process():
+    async def run(num_shards: int):
+        shards = None
+        if num_shards:
+            shards = ShardPool(num_shards)
+            shards.start()
+        try:
+            engine = make_engine(shards=shards)
+            results = await trade(engine, 300)
+            return results, await engine_state(engine)
+        finally:
+            if shards is not None:
+                shards.close()
+
+    assert asyncio.run(run(2)) == asyncio.run(run(0))
+
+
+def test_journal_is_refused_with_shards(tmp_path):
+    shards = ShardPool(1)
+    journal = Journal(str(tmp_path / "engine.journal"))
+    try:
+        with pytest.raises(RuntimeError, match="journals"):
+            make_engine(shards=shards, journal=journal)
+    finally:
+        journal.file.close()
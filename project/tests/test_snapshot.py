@@ -0,0 +1,85 @@
+import asyncio
+
+from common.order import CompactOrder
+from conftest import make_engine, order_request
+from engine.cancel_fairy import ActiveOrder
+
+
+def test_snapshot_round_trip(tmp_path):
+    snapshot_path = str(tmp_path / "engine.snapshot")
+
+    def new_engine():
+        return make_engine(
+            snapshot_path=snapshot_path,
+            price_bands={"X": (90, 110)},
+            engine_number=3,
+        )
+
+    engine = new_engine()
+    engine.register_client("c1")
+    engine.register_client("c2")
+
+    async def trade():
+        for symbol, side, price, quantity, client_id in [
+            ("X", "BUY", 100.0, 10, "c1"),
+            ("X", "SELL", 99.5, 4, "c2"),
+            ("X", "SELL", 101.0, 3, "c2"),
+            ("X", "SELL", 101.0, 5, "c1"),
+            ("Y", "SELL", 120.0, 4, "c2"),
+            ("Y", "BUY", 119.0, 7, "c1"),
+        ]:
+            await engine.submit_order(
+                order_request(symbol, side, price, quantity, client_id)
+            )
+        # an order routed to a peer is open but rests in none of our books
+        routed = CompactOrder(
+            order_id=engine.order_ids.next_id(),
+            symbol="Y",
+            side="BUY",
+            price=118.0,
+            price_ticks=11800,
+            quantity=5,
+            remaining_quantity=5,
+            timestamp=1,
+            client_id="c1",
+            engine_origin_addr=engine.address,
+            client_order_id="routed-ü",
+        )
+        engine.cancel_fairy.active_orders[routed.order_id] = ActiveOrder(
+            2, "127.0.0.1:50052", routed
+        )
+        await engine.save_snapshot()
+
+    asyncio.run(trade())
+    restored = new_engine()
+    assert restored.load_snapshot() is not None
+
+    assert set(restored.orderbooks) == {"X", "Y"}
+    for symbol, book in engine.orderbooks.items():
+        restored_book = restored.orderbooks[symbol]
+        assert restored_book.get_depth() == book.get_depth()
+        assert restored_book.get_bbo() == book.get_bbo()
+        assert [order.order_id for order in restored_book.resting_orders()] == [
+            order.order_id for order in book.resting_orders()
+        ]
+    assert restored.orderbooks["X"].price_band == (90, 110)
+
+    active_orders = engine.cancel_fairy.active_orders
+    restored_active_orders = restored.cancel_fairy.active_orders
+    assert set(restored_active_orders) == set(active_orders)
+    for order_id, active in active_orders.items():
+        restored_active = restored_active_orders[order_id]
+        assert restored_active.remaining_quantity == active.remaining_quantity
+        assert restored_active.address == active.address
+        for field in CompactOrder.__slots__:
+            assert getattr(restored_active.order_record, field) == getattr(
+                active.order_record, field
+            ), field
+    assert restored.order_ids.sequence == engine.order_ids.sequence
+    assert restored.execution_ids.sequence == engine.execution_ids.sequence
+
+    # the restored engine keeps matching against the restored book
+    restored.register_client("c1")
+    restored.register_client("c2")
+    asyncio.run(restored.submit_order(order_request("X", "BUY", 101.0, 8, "c2")))
+    assert restored.orderbooks["X"].get_depth() == ([(10000, 6, 1)], [])
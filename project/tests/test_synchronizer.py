@@ -0,0 +1,110 @@
+import asyncio
+
+import proto.matching_service_pb2 as pb2
+from engine.synchronizer import OrderBookSynchronizer
+
+PEER = "127.0.0.1:50052"
+
+
+class FakePeerStub:
+    """Answers SyncOrderBook with a fixed top of book for every symbol"""
+
+    def __init__(self, sequence_number: int):
+        self.sequence_number = sequence_number
+        self.synced = []
+
+    async def SyncOrderBook(self, request):
+        self.synced.append((request.symbol, request.num_levels))
+        return pb2.SyncResponse(
+            symbol=request.symbol,
+            bids=[pb2.PriceLevel(price=99.0, quantity=3)],
+            asks=[pb2.PriceLevel(price=101.0, quantity=4)],
+            sequence_number=self.sequence_number,
+        )
+
+
+def update(symbol: str, sequence_number: int, bid: float, ask: float):
+    return pb2.BroadcastOrderbookRequest(
+        symbol=symbol,
+        sequence_number=sequence_number,
+        originating_engine_addr=PEER,
+        bids=[pb2.PriceLevel(price=bid, quantity=1)],
+        asks=[pb2.PriceLevel(price=ask, quantity=2)],
+    )
+
+
+def make_synchronizer(stub=None) -> OrderBookSynchronizer:
+    synchronizer = OrderBookSynchronizer("engine_0", "127.0.0.1:50051", [PEER])
+    if stub is not None:
+        synchronizer.peer_stubs[PEER] = stub
+    return synchronizer
+
+
+def test_updates_in_sequence_are_applied():
+    synchronizer = make_synchronizer()
+
+    async def run():
+        for sequence_number, symbol in enumerate(["X", "Y", "X"], 1):
+            response = await synchronizer.process_peer_update(
+                update(symbol, sequence_number, 100.0 - sequence_number, 102.0)
+            )
+            assert response.status == "SUCCESSFUL"
+
+    asyncio.run(run())
+    assert synchronizer.peer_sequence_numbers[PEER] == 3
+    assert synchronizer.global_best_prices["X"][PEER] == (3, 97.0, 1, 102.0, 2)
+    assert synchronizer.global_best_prices["Y"][PEER] == (2, 98.0, 1, 102.0, 2)
+
+
+def test_stale_update_is_dropped():
+    synchronizer = make_synchronizer()
+
+    async def run():
+        for sequence_number in (1, 2, 3):
+            await synchronizer.process_peer_update(
+                update("X", sequence_number, 100.0 - sequence_number, 101.0)
+            )
+        # update 1 would mean the peer restarted
+        return await synchronizer.process_peer_update(update("X", 2, 50.0, 60.0))
+
+    assert asyncio.run(run()).status == "STALE"
+    assert synchronizer.peer_sequence_numbers[PEER] == 3
+    assert synchronizer.global_best_prices["X"][PEER] == (3, 97.0, 1, 101.0, 2)
+
+
+def test_gap_resyncs_every_symbol_held_for_the_peer():
+    stub = FakePeerStub(sequence_number=7)
+    synchronizer = make_synchronizer(stub)
+
+    async def run():
+        await synchronizer.process_peer_update(update("X", 1, 99.5, 100.5))
+        await synchronizer.process_peer_update(update("Y", 2, 49.5, 50.5))
+        # updates 3 and 4 were lost
+        return await synchronizer.process_peer_update(update("Z", 5, 10.0, 11.0))
+
+    assert asyncio.run(run()).status == "RESYNCED"
+    assert sorted(stub.synced) == [("X", 1), ("Y", 1), ("Z", 1)]
+    for symbol in ("X", "Y", "Z"):
+        assert synchronizer.global_best_prices[symbol][PEER][1:] == (99.0, 3, 101.0, 4)
+    # the peer's snapshot already includes its updates up to 7
+    assert synchronizer.peer_sequence_numbers[PEER] == 7
+
+    async def next_update():
+        return await synchronizer.process_peer_update(update("X", 8, 98.0, 102.0))
+
+    assert asyncio.run(next_update()).status == "SUCCESSFUL"
+
+
+def test_peer_restart_drops_what_was_held():
+    synchronizer = make_synchronizer()
+
+    async def run():
+        await synchronizer.process_peer_update(update("X", 1, 99.0, 101.0))
+        await synchronizer.process_peer_update(update("Y", 2, 49.0, 51.0))
+        # the peer restarted and numbers its updates from 1 again
+        return await synchronizer.process_peer_update(update("Y", 1, 48.0, 52.0))
+
+    assert asyncio.run(run()).status == "SUCCESSFUL"
+    assert PEER not in synchronizer.global_best_prices["X"]
+    assert synchronizer.global_best_prices["Y"][PEER] == (1, 48.0, 1, 52.0, 2)
+    assert synchronizer.peer_sequence_numbers[PEER] == 1